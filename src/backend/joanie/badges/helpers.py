@@ -0,0 +1,399 @@
+"""
+Helpers to issue badges through badge providers
+"""
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from urllib.parse import urljoin, urlparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from joanie.core.models import Order, User
+
+from . import models
+from .exceptions import BadgeProviderError
+from .providers.obf import Badge as OBFBadge
+from .providers.obf import BadgeIssue, BadgeRevokation
+
+logger = logging.getLogger(__name__)
+
+BADGES_SYNC_BATCH_SIZE = 500
+BADGES_REVOCATION_MAX_WORKERS = 4
+
+BADGE_PROVIDERS = {
+    "OBF": "joanie.badges.providers.obf.OBF",
+}
+
+
+def iter_batches(items, batch_size):
+    """Yield lists of at most `batch_size` items."""
+    items = iter(items)
+    while batch := list(islice(items, batch_size)):
+        yield batch
+
+
+def get_badge_provider(code):
+    """
+    Instantiate the badge provider identified by `code` with its configuration
+    from the `JOANIE_BADGE_PROVIDERS` setting.
+    """
+    try:
+        provider_class = import_string(BADGE_PROVIDERS[code])
+        configuration = settings.JOANIE_BADGE_PROVIDERS[code.lower()]
+    except KeyError as error:
+        raise BadgeProviderError(
+            f"Badge provider {code} is not supported or not configured."
+        ) from error
+
+    return provider_class(**configuration)
+
+
+def get_provider_badge(badge):
+    """
+    Return the provider representation of a badge. Its identifier is the last
+    segment of the badge IRI.
+    """
+    return OBFBadge(
+        id=urlparse(badge.iri).path.rstrip("/").rsplit("/", 1)[-1],
+        name=badge.safe_translation_getter("name", any_language=True),
+        description=badge.safe_translation_getter("description", any_language=True),
+        is_created=True,
+    )
+
+
+def get_users_to_award(badge, users, resource_link=""):
+    """
+    Return users with an email address who have not been awarded the badge yet for
+    the resource link.
+    """
+    return (
+        users.exclude(email="")
+        .exclude(
+            Exists(
+                models.IssuedBadge.objects.filter(
+                    user=OuterRef("pk"),
+                    badge=badge,
+                    resource_link=resource_link,
+                    revoked_on__isnull=True,
+                )
+            )
+        )
+        .distinct()
+        .order_by("pk")
+    )
+
+
+# pylint: disable=too-many-arguments
+def issue_badges(
+    badge, users, resource_link="", batch_size=None, provider=None, orders=None
+):
+    """
+    Issue a badge to users who have not been awarded it yet for the resource link.
+
+    Recipients are sent to the badge provider by batches of `batch_size` users so
+    that issuing the badge to N users costs N / batch_size HTTP requests. Issued
+    badges of each batch are then recorded in bulk, bound to the user order among
+    `orders` if any, the latest order which is not canceled being preferred. Return
+    the number of issued badges.
+    """
+    batch_size = batch_size or settings.JOANIE_BADGE_ISSUANCE_BATCH_SIZE
+    provider = provider or get_badge_provider(badge.provider)
+    provider_badge = get_provider_badge(badge)
+    recipients = list(
+        get_users_to_award(badge, users, resource_link=resource_link).values_list(
+            "pk", "email"
+        )
+    )
+
+    issued_count = 0
+    for batch in iter_batches(recipients, batch_size):
+        event_url, __ = provider.issue(
+            provider_badge, BadgeIssue(recipient=[email for __, email in batch])
+        )
+        event_iri = urljoin(provider.api_client.api_root_url, event_url)
+        order_ids = (
+            {}
+            if orders is None
+            else dict(
+                orders.filter(owner__in=[user_id for user_id, __ in batch])
+                .order_by("owner", "-is_canceled", "created_on")
+                .values_list("owner", "id")
+            )
+        )
+        models.IssuedBadge.objects.bulk_create(
+            [
+                models.IssuedBadge(
+                    iri=event_iri,
+                    resource_link=resource_link,
+                    user_id=user_id,
+                    badge=badge,
+                    order_id=order_ids.get(user_id),
+                )
+                for user_id, __ in batch
+            ]
+        )
+        issued_count += len(batch)
+        logger.info(
+            "%d/%d badges issued for badge %s.",
+            issued_count,
+            len(recipients),
+            badge.iri,
+        )
+
+    return issued_count
+
+
+def get_certified_orders(certificates):
+    """Return orders of the given certificates, unless they were canceled."""
+    return Order.objects.filter(certificate__in=certificates, is_canceled=False)
+
+
+def get_certified_users(certificates):
+    """
+    Return owners of orders of the given certificates, unless these orders were
+    canceled as their badges would be revoked (see `get_issued_badges_to_revoke`).
+    """
+    return User.objects.filter(
+        orders__certificate__in=certificates, orders__is_canceled=False
+    )
+
+
+def get_badge_iri(provider, provider_badge):
+    """Return the IRI of a badge from a provider."""
+    api_client = provider.api_client
+    return urljoin(
+        api_client.api_root_url,
+        f"/{api_client.api_version_prefix}/badge/{api_client.client_id}/"
+        f"{provider_badge.id}",
+    )
+
+
+def get_badge_content_hash(provider_badge):
+    """Return a hash of a badge content from a provider to detect changes."""
+    content = json.dumps(
+        provider_badge.dict(exclude={"is_created"}), sort_keys=True, default=str
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _sync_badges_batch(provider, provider_badges, language_code):
+    """
+    Upsert a batch of badges from a provider with their translation in
+    `language_code`. Return created, updated and unchanged counts.
+    """
+    # pylint: disable=protected-access
+    translation_model = models.Badge._parler_meta.root_model
+    contents = {
+        get_badge_iri(provider, provider_badge): (
+            provider_badge,
+            get_badge_content_hash(provider_badge),
+        )
+        for provider_badge in provider_badges
+    }
+    existing = {
+        iri: (badge_id, content_hash)
+        for badge_id, iri, content_hash in models.Badge.objects.filter(
+            iri__in=contents
+        ).values_list("id", "iri", "content_hash")
+    }
+
+    created = []
+    updated = []
+    for iri, (provider_badge, content_hash) in contents.items():
+        if iri not in existing:
+            created.append(
+                models.Badge(provider=provider.code, iri=iri, content_hash=content_hash)
+            )
+        elif existing[iri][1] != content_hash:
+            updated.append(
+                models.Badge(
+                    id=existing[iri][0],
+                    iri=iri,
+                    content_hash=content_hash,
+                    updated_on=timezone.now(),
+                )
+            )
+
+    with transaction.atomic():
+        models.Badge.objects.bulk_create(created)
+        models.Badge.objects.bulk_update(updated, ["content_hash", "updated_on"])
+
+        translations = {
+            translation.master_id: translation
+            for translation in translation_model.objects.filter(
+                master__in=[badge.id for badge in updated],
+                language_code=language_code,
+            )
+        }
+        new_translations = []
+        for badge in created + updated:
+            provider_badge = contents[badge.iri][0]
+            translation = translations.get(badge.id)
+            if translation is None:
+                new_translations.append(
+                    translation_model(
+                        master_id=badge.id,
+                        language_code=language_code,
+                        name=provider_badge.name,
+                        description=provider_badge.description,
+                    )
+                )
+            else:
+                translation.name = provider_badge.name
+                translation.description = provider_badge.description
+        translation_model.objects.bulk_create(new_translations)
+        translation_model.objects.bulk_update(
+            translations.values(), ["name", "description"]
+        )
+
+    return len(created), len(updated), len(contents) - len(created) - len(updated)
+
+
+def sync_badges(provider, query=None, batch_size=BADGES_SYNC_BATCH_SIZE):
+    """
+    Mirror badges streamed from a provider into the Badge model, keyed by IRI.
+
+    Badges are upserted in bulk by batches of `batch_size` so memory usage does not
+    depend on the size of the catalogue, and badges whose content did not change
+    since the last synchronization are skipped. Return created, updated and
+    unchanged counts.
+    """
+    provider_badges = provider.read(query=query)
+    created_count = updated_count = unchanged_count = 0
+
+    for batch in iter_batches(provider_badges, batch_size):
+        created, updated, unchanged = _sync_badges_batch(
+            provider, batch, settings.LANGUAGE_CODE
+        )
+        created_count += created
+        updated_count += updated
+        unchanged_count += unchanged
+        logger.info(
+            "%d badges synchronized from %s.",
+            created_count + updated_count + unchanged_count,
+            provider.code,
+        )
+
+    return created_count, updated_count, unchanged_count
+
+
+def get_issued_badges_to_revoke():
+    """
+    Return issued badges not revoked yet whose order has been canceled, unless their
+    user still owns a certified order which is not canceled for the same product.
+
+    Badges issued before orders were recorded are revoked if their user owns a
+    canceled certified order but no other certified order.
+    """
+    certified_orders = Order.objects.filter(
+        owner=OuterRef("user"), certificate__isnull=False
+    )
+    return models.IssuedBadge.objects.filter(revoked_on__isnull=True).filter(
+        Q(
+            ~Exists(
+                certified_orders.filter(
+                    product=OuterRef("order__product"), is_canceled=False
+                )
+            ),
+            order__is_canceled=True,
+        )
+        | Q(
+            Exists(certified_orders.filter(is_canceled=True)),
+            ~Exists(certified_orders.filter(is_canceled=False)),
+            order__isnull=True,
+        )
+    )
+
+
+def get_event_id(issued_badge_iri):
+    """Return the issuance event identifier from an issued badge IRI."""
+    return urlparse(issued_badge_iri).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def group_by_event(issued_badges):
+    """
+    Return recipients of issued badges as (issued badge id, email) tuples grouped by
+    provider and issuance event.
+    """
+    events = defaultdict(list)
+    for issued_badge_id, provider_code, iri, email in issued_badges.values_list(
+        "id", "badge__provider", "iri", "user__email"
+    ).iterator():
+        events[provider_code, get_event_id(iri)].append((issued_badge_id, email))
+    return events
+
+
+def _revoke_event(provider_code, event_id, recipients, batch_size):
+    """
+    Revoke an issuance event for recipients by batches of `batch_size` recipients.
+    Return ids of revoked issued badges.
+    """
+    provider = get_badge_provider(provider_code)
+    revoked_ids = []
+    for batch in iter_batches(recipients, batch_size):
+        try:
+            provider.revoke(
+                BadgeRevokation(
+                    event_id=event_id, recipient=[email for __, email in batch]
+                )
+            )
+        except BadgeProviderError as error:
+            logger.error("Cannot revoke badges of event %s: %s", event_id, error)
+            continue
+        revoked_ids.extend(issued_badge_id for issued_badge_id, __ in batch)
+    return revoked_ids
+
+
+def revoke_badges(
+    issued_badges,
+    batch_size=None,
+    max_workers=BADGES_REVOCATION_MAX_WORKERS,
+    dry_run=False,
+):
+    """
+    Revoke issued badges grouped by issuance event.
+
+    Each event is revoked for its recipients by batches of `batch_size`, at most
+    `max_workers` events being revoked concurrently. Revoked issued badges are then
+    marked as such in bulk. With `dry_run`, nothing is revoked but the number of
+    issued badges that would be revoked is returned. Return the number of revoked
+    issued badges.
+    """
+    batch_size = batch_size or settings.JOANIE_BADGE_ISSUANCE_BATCH_SIZE
+    events = group_by_event(issued_badges)
+
+    if dry_run:
+        for (provider_code, event_id), recipients in events.items():
+            logger.info(
+                "%d badges would be revoked for %s event %s.",
+                len(recipients),
+                provider_code,
+                event_id,
+            )
+        return sum(len(recipients) for recipients in events.values())
+
+    revoked_ids = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _revoke_event, provider_code, event_id, recipients, batch_size
+            )
+            for (provider_code, event_id), recipients in events.items()
+        ]
+        for future in as_completed(futures):
+            revoked_ids.extend(future.result())
+
+    revoked_on = timezone.now()
+    for batch in iter_batches(revoked_ids, batch_size):
+        models.IssuedBadge.objects.filter(id__in=batch).update(
+            revoked_on=revoked_on, updated_on=revoked_on
+        )
+
+    return len(revoked_ids)
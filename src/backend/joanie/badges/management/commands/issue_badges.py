@@ -0,0 +1,81 @@
+"""Management command to issue a badge to certified users."""
+import logging
+
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+
+from joanie.badges import helpers, models
+from joanie.core.models import Certificate
+
+logger = logging.getLogger("joanie.badges.issue_badges")
+
+
+class Command(BaseCommand):
+    """
+    A command to issue a badge to all users who own a certificate of an order which
+    was not canceled and have not been awarded this badge yet.
+
+    Recipients are sent to the badge provider by batches (--batch-size) so that one
+    HTTP request is made per batch instead of one per user. Through options, you are
+    able to restrict this command to certificates of a list of courses (-c) or
+    products (-p).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("badge", help="Id of the badge to issue.")
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help=(
+                "Accept a single or a list of course code to restrict issuance to "
+                "certificates of this/those course(s)."
+            ),
+        )
+        parser.add_argument(
+            "-p",
+            "--products",
+            "--product",
+            nargs="+",
+            help=(
+                "Accept a single or a list of product id to restrict issuance to "
+                "certificates of this/those product(s)."
+            ),
+        )
+        parser.add_argument(
+            "-r",
+            "--resource-link",
+            default="",
+            help="Link to the resource the badge is issued for.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of recipients sent to the badge provider at once.",
+        )
+
+    def handle(self, *args, **options):
+        """Issue the badge to certified users by batches."""
+        try:
+            badge = models.Badge.objects.get(pk=options["badge"])
+        except (models.Badge.DoesNotExist, ValidationError) as error:
+            raise CommandError(f"No badge found with id {options['badge']}.") from error
+
+        filters = {}
+        if options["courses"]:
+            filters["order__course__code__in"] = options["courses"]
+        if options["products"]:
+            filters["order__product_id__in"] = options["products"]
+
+        certificates = Certificate.objects.filter(order__is_canceled=False, **filters)
+        issued_count = helpers.issue_badges(
+            badge,
+            helpers.get_certified_users(certificates),
+            resource_link=options["resource_link"],
+            batch_size=options["batch_size"],
+            orders=helpers.get_certified_orders(certificates),
+        )
+        logger.info("%d badge(s) issued for badge %s.", issued_count, badge)
@@ -0,0 +1,52 @@
+"""Management command to revoke badges issued for canceled orders."""
+import logging
+
+from django.core.management import BaseCommand
+
+from joanie.badges import helpers
+
+logger = logging.getLogger("joanie.badges.revoke_badges")
+
+
+class Command(BaseCommand):
+    """
+    A command to reconcile issued badges with orders: badges issued for orders
+    which have since been canceled (e.g. refunded) are revoked from the provider.
+
+    Issued badges are grouped by issuance event and revoked by batches of
+    recipients (--batch-size), several events being revoked concurrently
+    (--max-workers). Use --dry-run to only report badges that would be revoked.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of recipients revoked at once for an issuance event.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=helpers.BADGES_REVOCATION_MAX_WORKERS,
+            help="Number of issuance events revoked concurrently.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report badges that would be revoked without revoking them.",
+        )
+
+    def handle(self, *args, **options):
+        """Revoke badges issued for canceled orders."""
+        revoked_count = helpers.revoke_badges(
+            helpers.get_issued_badges_to_revoke(),
+            batch_size=options["batch_size"],
+            max_workers=options["max_workers"],
+            dry_run=options["dry_run"],
+        )
+        if options["dry_run"]:
+            logger.info("%d badge(s) would be revoked.", revoked_count)
+        else:
+            logger.info("%d badge(s) revoked.", revoked_count)
@@ -0,0 +1,80 @@
+"""Management command to synchronize badges from a badge provider."""
+import logging
+
+from django.core.management import BaseCommand
+
+from joanie.badges import helpers
+from joanie.badges.providers.obf import BadgeQuery
+
+logger = logging.getLogger("joanie.badges.sync_badges")
+
+
+class Command(BaseCommand):
+    """
+    A command to mirror the badge catalogue of a badge provider into Joanie.
+
+    Badges are streamed from the provider and upserted by batches (--batch-size),
+    badges which did not change since the last synchronization are skipped.
+    Through options, you are able to restrict synchronized badges to a list of
+    categories (--category), ids (--id), a search query (--query) or to draft
+    badges (--draft) or not (--no-draft).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--provider",
+            default="OBF",
+            help="Code of the badge provider to synchronize badges from.",
+        )
+        parser.add_argument(
+            "--category",
+            nargs="+",
+            help="Accept a single or a list of category to filter badges.",
+        )
+        parser.add_argument(
+            "--id",
+            nargs="+",
+            help="Accept a single or a list of provider badge id to filter badges.",
+        )
+        parser.add_argument("--query", help="Search query to filter badges.")
+        parser.add_argument(
+            "--draft",
+            action="store_const",
+            const=1,
+            help="Only synchronize draft badges.",
+        )
+        parser.add_argument(
+            "--no-draft",
+            action="store_const",
+            const=0,
+            dest="draft",
+            help="Only synchronize published badges.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=helpers.BADGES_SYNC_BATCH_SIZE,
+            help="Number of badges upserted at once.",
+        )
+
+    def handle(self, *args, **options):
+        """Stream badges from the provider and upsert them by batches."""
+        query = BadgeQuery(
+            draft=options["draft"],
+            category=options["category"],
+            id=options["id"],
+            query=options["query"],
+        )
+        created, updated, unchanged = helpers.sync_badges(
+            helpers.get_badge_provider(options["provider"]),
+            query=query,
+            batch_size=options["batch_size"],
+        )
+        logger.info(
+            "%d badge(s) created, %d updated and %d unchanged.",
+            created,
+            updated,
+            unchanged,
+        )
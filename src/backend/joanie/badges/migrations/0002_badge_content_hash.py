@@ -0,0 +1,24 @@
+# Generated by Django 4.0.10 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("badges", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="badge",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Hash of the badge content from the provider used to detect changes",
+                max_length=64,
+                verbose_name="Content hash",
+            ),
+        ),
+    ]
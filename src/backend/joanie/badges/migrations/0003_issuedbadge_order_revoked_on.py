@@ -0,0 +1,40 @@
+# Generated by Django 4.0.10 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("badges", "0002_badge_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issuedbadge",
+            name="order",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Order which made the user eligible for the badge",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="issued_badges",
+                to="core.order",
+                verbose_name="Order",
+            ),
+        ),
+        migrations.AddField(
+            model_name="issuedbadge",
+            name="revoked_on",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Date and time at which the badge has been revoked",
+                null=True,
+                verbose_name="Revoked on",
+            ),
+        ),
+    ]
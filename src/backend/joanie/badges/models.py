@@ -10,7 +10,7 @@ from parler import models as parler_models
 
 from joanie.core.models import BaseModel
 
-from ..core.models import User
+from ..core.models import Order, User
 
 
 @lru_cache
@@ -68,6 +68,16 @@ class Badge(parler_models.TranslatableModel, BaseModel):
         unique=True,
     )
 
+    content_hash = models.CharField(
+        _("Content hash"),
+        help_text=_(
+            "Hash of the badge content from the provider used to detect changes"
+        ),
+        max_length=64,
+        editable=False,
+        blank=True,
+    )
+
     class Meta:
         """Options for the Badge model"""
 
@@ -124,6 +134,25 @@ class IssuedBadge(BaseModel):
         null=True,
     )
 
+    order = models.ForeignKey(
+        to=Order,
+        verbose_name=_("Order"),
+        help_text=_("Order which made the user eligible for the badge"),
+        related_name="issued_badges",
+        on_delete=models.SET_NULL,
+        editable=False,
+        blank=True,
+        null=True,
+    )
+
+    revoked_on = models.DateTimeField(
+        _("Revoked on"),
+        help_text=_("Date and time at which the badge has been revoked"),
+        editable=False,
+        blank=True,
+        null=True,
+    )
+
     class Meta:
         """Options for the Issued Badge model"""
 
@@ -1,13 +1,18 @@
 """OpenBadgeFactory provider."""
 
+import hashlib
 import json
 import logging
 import re
+import threading
+import time
 from collections.abc import Iterable
-from functools import cache
+from itertools import chain
 from typing import Literal, Optional
 from urllib.parse import urljoin
 
+from django.core.cache import cache
+
 # pylint: disable=no-name-in-module
 import requests
 from pydantic import (
@@ -25,6 +30,16 @@ from .base import BaseProvider
 
 logger = logging.getLogger(__name__)
 
+OBF_API_ROOT_URL = "https://openbadgefactory.com"
+JSON_LINES_CONTENT_TYPES = (
+    "application/jsonl",
+    "application/jsonlines",
+    "application/x-jsonlines",
+    "application/x-ndjson",
+)
+# Number of bytes read at once when streaming JSON responses
+ITER_JSON_CHUNK_SIZE = 64 * 1024
+
 
 class OAuth2AccessToken(requests.auth.AuthBase):
     """Add OAuth2 access token to HTTP API requests header."""
@@ -46,6 +61,99 @@ class OAuth2AccessToken(requests.auth.AuthBase):
         return request
 
 
+class AccessTokenCache:
+    """Cache OAuth2 access tokens in the Django cache shared by all processes.
+
+    Tokens are stored until shortly before they expire so that they are renewed
+    proactively instead of after a rejected request. Renewal is guarded by a lock
+    in the Django cache so that a single process requests a new token, and by a
+    thread lock within a process. The cache must therefore be shared by all
+    processes, which is checked on startup (see `joanie.core.utils.check_shared_cache`).
+    """
+
+    key_prefix: str = "obf_access_token"
+    # Renew access tokens this number of seconds before they expire
+    renewal_margin: int = 60
+    # Validity of access tokens when the API does not tell it
+    default_expires_in: int = 3600
+    # Maximum duration of an access token renewal by another process
+    lock_timeout: int = 10
+    lock_poll_interval: float = 0.1
+
+    def __init__(self, fetch):
+        """Wrap a function requesting an access token and its validity duration."""
+
+        self.fetch = fetch
+        self.lock = threading.Lock()
+        self.keys = set()
+
+    def get_key(self, *args) -> str:
+        """Return the cache key bound to the API credentials."""
+
+        digest = hashlib.sha256("|".join(args).encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}_{digest}"
+
+    def __call__(self, *args) -> str:
+        """Return a valid access token, requesting a new one if needed."""
+
+        key = self.get_key(*args)
+        access_token = cache.get(key)
+        if access_token is not None:
+            return access_token
+
+        with self.lock:
+            access_token = cache.get(key)
+            if access_token is not None:
+                return access_token
+
+            lock_key = f"{key}_lock"
+            is_locked = cache.add(lock_key, True, self.lock_timeout)
+            if not is_locked:
+                # Another process is renewing the token, wait for it
+                access_token = self._wait_for(key)
+                if access_token is not None:
+                    return access_token
+
+            try:
+                access_token, expires_in = self.fetch(*args)
+                cache.set(
+                    key,
+                    access_token,
+                    max(
+                        (expires_in or self.default_expires_in) - self.renewal_margin,
+                        1,
+                    ),
+                )
+                self.keys.add(key)
+            finally:
+                if is_locked:
+                    cache.delete(lock_key)
+
+        return access_token
+
+    def _wait_for(self, key: str) -> Optional[str]:
+        """Poll the cache until an access token is available or the lock expires."""
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll_interval)
+            access_token = cache.get(key)
+            if access_token is not None:
+                return access_token
+        return None
+
+    def invalidate(self, *args) -> None:
+        """Forget the access token bound to the API credentials."""
+
+        cache.delete(self.get_key(*args))
+
+    def cache_clear(self) -> None:
+        """Forget all access tokens cached by this process."""
+
+        cache.delete_many(self.keys)
+        self.keys.clear()
+
+
 class OBFAPIClient(requests.Session):
     """Open Badge Factory API Client."""
 
@@ -55,13 +163,14 @@ class OBFAPIClient(requests.Session):
         client_secret: str,
         *args,
         raise_for_status: bool = False,
+        api_root_url: str = OBF_API_ROOT_URL,
         **kwargs,
     ):
         """Override default requests.Session instantiation to handle authentication."""
 
         super().__init__(*args, **kwargs)
 
-        self.api_root_url: str = "https://openbadgefactory.com"
+        self.api_root_url: str = api_root_url
         self.api_version_prefix: str = "v1"
         self.client_id: str = client_id
         self.client_secret: str = client_secret
@@ -74,17 +183,15 @@ class OBFAPIClient(requests.Session):
         )
 
     @staticmethod
-    @cache
+    @AccessTokenCache
     def _access_token(
         client_id: str, client_secret: str, api_version_prefix: str, api_root_url: str
     ):
         """Request OAuth2 access token from the API backend.
 
-        We cache this function to avoid regenerating an access token at each
-        API request. This access token has a limited validity (e.g. 10h) so we
-        try to regenerate it when the API response code is 403 (see the
-        `request` overridden method).
-
+        Return the access token with its validity duration in seconds. This
+        function is wrapped by a shared cache (see `AccessTokenCache`) to avoid
+        regenerating an access token at each API request.
         """
 
         url = f"{api_version_prefix}/client/oauth2/token"
@@ -109,7 +216,7 @@ class OBFAPIClient(requests.Session):
                 "Cannot get an access token from the OBF server with provided credentials"
             )
 
-        return json_response.get("access_token")
+        return json_response.get("access_token"), json_response.get("expires_in")
 
     @property
     def _get_auth(self):
@@ -138,20 +245,39 @@ class OBFAPIClient(requests.Session):
         """Iterate over JSON lines serialization in API responses.
 
         When multiple objects are returned by the API, they are streamed as
-        JSON lines instead of a JSON list, leading the response.json() method
-        to fail as it is expected a valid JSON list instead. We mitigate this
-        issue by forcing JSON serialization of each item in the response.
+        JSON lines instead of a JSON list. The response body is read line by
+        line so that a large listing is never buffered nor parsed as a whole:
+        when the content type does not tell it, we peek at the first line to
+        find out if the body is a single JSON document spanning several lines
+        (e.g. an indented list) that needs to be parsed at once.
         """
 
         try:
-            json_response = response.json()
-            if isinstance(json_response, list):
-                yield from json_response
-            else:
-                yield json_response
-        except requests.JSONDecodeError:
-            for line in response.iter_lines():
-                yield json.loads(line)
+            lines = (
+                line
+                for line in response.iter_lines(chunk_size=ITER_JSON_CHUNK_SIZE)
+                if line.strip()
+            )
+            content_type = response.headers.get("Content-Type", "")
+            if content_type.split(";")[0].strip() not in JSON_LINES_CONTENT_TYPES:
+                first_line = next(lines, None)
+                if first_line is None:
+                    return
+                try:
+                    json.loads(first_line)
+                except json.JSONDecodeError:
+                    lines = iter([b"\n".join(chain([first_line], lines))])
+                else:
+                    lines = chain([first_line], lines)
+
+            for line in lines:
+                item = json.loads(line)
+                if isinstance(item, list):
+                    yield from item
+                else:
+                    yield item
+        finally:
+            response.close()
 
     # pylint: disable=arguments-differ
     def request(self, method, url, **kwargs):
@@ -162,6 +288,8 @@ class OBFAPIClient(requests.Session):
         """
 
         url = urljoin(self.api_root_url, f"{self.api_version_prefix}/{url}")
+        # Pick up the access token renewed before its expiration if any
+        self.auth = self._get_auth
         response = super().request(method, url, **kwargs)
 
         # Try to regenerate the access token in case of 403 response
@@ -169,8 +297,14 @@ class OBFAPIClient(requests.Session):
             response.status_code
             == requests.codes.forbidden  # pylint: disable=no-member
         ):
-            # Clear cached property and force access token update
-            self._access_token.cache_clear()
+            response.close()
+            # Clear cached access token and force access token update
+            self._access_token.invalidate(
+                self.client_id,
+                self.client_secret,
+                self.api_version_prefix,
+                self.api_root_url,
+            )
             self.auth = self._get_auth
             # Give it another try
             return super().request(method, url, **kwargs)
@@ -290,13 +424,20 @@ class OBF(BaseProvider):
     name: str = "Open Badge Factory"
 
     def __init__(
-        self, client_id: str, client_secret: str, raise_for_status: bool = False
+        self,
+        client_id: str,
+        client_secret: str,
+        raise_for_status: bool = False,
+        api_root_url: str = OBF_API_ROOT_URL,
     ):
         """Initialize the API client."""
 
         super().__init__()
         self.api_client = OBFAPIClient(
-            client_id, client_secret, raise_for_status=raise_for_status
+            client_id,
+            client_secret,
+            raise_for_status=raise_for_status,
+            api_root_url=api_root_url,
         )
 
     def create(self, badge: Badge) -> Badge:
@@ -352,6 +493,7 @@ class OBF(BaseProvider):
             response = self.api_client.get(
                 f"/badge/{self.api_client.client_id}",
                 params=query.params(),
+                stream=True,
             )
             logger.info("Successfully filtered badges from query")
 
@@ -359,6 +501,7 @@ class OBF(BaseProvider):
         else:
             response = self.api_client.get(
                 f"/badge/{self.api_client.client_id}",
+                stream=True,
             )
             logger.info("Successfully listed badges")
 
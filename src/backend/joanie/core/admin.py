@@ -1,10 +1,18 @@
 """
 Core application admin
 """
+from datetime import date
+from uuid import UUID
 
+from django.conf import settings
 from django.contrib import admin, messages
 from django.contrib.auth import admin as auth_admin
-from django.http import HttpResponseRedirect
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.urls import re_path, reverse
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
@@ -14,9 +22,10 @@ from adminsortable2.admin import SortableAdminBase, SortableInlineAdminMixin
 from django_object_actions import DjangoObjectActions, takes_instance_or_queryset
 from parler.admin import TranslatableAdmin
 
-from joanie.core import helpers, models
+from joanie.core import archives, helpers, models
 from joanie.core.enums import PRODUCT_TYPE_CERTIFICATE_ALLOWED
 from joanie.core.forms import ProductCourseRelationAdminForm
+from joanie.core.paginators import EstimatedCountPaginator
 
 ACTION_NAME_GENERATE_CERTIFICATES = "generate_certificates"
 ACTION_NAME_CANCEL = "cancel"
@@ -60,6 +69,56 @@ class CertificateAdmin(admin.ModelAdmin):
         """Retrieve the owner of the certificate from the related order."""
         return obj.order.owner
 
+    def get_urls(self):
+        """
+        Add url to download an archive of certificate documents.
+        """
+        url_patterns = super().get_urls()
+
+        return [
+            re_path(
+                r"^archive/$",
+                self.admin_site.admin_view(self.archive),
+                name="core_certificate_archive",
+            )
+        ] + url_patterns
+
+    def archive(self, request):
+        """
+        Stream a ZIP archive of certificate documents. Accept `course`, `product`,
+        `since` and `until` query parameters to restrict certificates to archive.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        try:
+            since, until = (
+                date.fromisoformat(request.GET[key]) if request.GET.get(key) else None
+                for key in ("since", "until")
+            )
+        except ValueError:
+            return HttpResponseBadRequest("Dates should be formatted as YYYY-MM-DD.")
+
+        try:
+            product_ids = [UUID(pk) for pk in request.GET.getlist("product")]
+        except ValueError:
+            return HttpResponseBadRequest("Products should be identified by a UUID.")
+
+        certificates = archives.get_certificates_queryset(
+            course_codes=request.GET.getlist("course"),
+            product_ids=product_ids,
+            since=since,
+            until=until,
+        )
+
+        response = StreamingHttpResponse(
+            archives.generate_certificates_archive(certificates),
+            content_type="application/zip",
+        )
+        response["Content-Disposition"] = "attachment; filename=certificates.zip;"
+
+        return response
+
 
 @admin.register(models.Course)
 class CourseAdmin(DjangoObjectActions, TranslatableAdmin):
@@ -294,15 +353,57 @@ class OrderAdmin(DjangoObjectActions, admin.ModelAdmin):
     """Admin class for the Order model"""
 
     list_display = ("id", "owner", "product", "state")
+    list_filter = ("is_canceled",)
+    list_select_related = ("owner", "product")
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ("course", "owner", "product")
     readonly_fields = ("state", "total", "proforma_invoice", "certificate")
+    search_fields = ("owner__username__exact", "course__code__exact")
+    show_full_result_count = False
     change_actions = (ACTION_NAME_GENERATE_CERTIFICATES,)
     actions = (ACTION_NAME_CANCEL, ACTION_NAME_GENERATE_CERTIFICATES)
 
+    def get_queryset(self, request):
+        """
+        Annotate orders with what their state needs and prefetch product
+        translations so that the changelist costs a constant number of queries.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .with_state()
+            .prefetch_related("product__translations")
+        )
+
     @admin.action(description=_("Cancel selected orders"))
     def cancel(self, request, queryset):  # pylint: disable=no-self-use
-        """Cancel orders"""
-        for order in queryset:
-            order.cancel()
+        """
+        Cancel orders in bulk. Users are unenrolled from the LMS one by one within the
+        request, so selections larger than the `JOANIE_ADMIN_CANCEL_ORDERS_MAX_COUNT`
+        setting are refused and left to the `cancel_orders` management command.
+        """
+        max_count = settings.JOANIE_ADMIN_CANCEL_ORDERS_MAX_COUNT
+        count = queryset.count()
+        if count > max_count:
+            messages.error(
+                request,
+                _(
+                    "{:d} orders are selected but at most {:d} can be canceled from "
+                    "the admin. Please cancel them with the cancel_orders management "
+                    "command."
+                ).format(count, max_count),
+            )
+            return
+
+        count = helpers.cancel_orders(queryset)
+        messages.success(
+            request,
+            ngettext_lazy(  # pylint: disable=no-member
+                "{:d} order has been canceled.",
+                "{:d} orders have been canceled.",
+                count,
+            ).format(count),
+        )
 
     @takes_instance_or_queryset
     def generate_certificates(self, request, queryset):  # pylint: disable=no-self-use
@@ -333,6 +434,21 @@ class EnrollmentAdmin(admin.ModelAdmin):
     """Admin class for the Enrollment model"""
 
     list_display = ("user", "course_run", "state")
+    list_filter = ("state", "is_active")
+    list_select_related = ("user", "course_run")
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ("course_run", "user")
+    search_fields = ("user__username__exact", "course_run__resource_link__exact")
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        """
+        Prefetch course run translations so that the changelist costs a constant
+        number of queries.
+        """
+        return (
+            super().get_queryset(request).prefetch_related("course_run__translations")
+        )
 
 
 @admin.register(models.Address)
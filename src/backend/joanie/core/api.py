@@ -1,9 +1,21 @@
 """
 API endpoints
 """
+import hashlib
+import uuid
+
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q
 from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
 
 from rest_framework import mixins, pagination, permissions, viewsets
 from rest_framework.decorators import action
@@ -12,6 +24,12 @@ from rest_framework.response import Response
 from rest_framework.views import exception_handler as drf_exception_handler
 
 from joanie.core import models
+from joanie.core.catalog import (
+    annotate_last_modified,
+    get_course_related_querysets,
+    get_product_related_querysets,
+)
+from joanie.core.databases import use_primary
 from joanie.core.enums import ORDER_STATE_PENDING
 from joanie.payment import get_payment_backend
 from joanie.payment.models import ProformaInvoice
@@ -49,7 +67,69 @@ class Pagination(pagination.PageNumberPagination):
     page_size = 100
 
 
-class CourseViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+class ConditionalRetrieveMixin(mixins.RetrieveModelMixin):
+    """
+    Retrieve a catalog resource with an `ETag` and a `Last-Modified` header derived
+    from the latest update of the objects its representation is made of, so that
+    clients and proxies can revalidate it. Conditional requests of anonymous users
+    are answered with a 304 response without serializing the resource, and their
+    responses can be cached publicly according to the `JOANIE_CATALOG_CACHE_CONTROL`
+    setting. Responses of authenticated users hold private information so they are
+    never cached publicly.
+    """
+
+    def get_related_querysets(self):  # pylint: disable=no-self-use
+        """
+        Return querysets, filtered on `OuterRef("pk")`, of objects related to the
+        resource which are part of its representation.
+        """
+        return []
+
+    def get_queryset(self):
+        """Annotate resources with the latest update of their representation."""
+        return annotate_last_modified(
+            super().get_queryset(), self.get_related_querysets()
+        )
+
+    def get_etag(self, instance):
+        """
+        Return the entity tag of the resource representation in the active language.
+        """
+        version = f"{self.basename}-{instance.pk}-{instance.last_modified.isoformat()}"
+        return quote_etag(
+            hashlib.sha256(f"{version}-{get_language()}".encode("utf-8")).hexdigest()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve the resource unless the client representation is still fresh."""
+        instance = self.get_object()
+
+        if request.user.username:
+            response = Response(self.get_serializer(instance).data)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+            return response
+
+        etag = self.get_etag(instance)
+        last_modified = int(instance.last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(
+            response,
+            public=True,
+            **settings.JOANIE_CATALOG_CACHE_CONTROL.get(self.basename, {}),
+        )
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+
+class CourseViewSet(ConditionalRetrieveMixin, viewsets.GenericViewSet):
     """API ViewSet for all interactions with courses."""
 
     lookup_field = "code"
@@ -57,6 +137,10 @@ class CourseViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = models.Course.objects.select_related("organization").all()
     serializer_class = serializers.CourseSerializer
 
+    def get_related_querysets(self):
+        """Return querysets of objects the course representation is made of."""
+        return get_course_related_querysets()
+
     def get_serializer_context(self):
         """
         Provide username to the authenticated user (if one is authenticated)
@@ -70,7 +154,7 @@ class CourseViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         return context
 
 
-class CourseRunViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+class CourseRunViewSet(ConditionalRetrieveMixin, viewsets.GenericViewSet):
     """API ViewSet for all interactions with course runs."""
 
     lookup_field = "id"
@@ -79,7 +163,7 @@ class CourseRunViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     serializer_class = serializers.CourseRunSerializer
 
 
-class ProductViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+class ProductViewSet(ConditionalRetrieveMixin, viewsets.GenericViewSet):
     """API ViewSet for all interactions with products."""
 
     lookup_field = "id"
@@ -92,6 +176,10 @@ class ProductViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     )
     serializer_class = serializers.ProductSerializer
 
+    def get_related_querysets(self):
+        """Return querysets of objects the product representation is made of."""
+        return get_product_related_querysets()
+
     def get_serializer_context(self):
         """
         Provide username to the authenticated user (if one is authenticated)
@@ -108,6 +196,97 @@ class ProductViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
         return context
 
 
+class UserOverlayViewSet(viewsets.ViewSet):
+    """
+    API view for a user to retrieve, in a constant number of queries, the orders and
+    enrollments he/she owns related to a list of courses and products. Public course
+    and product representations can then be cached whatever the user.
+
+    GET /api/user-overlays/?courses=<code>,<code>&products=<id>
+        Return the user's orders not canceled related to the courses or products and
+        the user's enrollments to course runs of these courses or of the courses they
+        target
+    """
+
+    max_resources = 100
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_query_param_list(self, name):
+        """
+        Return values of a query parameter given several times or as a comma
+        separated list.
+        """
+        values = []
+        for value in self.request.query_params.getlist(name):
+            values.extend(item.strip() for item in value.split(",") if item.strip())
+        return values
+
+    def get_filters(self):
+        """Validate then return course codes and product ids to filter on."""
+        course_codes = self.get_query_param_list("courses")
+        product_ids = self.get_query_param_list("products")
+
+        if not course_codes and not product_ids:
+            raise DRFValidationError(
+                "At least one course code or product id should be provided."
+            )
+        if len(course_codes) + len(product_ids) > self.max_resources:
+            raise DRFValidationError(
+                f"No more than {self.max_resources:d} courses and products "
+                "can be provided."
+            )
+        try:
+            for product_id in product_ids:
+                uuid.UUID(product_id)
+        except ValueError as error:
+            raise DRFValidationError(
+                {"products": [f"{product_id} is not a valid product id."]}
+            ) from error
+
+        return course_codes, product_ids
+
+    def list(self, request):
+        """
+        Return the user's orders and enrollments related to the requested courses
+        and products.
+        """
+        course_codes, product_ids = self.get_filters()
+        username = request.user.username
+
+        orders = (
+            models.Order.objects.with_state()
+            .filter(
+                Q(course__code__in=course_codes) | Q(product_id__in=product_ids),
+                owner__username=username,
+                is_canceled=False,
+            )
+            .select_related("certificate", "course")
+            .order_by("-created_on")
+        )
+        courses = models.Course.objects.filter(
+            Q(code__in=course_codes)
+            | Q(targeted_by_products__in=product_ids)
+            | Q(targeted_by_products__courses__code__in=course_codes)
+        ).values("pk")
+        enrollments = (
+            models.Enrollment.objects.filter(
+                course_run__course__in=courses, user__username=username
+            )
+            .select_related("course_run")
+            .prefetch_related("course_run__translations")
+            .order_by("-created_on")
+        )
+
+        return Response(
+            {
+                "orders": serializers.OrderOverlaySerializer(orders, many=True).data,
+                "enrollments": serializers.EnrollmentSerializer(
+                    enrollments, many=True
+                ).data,
+            }
+        )
+
+
 # pylint: disable=too-many-ancestors
 class EnrollmentViewSet(
     mixins.ListModelMixin,
@@ -162,15 +341,52 @@ class OrderViewSet(
     ordering = ["-created_on"]
 
     def get_queryset(self):
-        """Custom queryset to limit to orders owned by the logged-in user."""
+        """
+        Custom queryset to limit to orders owned by the logged-in user. When listing
+        orders, everything they are serialized with is prefetched so that the number
+        of queries does not depend on the number of orders.
+        """
         user = User.update_or_create_from_request_user(request_user=self.request.user)
-        return user.orders.all().select_related("owner", "product", "certificate")
+        queryset = user.orders.all().select_related("owner", "product", "certificate")
+        if self.action != "list":
+            return queryset
+
+        course_runs = models.CourseRun.objects.prefetch_related(
+            "translations"
+        ).order_by("start")
+        return (
+            queryset.select_related("course")
+            .with_state()
+            .with_main_proforma_invoice()
+            .prefetch_related(
+                Prefetch(
+                    "course_relations",
+                    queryset=models.OrderCourseRelation.objects.select_related(
+                        "course__organization"
+                    ).prefetch_related(
+                        "course__translations",
+                        "course__organization__translations",
+                        Prefetch("course_runs", queryset=course_runs),
+                        Prefetch("course__course_runs", queryset=course_runs),
+                    ),
+                    to_attr="prefetched_course_relations",
+                ),
+                Prefetch(
+                    "owner__enrollments",
+                    queryset=models.Enrollment.objects.select_related(
+                        "course_run"
+                    ).prefetch_related("course_run__translations"),
+                    to_attr="prefetched_enrollments",
+                ),
+            )
+        )
 
     def perform_create(self, serializer):
         """Force the order's "owner" field to the logged-in user."""
         owner = User.update_or_create_from_request_user(request_user=self.request.user)
         serializer.save(owner=owner)
 
+    @use_primary()
     @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Try to create an order and a related payment if the payment is fee."""
@@ -8,3 +8,15 @@ class CoreConfig(AppConfig):
 
     name = "joanie.core"
     verbose_name = _("Joanie's core application")
+
+    # pylint: disable=import-outside-toplevel
+    def ready(self):
+        """
+        Check that the cache is shared by all processes if required then connect
+        receivers publishing catalog snapshots.
+        """
+        from .signals import connect_catalog_receivers
+        from .utils import check_shared_cache
+
+        check_shared_cache()
+        connect_catalog_receivers()
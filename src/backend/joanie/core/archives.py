@@ -0,0 +1,127 @@
+"""
+Streaming ZIP archives of certificate documents
+"""
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.translation import get_language
+
+from joanie.core.models import Certificate
+
+
+class ZipStream:
+    """
+    A write-only file-like object used as ZIP archive output.
+
+    It is not seekable so `zipfile` writes each entry with a data descriptor and
+    bytes written can be consumed then forgotten as soon as an entry is complete.
+    """
+
+    def __init__(self):
+        self._chunks = deque()
+
+    def write(self, data):
+        """Buffer written bytes until they are consumed."""
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        """Nothing to flush, bytes are consumed through `consume`."""
+
+    def consume(self):
+        """Return bytes written since the last call and forget them."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def render_certificate_document(template, identifier, context):
+    """
+    Render a certificate document in PDF format.
+
+    This function does not access the database so it can run in a worker process.
+    """
+    document_issuer = import_string(template)
+    document = document_issuer(identifier=identifier, context_query=context)
+    return document.create(persist=False)
+
+
+def get_certificates_queryset(
+    course_codes=None, product_ids=None, since=None, until=None
+):
+    """
+    Return certificates of the given courses and products issued between the `since`
+    and `until` dates (both included).
+    """
+    filters = {}
+    if course_codes:
+        filters["order__course__code__in"] = course_codes
+    if product_ids:
+        filters["order__product_id__in"] = product_ids
+    if since is not None:
+        filters["issued_on__gte"] = timezone.make_aware(
+            datetime.combine(since, time.min)
+        )
+    if until is not None:
+        filters["issued_on__lt"] = timezone.make_aware(
+            datetime.combine(until + timedelta(days=1), time.min)
+        )
+
+    return (
+        Certificate.objects.filter(**filters)
+        .select_related(
+            "certificate_definition", "order__course__organization", "order__owner"
+        )
+        .order_by("issued_on", "id")
+    )
+
+
+def generate_certificates_archive(certificates, max_workers=None):
+    """
+    Stream a ZIP archive containing the PDF document of each certificate.
+
+    Documents are rendered in a pool of `max_workers` processes and written to the
+    archive as soon as they are rendered. At most twice as many documents as
+    workers are pending at once so memory usage does not depend on the number of
+    certificates.
+    """
+    max_workers = max_workers or settings.JOANIE_CERTIFICATE_ARCHIVE_WORKERS
+    language_code = get_language()
+    stream = ZipStream()
+
+    with zipfile.ZipFile(
+        stream, mode="w", compression=zipfile.ZIP_DEFLATED
+    ) as archive, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def write_completed(futures):
+            for future in futures:
+                archive.writestr(f"{pending.pop(future)}.pdf", future.result())
+
+        for certificate in certificates.iterator():
+            # Build the context in this process as it requires the database
+            future = executor.submit(
+                render_certificate_document,
+                certificate.certificate_definition.template,
+                certificate.id,
+                certificate.get_document_context(language_code),
+            )
+            pending[future] = certificate.id
+
+            if len(pending) >= 2 * max_workers:
+                done, __ = wait(pending, return_when=FIRST_COMPLETED)
+                write_completed(done)
+                yield stream.consume()
+
+        while pending:
+            done, __ = wait(pending, return_when=FIRST_COMPLETED)
+            write_completed(done)
+            yield stream.consume()
+
+    # Closing the archive writes its central directory
+    yield stream.consume()
@@ -0,0 +1,293 @@
+"""
+Public catalog of courses and products: latest update of their representations and
+snapshots of these representations published as static JSON files to a storage
+"""
+import hashlib
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import DateTimeField, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone, translation
+
+from rest_framework.renderers import JSONRenderer
+
+from joanie.core import models, serializers
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MANIFEST_NAME = "manifest.json"
+SNAPSHOT_MANIFEST_LOCK_KEY = "catalog_snapshot_manifest_lock"
+SNAPSHOT_MANIFEST_LOCK_TIMEOUT = 10
+SNAPSHOT_MANIFEST_LOCK_POLL_INTERVAL = 0.1
+
+
+def max_updated_on(queryset):
+    """Return a subquery of the latest update of a queryset, null if it is empty."""
+    return Subquery(
+        queryset.order_by().values(
+            latest=Func(F("updated_on"), function="MAX", output_field=DateTimeField())
+        )
+    )
+
+
+def annotate_last_modified(queryset, related_querysets):
+    """
+    Annotate a queryset with the latest update of its objects and of the related
+    objects returned by `related_querysets`, filtered on `OuterRef("pk")`.
+    """
+    if not related_querysets:
+        return queryset.annotate(last_modified=F("updated_on"))
+
+    return queryset.annotate(
+        last_modified=Greatest(
+            F("updated_on"),
+            *(
+                Coalesce(max_updated_on(related_queryset), F("updated_on"))
+                for related_queryset in related_querysets
+            ),
+        )
+    )
+
+
+def get_course_related_querysets():
+    """
+    The course representation is made of its organization, its products with their
+    certificate definition and their target courses with their organization and
+    course runs.
+    """
+    course = OuterRef("pk")
+    return [
+        models.Organization.objects.filter(course=course),
+        models.Product.objects.filter(courses=course),
+        models.CertificateDefinition.objects.filter(product__courses=course),
+        models.ProductCourseRelation.objects.filter(product__courses=course),
+        models.Course.objects.filter(targeted_by_products__courses=course),
+        models.Organization.objects.filter(
+            course__targeted_by_products__courses=course
+        ),
+        models.CourseRun.objects.filter(course__targeted_by_products__courses=course),
+    ]
+
+
+def get_product_related_querysets():
+    """
+    The product representation is made of its certificate definition and its target
+    courses with their organization and course runs.
+    """
+    product = OuterRef("pk")
+    return [
+        models.CertificateDefinition.objects.filter(product=product),
+        models.ProductCourseRelation.objects.filter(product=product),
+        models.Course.objects.filter(targeted_by_products=product),
+        models.Organization.objects.filter(course__targeted_by_products=product),
+        models.CourseRun.objects.filter(course__targeted_by_products=product),
+    ]
+
+
+def get_catalog_resources(course_codes=None, product_ids=None):
+    """
+    Return the name of each catalog resource with the queryset of objects to snapshot,
+    their serializer class and the field identifying them. Objects can be restricted to
+    lists of course codes and product ids.
+    """
+    courses = annotate_last_modified(
+        models.Course.objects.select_related("organization"),
+        get_course_related_querysets(),
+    )
+    products = annotate_last_modified(
+        models.Product.objects.filter(courses__isnull=False)
+        .distinct()
+        .select_related("certificate_definition"),
+        get_product_related_querysets(),
+    )
+    if course_codes is not None:
+        courses = courses.filter(code__in=course_codes)
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+
+    return [
+        ("courses", courses.order_by("code"), serializers.CourseSerializer, "code"),
+        ("products", products.order_by("id"), serializers.ProductSerializer, "id"),
+    ]
+
+
+def get_snapshot_name(resource_name, identifier, language):
+    """Return the storage name of the snapshot of an object in a language."""
+    return (
+        f"{settings.JOANIE_CATALOG_SNAPSHOT_DIRECTORY}/"
+        f"{language}/{resource_name}/{identifier}.json"
+    )
+
+
+def get_manifest_name():
+    """Return the storage name of the manifest of catalog snapshots."""
+    return f"{settings.JOANIE_CATALOG_SNAPSHOT_DIRECTORY}/{SNAPSHOT_MANIFEST_NAME}"
+
+
+def read_manifest(storage):
+    """Return content hashes of published snapshots by storage name."""
+    name = get_manifest_name()
+    if not storage.exists(name):
+        return {}
+
+    with storage.open(name) as manifest:
+        return json.load(manifest)["files"]
+
+
+@contextmanager
+def lock_manifest():
+    """
+    Hold a lock shared through the cache while the manifest is read then written so
+    that concurrent publications do not lose each other's entries. It only excludes
+    other processes if the cache is shared by all processes, which is required when
+    snapshots are published on changes (see `joanie.core.utils.check_shared_cache`).
+    The lock expires
+    after `SNAPSHOT_MANIFEST_LOCK_TIMEOUT` seconds in case its holder died. Raise
+    `TimeoutError` if it cannot be acquired within this delay.
+    """
+    deadline = time.monotonic() + SNAPSHOT_MANIFEST_LOCK_TIMEOUT
+    while not cache.add(
+        SNAPSHOT_MANIFEST_LOCK_KEY, True, SNAPSHOT_MANIFEST_LOCK_TIMEOUT
+    ):
+        if time.monotonic() >= deadline:
+            raise TimeoutError("Cannot lock the catalog snapshot manifest.")
+        time.sleep(SNAPSHOT_MANIFEST_LOCK_POLL_INTERVAL)
+
+    try:
+        yield
+    finally:
+        cache.delete(SNAPSHOT_MANIFEST_LOCK_KEY)
+
+
+def write_file(storage, name, content):
+    """Write a file to the storage, replacing it if it exists."""
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def iter_snapshots(course_codes=None, product_ids=None):
+    """
+    Yield the storage name and the JSON content of the public representation of
+    each catalog object in each language.
+    """
+    renderer = JSONRenderer()
+    for (
+        resource_name,
+        queryset,
+        serializer_class,
+        lookup_field,
+    ) in get_catalog_resources(course_codes=course_codes, product_ids=product_ids):
+        for language, __ in settings.LANGUAGES:
+            with translation.override(language):
+                for instance in queryset.iterator():
+                    yield (
+                        get_snapshot_name(
+                            resource_name, getattr(instance, lookup_field), language
+                        ),
+                        renderer.render(serializer_class(instance).data),
+                    )
+
+
+def publish_catalog_snapshot(course_codes=None, product_ids=None, storage=None):
+    """
+    Render the public representation of courses and products in each language then
+    write it as a JSON file to the storage, the default one if not provided, along
+    with a manifest of content hashes.
+
+    Objects whose representation did not change since the last snapshot are not
+    written. Snapshots can be restricted to lists of course codes and product ids,
+    otherwise the whole catalog is published. Snapshots of requested objects which do
+    not belong to the public catalog anymore are deleted. The manifest is updated
+    under lock with the changed entries only so that concurrent publications do not
+    lose each other's entries. Return written, unchanged and deleted counts.
+    """
+    storage = storage or default_storage
+    manifest = read_manifest(storage)
+    is_partial = course_codes is not None or product_ids is not None
+    if is_partial:
+        course_codes, product_ids = course_codes or [], product_ids or []
+    unchanged_count = 0
+    written = {}
+    published = set()
+
+    for name, content in iter_snapshots(
+        course_codes=course_codes, product_ids=product_ids
+    ):
+        content_hash = hashlib.sha256(content).hexdigest()
+        published.add(name)
+
+        if manifest.get(name) == content_hash:
+            unchanged_count += 1
+            continue
+
+        write_file(storage, name, content)
+        written[name] = content_hash
+
+    if is_partial:
+        requested = {
+            get_snapshot_name(resource_name, identifier, language)
+            for resource_name, identifiers in (
+                ("courses", course_codes),
+                ("products", product_ids),
+            )
+            for identifier in identifiers
+            for language, __ in settings.LANGUAGES
+        }
+    else:
+        requested = set(manifest)
+
+    deleted = [name for name in requested - published if name in manifest]
+    for name in deleted:
+        storage.delete(name)
+
+    if written or deleted:
+        # Read the manifest again under lock as concurrent publications may have
+        # updated it meanwhile, then only apply the entries changed by this one
+        with lock_manifest():
+            manifest = read_manifest(storage)
+            manifest.update(written)
+            for name in deleted:
+                manifest.pop(name, None)
+            write_file(
+                storage,
+                get_manifest_name(),
+                json.dumps(
+                    {"generated_on": timezone.now().isoformat(), "files": manifest},
+                    sort_keys=True,
+                ).encode("utf-8"),
+            )
+
+    logger.info(
+        "Catalog snapshot published: %d written, %d unchanged, %d deleted.",
+        len(written),
+        unchanged_count,
+        len(deleted),
+    )
+    return len(written), unchanged_count, len(deleted)
+
+
+def get_affected_resources(course_ids=(), product_ids=()):
+    """
+    Return codes of courses and ids of products whose representation depends on the
+    given courses and products: products targeting a course and courses proposing a
+    product.
+    """
+    products = models.Product.objects.filter(
+        Q(pk__in=product_ids) | Q(target_courses__in=course_ids)
+    )
+    course_codes = models.Course.objects.filter(
+        Q(pk__in=course_ids) | Q(products__in=products)
+    ).values_list("code", flat=True)
+
+    return (
+        set(course_codes.distinct()),
+        {str(product_id) for product_id in products.values_list("id", flat=True)},
+    )
@@ -0,0 +1,116 @@
+"""
+Routing of database queries between the primary database and read replicas
+"""
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DATABASE = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_from_replicas = ContextVar("read_from_replicas", default=False)
+
+
+@contextmanager
+def use_replicas():
+    """
+    Route reads to read replicas, if any, within a block. It is meant for read-only
+    code paths which tolerate a replication lag.
+    """
+    token = _read_from_replicas.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Route reads to the primary database within a block, even inside a block using
+    replicas. It can also decorate a function.
+    """
+    token = _read_from_replicas.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+class ReplicaRouter:
+    """
+    A database router sending writes to the primary database and reads to the read
+    replicas declared in the `JOANIE_DATABASE_REPLICAS` setting when they are
+    allowed through `use_replicas`. Otherwise, reads go to the primary database so
+    that management commands and tests are not affected by the replication lag.
+    """
+
+    # pylint: disable=unused-argument
+    @staticmethod
+    def db_for_read(model, **hints):
+        """Choose a read replica at random if reads from replicas are allowed."""
+        replicas = settings.JOANIE_DATABASE_REPLICAS
+        if replicas and _read_from_replicas.get():
+            return random.choice(replicas)  # nosec
+        return PRIMARY_DATABASE
+
+    @staticmethod
+    def db_for_write(model, **hints):
+        """Always write to the primary database."""
+        return PRIMARY_DATABASE
+
+    @staticmethod
+    def allow_relation(obj1, obj2, **hints):
+        """Replicas hold the same data as the primary database."""
+        return True
+
+    @staticmethod
+    def allow_migrate(database, app_label, model_name=None, **hints):
+        """Only migrate the primary database, replicas are migrated by replication."""
+        return database not in settings.JOANIE_DATABASE_REPLICAS
+
+
+def get_primary_stickiness_key(request):
+    """
+    Return the cache key used to remember that a client wrote recently, computed
+    from its authorization header or its session cookie, or None for anonymous
+    clients.
+    """
+    credentials = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credentials:
+        return None
+    return f"primary_{hashlib.sha256(credentials.encode('utf-8')).hexdigest()}"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow reads from replicas for safe requests. Clients which sent an unsafe
+    request stick to the primary database for `JOANIE_DATABASE_REPLICA_STICKINESS`
+    seconds so that they read their own writes despite the replication lag. This is
+    remembered in the cache, which must be shared by all processes for requests
+    handled by other web workers (see `joanie.core.utils.check_shared_cache`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = get_primary_stickiness_key(request)
+
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if key is not None:
+                cache.set(key, True, settings.JOANIE_DATABASE_REPLICA_STICKINESS)
+            return response
+
+        if key is not None and cache.get(key):
+            return self.get_response(request)
+
+        with use_replicas():
+            return self.get_response(request)
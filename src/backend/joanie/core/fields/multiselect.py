@@ -1,7 +1,14 @@
-"""A multi select field where the array of values is stored as a comma separated string."""
+"""
+A multi select field where the array of values is stored as a native array on
+PostgreSQL and as a comma separated string on other databases.
+"""
+from django.contrib.postgres.indexes import GinIndex
 from django.core import checks, exceptions, validators
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.forms import MultipleChoiceField, widgets
+from django.utils.functional import cached_property
 from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext_lazy
@@ -61,11 +68,16 @@ class MultiSelectField(models.CharField):
     """
     A custom database field to store a list of string values.
     This is an alternative to Django's ArrayField that is compatible with Mysql.
-    The array of values is stored in a comma separated string.
+    The array of values is stored as a native array on PostgreSQL and in a comma
+    separated string on other databases.
     """
 
     description = _("Multi select field (up to %(max_choices)s choices)")
 
+    # Lookups inherited from CharField compare strings which do not make sense on a
+    # native array, only lookups behaving the same on all databases are allowed.
+    supported_lookups = ("exact", "isnull", "contains", "overlap")
+
     error_message = ngettext_lazy(
         "Value %(value)s is not a valid choice.",
         "Values %(value)s are not valid choices.",
@@ -137,6 +149,18 @@ class MultiSelectField(models.CharField):
 
         return []
 
+    def get_lookup(self, lookup_name):
+        """Only return lookups behaving the same on all databases."""
+        if lookup_name not in self.supported_lookups:
+            return None
+        return super().get_lookup(lookup_name)
+
+    def db_type(self, connection):
+        """Use a native array column on PostgreSQL."""
+        if connection.vendor == "postgresql":
+            return f"varchar({self.max_length:d})[]"
+        return super().db_type(connection)
+
     def check(self, **kwargs):
         """Add checks on max_choices to the field's checks."""
         res = [*super().check(**kwargs), *self._check_max_choices_attribute()]
@@ -145,6 +169,8 @@ class MultiSelectField(models.CharField):
     @staticmethod
     def from_db_value(value, *_args):
         """Convert a database value to a list value."""
+        if isinstance(value, list):
+            return value
         if not value:
             return None if value is None else []
         return list((v.strip() for v in value.split(",")))
@@ -178,11 +204,34 @@ class MultiSelectField(models.CharField):
             return None
         return ",".join(value)
 
+    def get_db_prep_value(self, value, connection, prepared=False):
+        """Keep the list value as is for PostgreSQL native arrays."""
+        if connection.vendor == "postgresql":
+            return None if value is None else list(self.to_python(value))
+        return super().get_db_prep_value(value, connection, prepared=prepared)
+
     def value_to_string(self, obj):
         """Serialize the Python value. We can use existing methods as it is a CharField."""
         value = self.value_from_object(obj)
         return self.get_prep_value(value)
 
+    @cached_property
+    def choice_keys(self):
+        """
+        Return the set of possible choices. It is computed once as building it
+        from hundreds of choices on each validation is costly.
+        """
+        choices = set()
+        for option_key, option_value in self.choices:
+            if isinstance(option_value, (list, tuple)):
+                # This is an optgroup, so look inside the group for
+                # options.
+                for optgroup_key, _optgroup_value in option_value:
+                    choices.add(optgroup_key)
+            else:
+                choices.add(option_key)
+        return frozenset(choices)
+
     def validate(self, value, model_instance):
         """
         Validate each value in values and raise a ValidationError if something is wrong.
@@ -192,19 +241,8 @@ class MultiSelectField(models.CharField):
             return
 
         if self.choices and value:
-            # Build a set of possible choices
-            choices = set()
-            for option_key, option_value in self.choices:
-                if isinstance(option_value, (list, tuple)):
-                    # This is an optgroup, so look inside the group for
-                    # options.
-                    for optgroup_key, _optgroup_value in option_value:
-                        choices.add(optgroup_key)
-                else:
-                    choices.add(option_key)
-
-            # Search each value in this set
-            invalid_choices = [v for v in value if v not in choices]
+            # Search each value in the set of possible choices
+            invalid_choices = [v for v in value if v not in self.choice_keys]
             if invalid_choices:
                 raise exceptions.ValidationError(
                     self.error_message,
@@ -261,3 +299,85 @@ class MultiSelectField(models.CharField):
                 )
 
             setattr(cls, f"get_{self.name}_display", func)
+
+
+class MultiSelectIndex(GinIndex):
+    """
+    A GIN index on a multi select field for its native array on PostgreSQL, used by
+    the `contains` and `overlap` lookups. Other databases store a comma separated
+    string so a regular index is created instead.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        """Only use GIN on PostgreSQL."""
+        if schema_editor.connection.vendor == "postgresql":
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        return models.Index.create_sql(
+            self, model, schema_editor, using=using, **kwargs
+        )
+
+
+class MultiSelectLookupMixin:
+    """
+    Look for rows of which the list value includes values of the right-hand side
+    list, using array operators on PostgreSQL and patterns on the comma separated
+    string on other databases.
+    """
+
+    array_operator = None
+    connector = None
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        """Prepare the right-hand side as a list of values."""
+        if isinstance(value, str):
+            value = [value]
+        if connection.vendor == "postgresql":
+            return "%s", [list(value)]
+        return "%s", [f"%,{v},%" for v in value]
+
+    def as_postgresql(self, compiler, connection):
+        """Use the native array operator."""
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        field_type = self.lhs.output_field.db_type(connection)
+        return (
+            f"{lhs} {self.array_operator} {rhs}::{field_type}",
+            [*lhs_params, *rhs_params],
+        )
+
+    def as_sql(self, compiler, connection):
+        """Match each value surrounded by commas in the comma separated string."""
+        lhs, lhs_params = compiler.compile(
+            Concat(Value(","), self.lhs, Value(","), output_field=models.CharField())
+        )
+        __, rhs_params = self.process_rhs(compiler, connection)
+        if not rhs_params:
+            return ("1 = 1", []) if self.connector == "AND" else ("1 = 0", [])
+        condition = f" {self.connector} ".join(f"{lhs} LIKE %s" for _ in rhs_params)
+        params = []
+        for rhs_param in rhs_params:
+            params.extend([*lhs_params, rhs_param])
+        return f"({condition})", params
+
+
+@MultiSelectField.register_lookup
+class MultiSelectContains(  # pylint: disable=abstract-method
+    MultiSelectLookupMixin, models.Lookup
+):
+    """Look for rows of which the list value includes all the given values."""
+
+    lookup_name = "contains"
+    array_operator = "@>"
+    connector = "AND"
+
+
+@MultiSelectField.register_lookup
+class MultiSelectOverlap(  # pylint: disable=abstract-method
+    MultiSelectLookupMixin, models.Lookup
+):
+    """Look for rows of which the list value includes any of the given values."""
+
+    lookup_name = "overlap"
+    array_operator = "&&"
+    connector = "OR"
@@ -3,8 +3,6 @@ API Resource Filters
 """
 from typing import List
 
-from django.db.models import Q
-
 from django_filters import rest_framework as filters
 
 from . import models
@@ -46,10 +44,7 @@ class OrderViewSetFilter(filters.FilterSet):
             )
 
         if value == ORDER_STATE_VALIDATED:
-            return queryset.filter(
-                Q(total=0) | Q(proforma_invoices__isnull=False),
-                is_canceled=False,
-            )
+            return queryset.validated()
 
         return queryset
 
@@ -0,0 +1,144 @@
+"""
+Cache of learner grades retrieved from LMS, shared by all enrollments of a learner to
+a course run and warmed up ahead of certificate generation
+"""
+import hashlib
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+from joanie.core.exceptions import GradeError
+from joanie.lms_handler import LMSHandler
+
+logger = logging.getLogger(__name__)
+
+# Value cached in place of a grade when the LMS failed to return it
+GRADE_ERROR = "error"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(stat):
+    """Increment a statistic of the grade cache."""
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def get_grade_cache_stats():
+    """
+    Return statistics of the grade cache in the current process: `hits`, `misses`,
+    `negative_hits` (failures served from cache) and `errors` (failed LMS requests).
+    """
+    with _stats_lock:
+        return {
+            stat: _stats[stat] for stat in ("hits", "misses", "negative_hits", "errors")
+        }
+
+
+def reset_grade_cache_stats():
+    """Reset statistics of the grade cache in the current process."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_grade_cache_key(username, resource_link):
+    """
+    Return the cache key of the grade of a learner to a course run. The resource link
+    is hashed as it may contain characters not supported by cache backends.
+    """
+    digest = hashlib.sha256(f"{username}|{resource_link}".encode("utf-8")).hexdigest()
+    return f"grade_{digest}"
+
+
+def get_grade(username, resource_link, force=False):
+    """
+    Retrieve the grade of a learner to a course run from the related LMS then store
+    the result in cache. A failure is cached for a shorter time so that the LMS is not
+    requested again for each enrollment check while it is failing. Return None if the
+    grade could not be retrieved.
+
+    If `force` is set, the cache is ignored and refreshed.
+    """
+    cache_key = get_grade_cache_key(username, resource_link)
+
+    if not force:
+        grade = cache.get(cache_key)
+        if grade == GRADE_ERROR:
+            _count("negative_hits")
+            return None
+        if grade is not None:
+            _count("hits")
+            return grade
+
+    _count("misses")
+    lms = LMSHandler.select_lms(resource_link)
+    if lms is None:
+        logger.error("Course run %s has no related lms.", resource_link)
+        return None
+
+    try:
+        grade = lms.get_grades(username=username, resource_link=resource_link)
+    except GradeError:
+        _count("errors")
+        cache.set(
+            cache_key, GRADE_ERROR, settings.JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL
+        )
+        return None
+
+    cache.set(cache_key, grade, settings.JOANIE_ENROLLMENT_GRADE_CACHE_TTL)
+    return grade
+
+
+def get_cached_grade(username, resource_link):
+    """
+    Return the grade of a learner to a course run if it is in cache, None otherwise.
+    The LMS is never requested.
+    """
+    grade = cache.get(get_grade_cache_key(username, resource_link))
+    return None if grade == GRADE_ERROR else grade
+
+
+def set_grade(username, resource_link, grade):
+    """
+    Store in cache the grade of a learner to a course run pushed by the LMS. It is
+    kept longer than polled grades so that it is still there for the next
+    certificate generation, which requires a cache shared by all processes.
+    """
+    cache.set(
+        get_grade_cache_key(username, resource_link),
+        grade,
+        settings.JOANIE_PUSHED_GRADE_CACHE_TTL,
+    )
+
+
+def warm_grades(learners, max_workers=None, force=False):
+    """
+    Retrieve grades of an iterable of `(username, resource_link)` tuples not already
+    in cache, requesting LMS concurrently within a bounded number of threads. Return
+    the number of grades retrieved and the number of failures.
+    """
+    if force:
+        learners = set(learners)
+    else:
+        learners = {
+            (username, resource_link)
+            for username, resource_link in learners
+            if cache.get(get_grade_cache_key(username, resource_link)) is None
+        }
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers or settings.JOANIE_GRADE_WARMUP_MAX_WORKERS
+    ) as executor:
+        grades = list(
+            executor.map(
+                lambda learner: get_grade(*learner, force=True), sorted(learners)
+            )
+        )
+
+    failed_count = grades.count(None)
+    return len(grades) - failed_count, failed_count
@@ -1,19 +1,38 @@
 """
 Helpers that can be useful throughout Joanie's core app
 """
+import logging
+from collections import defaultdict
+from itertools import islice
+
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
 from django.utils import timezone
 
-from joanie.core import enums, models
+from joanie.core import enums, grades, models
+from joanie.core.exceptions import GradeError
+from joanie.lms_handler import LMSHandler
+from joanie.lms_handler.resilience import RateLimiter
+from joanie.payment.models import ProformaInvoice
+
+logger = logging.getLogger(__name__)
 
+CANCEL_ORDERS_BATCH_SIZE = 1000
+RECONCILE_ENROLLMENTS_BATCH_SIZE = 500
 
-def generate_certificate_for_order(order):
+
+def generate_certificate_for_order(order, cached_only=False):
     """
     Check if order is eligible for certification then generate certificate if it is.
 
     Eligibility means that order contains
     one passed enrollment per graded courses.
 
+    If `cached_only` is set, grades are only read from the grade cache and the LMS is
+    never requested: an order with a grade missing from cache is not eligible.
+    Otherwise, GradeError is raised if a grade could not be retrieved from the LMS.
+
     Return:
         0: if the order is not eligible for certification
         1: if a certificate has been generated for the current order
@@ -45,7 +64,21 @@ def generate_certificate_for_order(order):
 
     # Otherwise, we now need to know if each enrollment has been passed
     for enrollment in course_enrollments:
-        if enrollment.is_passed is False:
+        if cached_only:
+            grade = grades.get_cached_grade(
+                enrollment.user.username, enrollment.course_run.resource_link
+            )
+            is_passed = grade["passed"] if grade else False
+        else:
+            grade = enrollment.get_grade()
+            if grade is None:
+                raise GradeError(
+                    f"Grade of {enrollment.user.username:s} to course run "
+                    f"{enrollment.course_run.resource_link:s} is not available."
+                )
+            is_passed = grade["passed"]
+
+        if is_passed is False:
             # If one enrollment has not been passed, no need to continue,
             # We are sure that order is not eligible for certification.
             return 0
@@ -58,26 +91,420 @@ def generate_certificate_for_order(order):
     return 1
 
 
-def generate_certificates_for_orders(orders):
+def get_orders_to_certify(orders):
+    """Restrict orders to validated orders of certifying products without certificate."""
+    return orders.validated().filter(
+        certificate__isnull=True,
+        product__type__in=enums.PRODUCT_TYPE_CERTIFICATE_ALLOWED,
+    )
+
+
+def get_learners_to_certify(orders):
+    """
+    Return `(username, resource_link)` tuples of the active enrollments of owners of
+    orders to be certified to started gradable course runs of their graded courses,
+    whose grades are needed to check eligibility for certification.
+    """
+    return (
+        models.Enrollment.objects.filter(
+            course_run__course__order_relations__order__in=get_orders_to_certify(
+                orders
+            ).values("pk"),
+            course_run__course__order_relations__order__owner=F("user"),
+            course_run__course__order_relations__is_graded=True,
+            course_run__is_gradable=True,
+            course_run__start__lte=timezone.now(),
+            is_active=True,
+        )
+        .values_list("user__username", "course_run__resource_link")
+        .distinct()
+    )
+
+
+def generate_certificates_for_orders(orders, cached_only=False, on_failure=None):
     """
     Iterate over the provided orders and check if they are eligible for certification
-    then return the count of generated certificates.
+    then return the count of generated certificates. If `cached_only` is set, only
+    grades in cache are considered (see `generate_certificate_for_order`).
+
+    Orders whose eligibility could not be checked because a grade was not available
+    are not certified and passed to the optional `on_failure` callable.
     """
     total = 0
 
-    orders = [
-        order
-        for order in orders.filter(
-            is_canceled=False,
-            certificate__isnull=True,
-            product__type__in=enums.PRODUCT_TYPE_CERTIFICATE_ALLOWED,
+    orders = get_orders_to_certify(orders).select_related("course__organization")
+
+    for order in orders.iterator():
+        try:
+            total += generate_certificate_for_order(order, cached_only=cached_only)
+        except GradeError as error:
+            logger.warning("Order %s cannot be checked: %s", order.pk, error)
+            if on_failure is not None:
+                on_failure(order)
+
+    return total
+
+
+def get_orders_changed_since(orders, since):
+    """
+    Restrict orders to those whose eligibility for certification may have changed
+    since the provided date: orders updated, paid, or whose course relations changed,
+    and orders of which an active enrollment of the owner to a target course changed,
+    is related to a course run which changed or to a gradable course run which was
+    still running at that date as the learner grade may have changed in the LMS.
+    """
+    enrollments = models.Enrollment.objects.filter(
+        user=OuterRef("owner"),
+        course_run__course__order_relations__order=OuterRef("pk"),
+        is_active=True,
+    ).filter(
+        Q(updated_on__gte=since)
+        | Q(course_run__updated_on__gte=since)
+        | (
+            Q(course_run__is_gradable=True, course_run__start__lte=timezone.now())
+            & (Q(course_run__end__isnull=True) | Q(course_run__end__gte=since))
+        )
+    )
+
+    return orders.filter(
+        Q(updated_on__gte=since)
+        | Exists(
+            ProformaInvoice.objects.filter(order=OuterRef("pk"), created_on__gte=since)
+        )
+        | Exists(
+            models.OrderCourseRelation.objects.filter(
+                order=OuterRef("pk"), updated_on__gte=since
+            )
         )
-        .select_related("course__organization")
-        .iterator()
-        if order.state == enums.ORDER_STATE_VALIDATED
+        | Exists(enrollments)
+    )
+
+
+def get_orders_for_learners(learners):
+    """
+    Return orders of which the owner has an active enrollment to a course run of a
+    target course, for an iterable of `(username, resource_link)` tuples.
+    """
+    learners = set(learners)
+    enrollment_ids = [
+        enrollment_id
+        for enrollment_id, username, resource_link in models.Enrollment.objects.filter(
+            is_active=True,
+            user__username__in={username for username, _ in learners},
+            course_run__resource_link__in={link for _, link in learners},
+        ).values_list("pk", "user__username", "course_run__resource_link")
+        if (username, resource_link) in learners
     ]
 
-    for order in orders:
-        total += generate_certificate_for_order(order)
+    return models.Order.objects.filter(
+        Exists(
+            models.Enrollment.objects.filter(
+                pk__in=enrollment_ids,
+                user=OuterRef("owner"),
+                course_run__course__order_relations__order=OuterRef("pk"),
+            )
+        )
+    )
+
+
+def get_enrollments_to_deactivate_on_cancel(order_ids):
+    """
+    Return, in a single query, the active enrollments that must be deactivated when
+    the orders which ids are provided get canceled.
+
+    It applies the same rules as `Order.cancel` to all orders at once: enrollments to
+    course runs which are not listed are deactivated unless the owner still owns,
+    through an order which is not canceled, another product targeting the course.
+    """
+    canceled_orders = models.Order.objects.filter(
+        pk__in=order_ids,
+        owner=OuterRef("user"),
+        target_courses=OuterRef("course_run__course"),
+    )
+    other_orders = models.Order.objects.filter(
+        is_canceled=False,
+        owner=OuterRef("user"),
+        product__target_courses=OuterRef("course_run__course"),
+    ).exclude(
+        product__in=models.Order.objects.filter(
+            pk__in=order_ids, owner=OuterRef(OuterRef("user"))
+        ).values("product")
+    )
+
+    return models.Enrollment.objects.filter(
+        Exists(canceled_orders),
+        ~Exists(other_orders),
+        course_run__is_listed=False,
+        is_active=True,
+    )
+
+
+def unenroll_from_lms(enrollments):
+    """
+    Unenroll users from the LMS for the provided `(pk, username, resource_link)`
+    tuples, grouping enrollments by backend, then update the state of enrollments in
+    bulk depending on whether the LMS call succeeded. Backends call the LMS once per
+    enrollment so this should not be called within a database transaction.
+
+    Return the number of enrollments unenrolled.
+    """
+    enrollments_by_link = defaultdict(list)
+    for enrollment_id, username, resource_link in enrollments:
+        enrollments_by_link[resource_link].append((enrollment_id, username))
+
+    failed_ids = []
+    for lms, resource_links in LMSHandler.group_by_lms(enrollments_by_link.keys()):
+        if lms is None:
+            for resource_link in resource_links:
+                logger.error(
+                    'No LMS configuration found for course run: "%s".', resource_link
+                )
+                failed_ids.extend(pk for pk, _ in enrollments_by_link[resource_link])
+            continue
+
+        ids_by_enrollment = {
+            (username, resource_link): pk
+            for resource_link in resource_links
+            for pk, username in enrollments_by_link[resource_link]
+        }
+        failed = lms.set_enrollments(ids_by_enrollment.keys(), active=False)
+        for username, resource_link in failed:
+            logger.error('Enrollment failed for course run "%s".', resource_link)
+            failed_ids.append(ids_by_enrollment[(username, resource_link)])
+
+    enrollment_ids = [
+        pk for links in enrollments_by_link.values() for pk, _username in links
+    ]
+    now = timezone.now()
+    models.Enrollment.objects.filter(pk__in=enrollment_ids).exclude(
+        pk__in=failed_ids
+    ).update(state=enums.ENROLLMENT_STATE_SET, updated_on=now)
+    models.Enrollment.objects.filter(pk__in=failed_ids).update(
+        state=enums.ENROLLMENT_STATE_FAILED, updated_on=now
+    )
+
+    return len(enrollment_ids)
+
+
+def cancel_orders(orders, batch_size=CANCEL_ORDERS_BATCH_SIZE, on_progress=None):
+    """
+    Cancel all the provided orders with a constant number of queries per batch
+    rather than calling `Order.cancel` on each of them.
+
+    For each batch of orders, enrollments to deactivate are computed with one query
+    then enrollments and orders are updated in bulk within a transaction. Once it is
+    committed, users are unenrolled from the LMS, one call per enrollment, so that no
+    transaction is held open while waiting for the LMS. Enrollments for which the LMS
+    call failed are marked as failed to be reconciled later. If provided,
+    `on_progress` is called after each batch with the number of orders processed so
+    far and the total number of orders to cancel.
+
+    Return the number of orders canceled.
+    """
+    order_ids = list(orders.filter(is_canceled=False).values_list("pk", flat=True))
+    total = len(order_ids)
+
+    processed = 0
+    order_ids = iter(order_ids)
+    while batch_ids := list(islice(order_ids, batch_size)):
+        with transaction.atomic():
+            enrollments = list(
+                get_enrollments_to_deactivate_on_cancel(batch_ids).values_list(
+                    "pk", "user__username", "course_run__resource_link"
+                )
+            )
+            now = timezone.now()
+            models.Enrollment.objects.filter(
+                pk__in=[enrollment[0] for enrollment in enrollments]
+            ).update(is_active=False, updated_on=now)
+            models.Order.objects.filter(pk__in=batch_ids).update(
+                is_canceled=True, updated_on=now
+            )
+
+        unenroll_from_lms(enrollments)
+
+        processed += len(batch_ids)
+        if on_progress is not None:
+            on_progress(processed, total)
 
     return total
+
+
+def get_enrollments_to_reconcile(stale_before=None):
+    """
+    Return enrollments whose state in the LMS may differ from Joanie: enrollments
+    which failed or were never set and, if a date is provided, enrollments set but not
+    updated since this date.
+    """
+    query = Q(state__in=[enums.ENROLLMENT_STATE_FAILED, ""])
+    if stale_before is not None:
+        query |= Q(state=enums.ENROLLMENT_STATE_SET, updated_on__lt=stale_before)
+
+    return models.Enrollment.objects.filter(query)
+
+
+def check_lms_enrollments(lms, enrollments, max_workers=1, rate_limiter=None):
+    """
+    Check the state in the LMS of enrollments given as a dictionary of
+    `(pk, is_active)` by `(username, resource_link)` tuples.
+
+    Return ids of enrollments in sync, ids of enrollments whose state could not be
+    retrieved and tuples of enrollments which differ by activity to set in the LMS.
+    """
+    in_sync_ids, unchecked_ids = [], []
+    to_set = {True: [], False: []}
+    lms_states = lms.get_enrollments(
+        enrollments.keys(), max_workers=max_workers, rate_limiter=rate_limiter
+    )
+    for enrollment, lms_is_active in lms_states.items():
+        enrollment_id, is_active = enrollments[enrollment]
+        if lms_is_active is None:
+            unchecked_ids.append(enrollment_id)
+        elif lms_is_active == is_active:
+            in_sync_ids.append(enrollment_id)
+        else:
+            to_set[is_active].append(enrollment)
+
+    return in_sync_ids, unchecked_ids, to_set
+
+
+def set_lms_enrollments(  # pylint: disable=too-many-arguments
+    lms, enrollments, to_set, max_workers=1, rate_limiter=None, dry_run=False
+):
+    """
+    Set in the LMS the activity of enrollments given as lists of
+    `(username, resource_link)` tuples by activity, their ids being found in the
+    `enrollments` dictionary of `(pk, is_active)` by tuple. The LMS is requested
+    within `max_workers` threads through the `rate_limiter` if provided, and is not
+    called if `dry_run` is set.
+
+    Return ids of enrollments set and ids of enrollments which failed.
+    """
+    set_ids, failed_ids = [], []
+    for active, enrollments_to_set in to_set.items():
+        failed = (
+            set()
+            if dry_run or not enrollments_to_set
+            else set(
+                lms.set_enrollments(
+                    enrollments_to_set,
+                    active=active,
+                    max_workers=max_workers,
+                    rate_limiter=rate_limiter,
+                )
+            )
+        )
+        for enrollment in enrollments_to_set:
+            if enrollment in failed:
+                logger.error('Enrollment failed for course run "%s".', enrollment[1])
+                failed_ids.append(enrollments[enrollment][0])
+            else:
+                set_ids.append(enrollments[enrollment][0])
+
+    return set_ids, failed_ids
+
+
+def reconcile_enrollment_batch(  # pylint: disable=too-many-locals
+    enrollments, max_workers=1, rate_limiter=None, dry_run=False
+):
+    """
+    Check the state of a batch of `(pk, username, resource_link, is_active)` tuples in
+    the LMS, set again in the LMS those which differ then update the state of all
+    enrollments in bulk. Enrollments whose state could not be retrieved from the LMS
+    are left untouched. Nothing is written if `dry_run` is set.
+
+    Return the number of enrollments in sync, set again (to set again on dry run),
+    failing and unchecked.
+    """
+    enrollments_by_link = defaultdict(dict)
+    for enrollment_id, username, resource_link, is_active in enrollments:
+        enrollments_by_link[resource_link][(username, resource_link)] = (
+            enrollment_id,
+            is_active,
+        )
+
+    in_sync_ids, set_ids, failed_ids, unchecked_ids = [], [], [], []
+    for lms, resource_links in LMSHandler.group_by_lms(enrollments_by_link.keys()):
+        enrollments = {}
+        for resource_link in resource_links:
+            enrollments.update(enrollments_by_link[resource_link])
+
+        if lms is None:
+            for resource_link in resource_links:
+                logger.error(
+                    'No LMS configuration found for course run: "%s".', resource_link
+                )
+            failed_ids.extend(
+                enrollment_id for enrollment_id, _ in enrollments.values()
+            )
+            continue
+
+        lms_in_sync_ids, lms_unchecked_ids, to_set = check_lms_enrollments(
+            lms, enrollments, max_workers=max_workers, rate_limiter=rate_limiter
+        )
+        in_sync_ids.extend(lms_in_sync_ids)
+        unchecked_ids.extend(lms_unchecked_ids)
+
+        lms_set_ids, lms_failed_ids = set_lms_enrollments(
+            lms,
+            enrollments,
+            to_set,
+            max_workers=max_workers,
+            rate_limiter=rate_limiter,
+            dry_run=dry_run,
+        )
+        set_ids.extend(lms_set_ids)
+        failed_ids.extend(lms_failed_ids)
+
+    if not dry_run:
+        now = timezone.now()
+        models.Enrollment.objects.filter(pk__in=in_sync_ids + set_ids).update(
+            state=enums.ENROLLMENT_STATE_SET, updated_on=now
+        )
+        models.Enrollment.objects.filter(pk__in=failed_ids).update(
+            state=enums.ENROLLMENT_STATE_FAILED, updated_on=now
+        )
+
+    return len(in_sync_ids), len(set_ids), len(failed_ids), len(unchecked_ids)
+
+
+def reconcile_enrollments(  # pylint: disable=too-many-arguments
+    enrollments,
+    batch_size=RECONCILE_ENROLLMENTS_BATCH_SIZE,
+    max_workers=1,
+    rate=None,
+    dry_run=False,
+    after=None,
+    on_progress=None,
+):
+    """
+    Reconcile the provided enrollments with the LMS by batches ordered by primary key
+    (see `reconcile_enrollment_batch`), requesting the LMS within `max_workers`
+    threads and starting no more than `rate` LMS calls per second if provided.
+
+    Enrollments up to the `after` primary key are skipped so that an interrupted
+    reconciliation can be resumed. If provided, `on_progress` is called after each
+    batch with the counts so far and the primary key of the last enrollment processed.
+
+    Return the number of enrollments in sync, set again, failing and unchecked.
+    """
+    enrollments = enrollments.order_by("pk").values_list(
+        "pk", "user__username", "course_run__resource_link", "is_active"
+    )
+    rate_limiter = RateLimiter(rate)
+    counts = (0, 0, 0, 0)
+
+    while batch := list(
+        (enrollments if after is None else enrollments.filter(pk__gt=after))[
+            :batch_size
+        ]
+    ):
+        batch_counts = reconcile_enrollment_batch(
+            batch, max_workers=max_workers, rate_limiter=rate_limiter, dry_run=dry_run
+        )
+        counts = tuple(map(sum, zip(counts, batch_counts)))
+        after = batch[-1][0]
+        if on_progress is not None:
+            on_progress(counts, after)
+
+    return counts
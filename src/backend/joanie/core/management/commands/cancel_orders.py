@@ -0,0 +1,80 @@
+"""Management command to cancel orders in bulk."""
+import logging
+
+from django.core.management import BaseCommand, CommandError
+
+from joanie.core import models
+from joanie.core.helpers import CANCEL_ORDERS_BATCH_SIZE, cancel_orders
+
+logger = logging.getLogger("joanie.core.cancel_orders")
+
+
+class Command(BaseCommand):
+    """
+    A command to cancel orders in bulk.
+
+    Orders are canceled by batches: related enrollments are deactivated and orders
+    are marked as canceled with a constant number of queries per batch, then users
+    are unenrolled from the LMS once the batch is committed. The progress is
+    reported after each batch.
+
+    Through options, you must restrict this command to a list of courses (-c),
+    products (-p) or orders (-o).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help="Accept a single or a list of course code to cancel related orders.",
+        )
+        parser.add_argument(
+            "-p",
+            "--products",
+            "--product",
+            nargs="+",
+            help="Accept a single or a list of product id to cancel related orders.",
+        )
+        parser.add_argument(
+            "-o",
+            "--orders",
+            "--order",
+            nargs="+",
+            help="Accept a single or a list of order id to cancel.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CANCEL_ORDERS_BATCH_SIZE,
+            help="Number of orders canceled per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Retrieve orders matching the options then cancel them by batches."""
+        filters = {}
+        if options["orders"]:
+            filters["id__in"] = options["orders"]
+        if options["courses"]:
+            filters["course__code__in"] = options["courses"]
+        if options["products"]:
+            filters["product__id__in"] = options["products"]
+
+        if not filters:
+            raise CommandError(
+                "You must restrict the orders to cancel with courses, products "
+                "or orders option."
+            )
+
+        def report_progress(processed, total):
+            logger.info("%d/%d orders canceled.", processed, total)
+
+        count = cancel_orders(
+            models.Order.objects.filter(**filters),
+            batch_size=options["batch_size"],
+            on_progress=report_progress,
+        )
+        logger.info("%d orders have been canceled.", count)
@@ -5,7 +5,13 @@ from django.core.management import BaseCommand
 from django.utils.translation import ngettext_lazy
 
 from joanie.core import models
-from joanie.core.helpers import generate_certificates_for_orders
+from joanie.core.grades import warm_grades
+from joanie.core.helpers import (
+    generate_certificates_for_orders,
+    get_learners_to_certify,
+    get_orders_changed_since,
+)
+from joanie.lms_handler.resilience import log_lms_metrics
 
 logger = logging.getLogger("joanie.core.generate_certificates")
 
@@ -18,6 +24,16 @@ class Command(BaseCommand):
 
     Through options, you are able to restrict this command
     to a list of courses (-c), products (-p) or orders (-o).
+
+    Grades of learners are first retrieved from LMS concurrently (see the -w option)
+    and stored in cache, so that checking eligibility of orders in turn does not wait
+    for each of them.
+
+    With the --incremental option, only orders whose eligibility may have changed
+    since the last completed run over all orders are reviewed. All orders are reviewed
+    if no run completed yet. A run during which some grades could not be retrieved
+    from LMS is not completed, so that the next incremental run reviews these orders
+    again.
     """
 
     help = __doc__
@@ -50,6 +66,24 @@ class Command(BaseCommand):
                 "this/those order(s)."
             ),
         )
+        parser.add_argument(
+            "-w",
+            "--max-workers",
+            type=int,
+            help=(
+                "Number of concurrent LMS requests to retrieve grades, defaults to "
+                "the JOANIE_GRADE_WARMUP_MAX_WORKERS setting."
+            ),
+        )
+
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Only review orders which changed since the last completed run over "
+                "all orders."
+            ),
+        )
 
     # pylint: disable=too-many-locals
     def handle(self, *args, **options):
@@ -92,9 +126,41 @@ class Command(BaseCommand):
             if product_ids:
                 filters.update({"product__id__in": product_ids})
 
+        orders = models.Order.objects.filter(**filters)
+        since = None
+        if options["incremental"]:
+            since = models.CertificateGenerationRun.get_watermark()
+            if since is None:
+                logger.info("No run completed yet, all orders are reviewed.")
+            else:
+                orders = get_orders_changed_since(orders, since)
+
+        # Only runs over all orders move the watermark
+        run = (
+            None
+            if filters
+            else models.CertificateGenerationRun.objects.create(is_full=since is None)
+        )
+
+        warm_grades(get_learners_to_certify(orders), max_workers=options["max_workers"])
+        failed_orders = []
         certificate_generated_count = generate_certificates_for_orders(
-            models.Order.objects.filter(**filters)
+            orders, on_failure=failed_orders.append
         )
+
+        if failed_orders:
+            logger.warning(
+                "%d order(s) could not be checked as grades are not available.",
+                len(failed_orders),
+            )
+
+        if run is not None:
+            # Moving the watermark would skip failed orders of course runs which
+            # ended meanwhile in next incremental runs
+            run.is_completed = not failed_orders
+            run.certificates_count = certificate_generated_count
+            run.save()
+
         logger.info(
             ngettext_lazy(
                 "%d certificate has been generated.",
@@ -103,3 +169,4 @@ class Command(BaseCommand):
             ),
             certificate_generated_count,
         )
+        log_lms_metrics()
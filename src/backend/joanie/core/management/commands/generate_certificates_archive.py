@@ -0,0 +1,81 @@
+"""Management command to generate an archive of certificate documents."""
+import logging
+from datetime import date
+
+from django.core.management import BaseCommand
+
+from joanie.core.archives import (
+    generate_certificates_archive,
+    get_certificates_queryset,
+)
+
+logger = logging.getLogger("joanie.core.generate_certificates_archive")
+
+
+class Command(BaseCommand):
+    """
+    A command to generate a ZIP archive of certificate documents in PDF format.
+
+    Documents are rendered in a pool of processes (--workers) and written to the
+    archive as soon as they are rendered. Through options, you are able to restrict
+    the archive to a list of courses (-c), products (-p) or to certificates issued
+    in a date range (--since, --until).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the ZIP archive to write.")
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help=(
+                "Accept a single or a list of course code to restrict archive to "
+                "this/those course(s)."
+            ),
+        )
+        parser.add_argument(
+            "-p",
+            "--products",
+            "--product",
+            nargs="+",
+            help=(
+                "Accept a single or a list of product id to restrict archive to "
+                "this/those product(s)."
+            ),
+        )
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Only archive certificates issued on or after this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            help="Only archive certificates issued on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of processes rendering certificate documents.",
+        )
+
+    def handle(self, *args, **options):
+        """Write the archive to the output file as it is generated."""
+        certificates = get_certificates_queryset(
+            course_codes=options["courses"],
+            product_ids=options["products"],
+            since=options["since"],
+            until=options["until"],
+        )
+        count = certificates.count()
+
+        with open(options["output"], "wb") as output:
+            for chunk in generate_certificates_archive(
+                certificates, max_workers=options["workers"]
+            ):
+                output.write(chunk)
+
+        logger.info("%d certificate(s) archived to %s.", count, options["output"])
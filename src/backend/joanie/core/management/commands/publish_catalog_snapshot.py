@@ -0,0 +1,57 @@
+"""Management command to publish a snapshot of the catalog to the storage."""
+import logging
+
+from django.core.management import BaseCommand
+
+from joanie.core.catalog import publish_catalog_snapshot
+
+logger = logging.getLogger("joanie.core.publish_catalog_snapshot")
+
+
+class Command(BaseCommand):
+    """
+    A command to publish the public representation of courses and products in each
+    language as JSON files to the default storage, with a manifest of their content
+    hashes, so that the catalog can be served by a CDN.
+
+    Objects whose representation did not change since the last snapshot are not
+    written again. Through options, you are able to restrict the snapshot to a list
+    of courses (-c) or products (-p).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help=(
+                "Accept a single or a list of course code to restrict the snapshot to "
+                "this/those course(s)."
+            ),
+        )
+        parser.add_argument(
+            "-p",
+            "--products",
+            "--product",
+            nargs="+",
+            help=(
+                "Accept a single or a list of product id to restrict the snapshot to "
+                "this/those product(s)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """Publish the snapshot then report written, unchanged and deleted files."""
+        written, unchanged, deleted = publish_catalog_snapshot(
+            course_codes=options["courses"], product_ids=options["products"]
+        )
+
+        logger.info(
+            "%d snapshot(s) written, %d unchanged and %d deleted.",
+            written,
+            unchanged,
+            deleted,
+        )
@@ -0,0 +1,135 @@
+"""Management command to reconcile enrollments with the LMS."""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from joanie.core.helpers import (
+    RECONCILE_ENROLLMENTS_BATCH_SIZE,
+    get_enrollments_to_reconcile,
+    reconcile_enrollments,
+)
+from joanie.lms_handler.resilience import log_lms_metrics
+
+logger = logging.getLogger("joanie.core.reconcile_enrollments")
+
+
+class Command(BaseCommand):
+    """
+    A command to reconcile with the LMS the enrollments which failed or were never
+    set and, through the --stale-days option, those not updated for a number of days.
+
+    Enrollments are processed by batches ordered by id: their state in the LMS is
+    checked concurrently, those which differ are set again in the LMS and their state
+    is updated in bulk. Enrollments whose state cannot be retrieved from the LMS are
+    reported as unchecked and left untouched. The id of the last enrollment processed
+    is reported after each batch so that an interrupted reconciliation can be resumed
+    with the --after option.
+
+    Through options, you are able to restrict this command to a list of courses (-c)
+    and to only report what would be done (--dry-run).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help=(
+                "Accept a single or a list of course code to restrict reconciliation "
+                "to this/those course(s)."
+            ),
+        )
+        parser.add_argument(
+            "--stale-days",
+            type=int,
+            help="Also reconcile enrollments set but not updated for this many days.",
+        )
+        parser.add_argument(
+            "--after",
+            help="Resume reconciliation after the enrollment with this id.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECONCILE_ENROLLMENTS_BATCH_SIZE,
+            help="Number of enrollments reconciled per batch.",
+        )
+        parser.add_argument(
+            "-w",
+            "--max-workers",
+            type=int,
+            help=(
+                "Number of concurrent LMS requests, defaults to the "
+                "JOANIE_LMS_MAX_CONCURRENT_REQUESTS setting."
+            ),
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="Maximum number of LMS requests started per second.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check enrollments in the LMS without setting nor updating them.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Retrieve enrollments to reconcile then reconcile them by batches reporting the
+        progress.
+        """
+        stale_before = None
+        if options["stale_days"] is not None:
+            stale_before = timezone.now() - timedelta(days=options["stale_days"])
+
+        enrollments = get_enrollments_to_reconcile(stale_before=stale_before)
+        if options["courses"]:
+            enrollments = enrollments.filter(
+                course_run__course__code__in=options["courses"]
+            )
+
+        dry_run = options["dry_run"]
+
+        def report_progress(counts, last_id):
+            logger.info(
+                "%d in sync, %d %s, %d failed and %d unchecked so far, "
+                "last enrollment: %s.",
+                counts[0],
+                counts[1],
+                "to set again" if dry_run else "set again",
+                counts[2],
+                counts[3],
+                last_id,
+            )
+
+        (
+            in_sync_count,
+            set_count,
+            failed_count,
+            unchecked_count,
+        ) = reconcile_enrollments(
+            enrollments,
+            batch_size=options["batch_size"],
+            max_workers=options["max_workers"]
+            or settings.JOANIE_LMS_MAX_CONCURRENT_REQUESTS,
+            rate=options["rate"],
+            dry_run=dry_run,
+            after=options["after"],
+            on_progress=report_progress,
+        )
+        logger.info(
+            "%d enrollment(s) in sync, %d %s, %d failed and %d unchecked.",
+            in_sync_count,
+            set_count,
+            "to set again" if dry_run else "set again",
+            failed_count,
+            unchecked_count,
+        )
+        log_lms_metrics()
@@ -0,0 +1,95 @@
+"""Management command to warm up the cache of learner grades."""
+import logging
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from joanie.core import models
+from joanie.core.grades import (
+    get_grade_cache_stats,
+    reset_grade_cache_stats,
+    warm_grades,
+)
+from joanie.core.utils import is_cache_shared
+from joanie.lms_handler.resilience import log_lms_metrics
+
+logger = logging.getLogger("joanie.core.warm_grades")
+
+
+class Command(BaseCommand):
+    """
+    A command to retrieve from LMS the grades of all active enrollments to started
+    gradable course runs and store them in cache, requesting LMS concurrently, so that
+    web workers checking enrollments do not wait for each of them in turn. The cache
+    must be shared by all processes, otherwise grades would be lost when this command
+    exits. The `generate_certificates` command warms grades up by itself.
+
+    Grades already in cache are not retrieved again unless the --force option is used.
+    Through options, you are able to restrict this command to a list of courses (-c)
+    and to set the number of concurrent LMS requests (-w).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help=(
+                "Accept a single or a list of course code to restrict warmup to "
+                "this/those course(s)."
+            ),
+        )
+        parser.add_argument(
+            "-w",
+            "--max-workers",
+            type=int,
+            help=(
+                "Number of concurrent LMS requests, defaults to the "
+                "JOANIE_GRADE_WARMUP_MAX_WORKERS setting."
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Retrieve grades again even if they are already in cache.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Retrieve grades of learners enrolled to gradable course runs then report the
+        grade cache statistics and LMS metrics. Refuse to run with a cache local to
+        this process.
+        """
+        if not is_cache_shared():
+            raise CommandError(
+                "The cache is local to each process, grades retrieved by this "
+                "command would be lost when it exits."
+            )
+
+        enrollments = models.Enrollment.objects.filter(
+            is_active=True,
+            course_run__is_gradable=True,
+            course_run__start__lte=timezone.now(),
+        )
+        if options["courses"]:
+            enrollments = enrollments.filter(
+                course_run__course__code__in=options["courses"]
+            )
+
+        reset_grade_cache_stats()
+        retrieved_count, failed_count = warm_grades(
+            enrollments.values_list("user__username", "course_run__resource_link"),
+            max_workers=options["max_workers"],
+            force=options["force"],
+        )
+
+        logger.info(
+            "%d grade(s) retrieved and %d failed. Grade cache statistics: %s.",
+            retrieved_count,
+            failed_count,
+            get_grade_cache_stats(),
+        )
+        log_lms_metrics()
@@ -0,0 +1,179 @@
+# Generated by Django 4.0.10 on 2026-10-19 11:00
+
+from django.db import migrations
+
+import joanie.core.fields.multiselect
+
+
+def get_languages_data_type(schema_editor):
+    """Return the data type of the course run languages column."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'joanie_course_run' AND column_name = 'languages'"
+        )
+        return cursor.fetchone()[0]
+
+
+# pylint: disable=unused-argument
+def languages_to_array(apps, schema_editor):
+    """
+    On PostgreSQL, convert the comma separated string of course run languages to the
+    native array the field now declares. Databases created since then already have
+    a native array.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    if get_languages_data_type(schema_editor) != "ARRAY":
+        schema_editor.execute(
+            "ALTER TABLE joanie_course_run ALTER COLUMN languages "
+            "TYPE varchar(255)[] USING string_to_array(languages, ',')"
+        )
+
+
+# pylint: disable=unused-argument
+def languages_to_string(apps, schema_editor):
+    """Store course run languages as a comma separated string again."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    if get_languages_data_type(schema_editor) == "ARRAY":
+        schema_editor.execute(
+            "ALTER TABLE joanie_course_run ALTER COLUMN languages "
+            "TYPE varchar(255) USING array_to_string(languages, ',')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        # The field declares a native array column on PostgreSQL through its
+        # `db_type`: the state records the field storage change while existing
+        # string columns are converted by the database operation.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(languages_to_array, languages_to_string),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="courserun",
+                    name="languages",
+                    field=joanie.core.fields.multiselect.MultiSelectField(
+                        choices=[
+                            ("af", "Afrikaans"),
+                            ("ar", "Arabic"),
+                            ("ar-dz", "Algerian Arabic"),
+                            ("ast", "Asturian"),
+                            ("az", "Azerbaijani"),
+                            ("bg", "Bulgarian"),
+                            ("be", "Belarusian"),
+                            ("bn", "Bengali"),
+                            ("br", "Breton"),
+                            ("bs", "Bosnian"),
+                            ("ca", "Catalan"),
+                            ("cs", "Czech"),
+                            ("cy", "Welsh"),
+                            ("da", "Danish"),
+                            ("de", "German"),
+                            ("dsb", "Lower Sorbian"),
+                            ("el", "Greek"),
+                            ("en", "English"),
+                            ("en-au", "Australian English"),
+                            ("en-gb", "British English"),
+                            ("eo", "Esperanto"),
+                            ("es", "Spanish"),
+                            ("es-ar", "Argentinian Spanish"),
+                            ("es-co", "Colombian Spanish"),
+                            ("es-mx", "Mexican Spanish"),
+                            ("es-ni", "Nicaraguan Spanish"),
+                            ("es-ve", "Venezuelan Spanish"),
+                            ("et", "Estonian"),
+                            ("eu", "Basque"),
+                            ("fa", "Persian"),
+                            ("fi", "Finnish"),
+                            ("fr", "French"),
+                            ("fy", "Frisian"),
+                            ("ga", "Irish"),
+                            ("gd", "Scottish Gaelic"),
+                            ("gl", "Galician"),
+                            ("he", "Hebrew"),
+                            ("hi", "Hindi"),
+                            ("hr", "Croatian"),
+                            ("hsb", "Upper Sorbian"),
+                            ("hu", "Hungarian"),
+                            ("hy", "Armenian"),
+                            ("ia", "Interlingua"),
+                            ("id", "Indonesian"),
+                            ("ig", "Igbo"),
+                            ("io", "Ido"),
+                            ("is", "Icelandic"),
+                            ("it", "Italian"),
+                            ("ja", "Japanese"),
+                            ("ka", "Georgian"),
+                            ("kab", "Kabyle"),
+                            ("kk", "Kazakh"),
+                            ("km", "Khmer"),
+                            ("kn", "Kannada"),
+                            ("ko", "Korean"),
+                            ("ky", "Kyrgyz"),
+                            ("lb", "Luxembourgish"),
+                            ("lt", "Lithuanian"),
+                            ("lv", "Latvian"),
+                            ("mk", "Macedonian"),
+                            ("ml", "Malayalam"),
+                            ("mn", "Mongolian"),
+                            ("mr", "Marathi"),
+                            ("ms", "Malay"),
+                            ("my", "Burmese"),
+                            ("nb", "Norwegian Bokmål"),
+                            ("ne", "Nepali"),
+                            ("nl", "Dutch"),
+                            ("nn", "Norwegian Nynorsk"),
+                            ("os", "Ossetic"),
+                            ("pa", "Punjabi"),
+                            ("pl", "Polish"),
+                            ("pt", "Portuguese"),
+                            ("pt-br", "Brazilian Portuguese"),
+                            ("ro", "Romanian"),
+                            ("ru", "Russian"),
+                            ("sk", "Slovak"),
+                            ("sl", "Slovenian"),
+                            ("sq", "Albanian"),
+                            ("sr", "Serbian"),
+                            ("sr-latn", "Serbian Latin"),
+                            ("sv", "Swedish"),
+                            ("sw", "Swahili"),
+                            ("ta", "Tamil"),
+                            ("te", "Telugu"),
+                            ("tg", "Tajik"),
+                            ("th", "Thai"),
+                            ("tk", "Turkmen"),
+                            ("tr", "Turkish"),
+                            ("tt", "Tatar"),
+                            ("udm", "Udmurt"),
+                            ("uk", "Ukrainian"),
+                            ("ur", "Urdu"),
+                            ("uz", "Uzbek"),
+                            ("vi", "Vietnamese"),
+                            ("zh-hans", "Simplified Chinese"),
+                            ("zh-hant", "Traditional Chinese"),
+                        ],
+                        help_text="The list of languages in which the course content is available.",
+                        max_choices=50,
+                        max_length=255,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="courserun",
+            index=joanie.core.fields.multiselect.MultiSelectIndex(
+                fields=["languages"], name="joanie_course_run_lang_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_course_run_languages_array"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["created_on"], name="joanie_order_created_on_idx"
+            ),
+        ),
+    ]
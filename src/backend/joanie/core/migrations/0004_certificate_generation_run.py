@@ -0,0 +1,74 @@
+# Generated by Django 4.0.10 on 2026-10-19 10:03
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_order_created_on_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CertificateGenerationRun",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="primary key for the record as UUID",
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                (
+                    "created_on",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="date and time at which a record was created",
+                        verbose_name="created on",
+                    ),
+                ),
+                (
+                    "updated_on",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="date and time at which a record was last updated",
+                        verbose_name="updated on",
+                    ),
+                ),
+                (
+                    "is_full",
+                    models.BooleanField(
+                        default=False,
+                        editable=False,
+                        help_text="Whether all orders were reviewed or only those which changed.",
+                        verbose_name="full rescan",
+                    ),
+                ),
+                (
+                    "is_completed",
+                    models.BooleanField(
+                        default=False, editable=False, verbose_name="completed"
+                    ),
+                ),
+                (
+                    "certificates_count",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, verbose_name="certificates generated"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Certificate generation run",
+                "verbose_name_plural": "Certificate generation runs",
+                "db_table": "joanie_certificate_generation_run",
+                "ordering": ["-created_on"],
+            },
+        ),
+    ]
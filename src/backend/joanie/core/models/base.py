@@ -39,9 +39,15 @@ class BaseModel(models.Model):
 
         abstract = True
 
-    def save(self, *args, **kwargs):
-        """Enforce validation each time an instance is saved."""
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        """
+        Enforce validation each time an instance is saved.
+
+        Trusted internal callers which only update fields of an instance already
+        validated can pass `validate=False` to skip the validation queries.
+        """
+        if validate:
+            self.full_clean()
         super().save(*args, **kwargs)
 
     def __repr__(self, dict_repr=False):
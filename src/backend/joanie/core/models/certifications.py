@@ -148,13 +148,52 @@ class Certificate(BaseModel):
 
         return merge_dict(base_context, localized_context)
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validate=True, **kwargs):
         """On creation, create a context for each active languages"""
 
-        self.full_clean()
+        if validate:
+            self.full_clean()
 
         is_new = self.created_on is None
         if is_new:
             self._set_localized_context()
 
         models.Model.save(self, *args, **kwargs)
+
+
+class CertificateGenerationRun(BaseModel):
+    """
+    CertificateGenerationRun records each run of certificate generation over all orders.
+    The creation date of the last completed run is the watermark from which an
+    incremental run only reviews orders which changed.
+    """
+
+    is_full = models.BooleanField(
+        _("full rescan"),
+        help_text=_("Whether all orders were reviewed or only those which changed."),
+        default=False,
+        editable=False,
+    )
+    is_completed = models.BooleanField(_("completed"), default=False, editable=False)
+    certificates_count = models.PositiveIntegerField(
+        _("certificates generated"), default=0, editable=False
+    )
+
+    class Meta:
+        db_table = "joanie_certificate_generation_run"
+        ordering = ["-created_on"]
+        verbose_name = _("Certificate generation run")
+        verbose_name_plural = _("Certificate generation runs")
+
+    def __str__(self):
+        kind = _("full") if self.is_full else _("incremental")
+        return f"[{kind}] {self.created_on}"
+
+    @classmethod
+    def get_watermark(cls):
+        """Return the creation date of the last completed run or None."""
+        return (
+            cls.objects.filter(is_completed=True)
+            .values_list("created_on", flat=True)
+            .first()
+        )
@@ -15,7 +15,7 @@ from url_normalize import url_normalize
 
 from joanie.core import utils
 from joanie.core.enums import ALL_LANGUAGES
-from joanie.core.fields.multiselect import MultiSelectField
+from joanie.core.fields.multiselect import MultiSelectField, MultiSelectIndex
 
 from .base import BaseModel
 
@@ -264,6 +264,9 @@ class CourseRun(parler_models.TranslatableModel, BaseModel):
 
     class Meta:
         db_table = "joanie_course_run"
+        indexes = [
+            MultiSelectIndex(fields=["languages"], name="joanie_course_run_lang_gin")
+        ]
         verbose_name = _("Course run")
         verbose_name_plural = _("Course runs")
 
@@ -5,7 +5,6 @@ import logging
 from decimal import Decimal as D
 
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import models
 from django.db.models import Q
@@ -18,7 +17,8 @@ from djmoney.models.fields import MoneyField
 from djmoney.models.validators import MinMoneyValidator
 from parler import models as parler_models
 
-from joanie.core.exceptions import EnrollmentError, GradeError
+from joanie.core import grades
+from joanie.core.exceptions import EnrollmentError
 from joanie.core.models.certifications import Certificate
 from joanie.lms_handler import LMSHandler
 
@@ -213,6 +213,66 @@ m2m_changed.connect(
 )
 
 
+class OrderQuerySet(models.QuerySet):
+    """Custom queryset for the Order model."""
+
+    def validated(self):
+        """
+        Filter orders in the validated state (see `Order.state`): orders not canceled
+        which are free or have a related pro forma invoice.
+        """
+        proforma_invoice_model = self.model.proforma_invoices.rel.related_model
+        return self.filter(
+            Q(total=0)
+            | models.Exists(
+                proforma_invoice_model.objects.filter(order=models.OuterRef("pk"))
+            ),
+            is_canceled=False,
+        )
+
+    def with_state(self):
+        """
+        Annotate orders with the existence of a pro forma invoice so that reading
+        their state does not cost a query per order.
+        """
+        proforma_invoice_model = self.model.proforma_invoices.rel.related_model
+        return self.annotate(
+            has_proforma_invoice=models.Exists(
+                proforma_invoice_model.objects.filter(order=models.OuterRef("pk"))
+            )
+        )
+
+    def with_main_proforma_invoice(self):
+        """
+        Prefetch the main pro forma invoice of orders so that reading it does not
+        cost a query per order (see `Order.main_proforma_invoice`).
+        """
+        proforma_invoice_model = self.model.proforma_invoices.rel.related_model
+        return self.prefetch_related(
+            models.Prefetch(
+                "proforma_invoices",
+                queryset=proforma_invoice_model.objects.filter(parent__isnull=True),
+                to_attr="main_proforma_invoices",
+            )
+        )
+
+    def granting_access_to(self, course_run):
+        """
+        Filter orders granting access to the course run: the order relation to the
+        course run's course does not restrict eligible course runs or explicitly
+        includes this course run.
+        """
+        return self.filter(
+            models.Exists(
+                OrderCourseRelation.objects.filter(
+                    Q(course_id=course_run.course_id, course_runs__isnull=True)
+                    | Q(course_runs=course_run),
+                    order=models.OuterRef("pk"),
+                )
+            )
+        )
+
+
 class Order(BaseModel):
     """
     Order model represents and records details user's order (for free or not) to a course product
@@ -257,6 +317,8 @@ class Order(BaseModel):
     )
     is_canceled = models.BooleanField(_("is canceled"), default=False, editable=False)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = "joanie_order"
         constraints = [
@@ -269,6 +331,9 @@ class Order(BaseModel):
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
         ordering = ["-created_on"]
+        indexes = [
+            models.Index(fields=["created_on"], name="joanie_order_created_on_idx")
+        ]
 
     def __str__(self):
         return f"Order {self.product} for user {self.owner}"
@@ -284,10 +349,15 @@ class Order(BaseModel):
         if self.is_canceled is True:
             return enums.ORDER_STATE_CANCELED
 
-        if (
-            self.total.amount == 0  # pylint: disable=no-member
-            or self.proforma_invoices.count() > 0
-        ):
+        if self.total.amount == 0:  # pylint: disable=no-member
+            return enums.ORDER_STATE_VALIDATED
+
+        # Orders may have been annotated through `OrderQuerySet.with_state`
+        has_proforma_invoice = getattr(self, "has_proforma_invoice", None)
+        if has_proforma_invoice is None:
+            has_proforma_invoice = self.proforma_invoices.exists()
+
+        if has_proforma_invoice:
             return enums.ORDER_STATE_VALIDATED
 
         return enums.ORDER_STATE_PENDING
@@ -327,6 +397,11 @@ class Order(BaseModel):
         It corresponds to the only pro forma invoice related
         to the order without parent.
         """
+        # Orders may have been prefetched through
+        # `OrderQuerySet.with_main_proforma_invoice`
+        if hasattr(self, "main_proforma_invoices"):
+            return next(iter(self.main_proforma_invoices), None)
+
         try:
             return self.proforma_invoices.get(parent__isnull=True)
         except ObjectDoesNotExist:
@@ -352,9 +427,10 @@ class Order(BaseModel):
 
         return super().clean()
 
-    def save(self, *args, **kwargs):
-        """Call full clean before saving instance."""
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        """Call full clean before saving instance unless `validate` is False."""
+        if validate:
+            self.full_clean()
         is_new = not bool(self.created_on)
         models.Model.save(self, *args, **kwargs)
         if is_new:
@@ -392,7 +468,7 @@ class Order(BaseModel):
             try:
                 enrollment = Enrollment.objects.get(
                     course_run=course_run, user=self.owner
-                ).only("is_active")
+                )
             except Enrollment.DoesNotExist:
                 Enrollment.objects.create(
                     course_run=course_run,
@@ -402,7 +478,7 @@ class Order(BaseModel):
             else:
                 if enrollment.is_active is False:
                     enrollment.is_active = True
-                    enrollment.save()
+                    enrollment.save(validate=False)
 
     def get_enrollments(self, is_active=None):
         """
@@ -444,10 +520,10 @@ class Order(BaseModel):
                 )
                 if not owns_other_products:
                     enrollment.is_active = False
-                    enrollment.save()
+                    enrollment.save(validate=False)
 
         self.is_canceled = True
-        self.save()
+        self.save(validate=False)
 
     def create_certificate(self):
         """
@@ -562,7 +638,9 @@ class Enrollment(BaseModel):
     @property
     def grade_cache_key(self):
         """The cache key used to store enrollment's grade."""
-        return f"grade_{self.id}"
+        return grades.get_grade_cache_key(
+            self.user.username, self.course_run.resource_link
+        )
 
     @property
     def is_passed(self):
@@ -572,33 +650,11 @@ class Enrollment(BaseModel):
         return grade["passed"] if grade else False
 
     def get_grade(self):
-        """Retrieve the grade from the related LMS then store result in cache."""
-        grade = cache.get(self.grade_cache_key)
-
-        if grade is None:
-            lms = LMSHandler.select_lms(self.course_run.resource_link)
-
-            if lms is None:
-                logger.error(
-                    "Course run %s has no related lms.",
-                    self.course_run.id,
-                )
-            else:
-                try:
-                    grade = lms.get_grades(
-                        username=self.user.username,
-                        resource_link=self.course_run.resource_link,
-                    )
-                except GradeError:
-                    pass
-                else:
-                    cache.set(
-                        self.grade_cache_key,
-                        grade,
-                        settings.JOANIE_ENROLLMENT_GRADE_CACHE_TTL,
-                    )
-
-        return grade
+        """
+        Retrieve the grade from the related LMS through the grade cache shared by all
+        enrollments of the user to the course run.
+        """
+        return grades.get_grade(self.user.username, self.course_run.resource_link)
 
     def clean(self):
         """Clean instance fields and raise a ValidationError in case of issue."""
@@ -626,32 +682,21 @@ class Enrollment(BaseModel):
 
         # Forbid creating a free enrollment if the related course run is not listed and
         # if the course relies on a product and the owner doesn't purchase it.
-        if not self.course_run.is_listed:
+        if (
+            not self.course_run.is_listed
+            and not Order.objects.validated()
+            .granting_access_to(self.course_run)
+            .filter(owner_id=self.user_id)
+            .exists()
+        ):
             if self.course_run.course.targeted_by_products.exists():
-                validated_user_orders = [
-                    order
-                    for order in Order.objects.filter(
-                        (
-                            models.Q(
-                                course_relations__course_runs__isnull=True,
-                                target_courses__course_runs=self.course_run,
-                            )
-                            | models.Q(course_relations__course_runs=self.course_run)
-                        ),
-                        is_canceled=False,
-                        owner=self.user,
-                    )
-                    if order.state == enums.ORDER_STATE_VALIDATED
-                ]
-                if len(validated_user_orders) == 0:
-                    message = _(
-                        f'Course run "{self.course_run.resource_link:s}" '
-                        "requires a valid order to enroll."
-                    )
-                    raise ValidationError({"__all__": [message]})
+                message = _(
+                    f'Course run "{self.course_run.resource_link:s}" '
+                    "requires a valid order to enroll."
+                )
             else:
                 message = _("You are not allowed to enroll to a course run not listed.")
-                raise ValidationError({"__all__": [message]})
+            raise ValidationError({"__all__": [message]})
 
         return super().clean()
 
@@ -681,8 +726,9 @@ class Enrollment(BaseModel):
             else:
                 self.state = enums.ENROLLMENT_STATE_SET
 
-    def save(self, *args, **kwargs):
-        """Call full clean before saving instance."""
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        """Call full clean before saving instance unless `validate` is False."""
+        if validate:
+            self.full_clean()
         self.set()
         models.Model.save(self, *args, **kwargs)
@@ -0,0 +1,44 @@
+"""
+Paginators for changelists of very large tables
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """
+    Return the number of rows of a queryset as estimated by the PostgreSQL query
+    planner, without running the query, or None on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator counting rows exactly only when the query planner estimates there
+    are fewer than `JOANIE_ADMIN_ESTIMATED_COUNT_THRESHOLD` rows. Above, the estimate
+    is used so that paginating a table of millions of rows does not scan it.
+    """
+
+    @cached_property
+    def count(self):
+        """Return the estimated number of rows or count them if they are few."""
+        estimate = estimate_count(self.object_list)
+        if (
+            estimate is not None
+            and estimate >= settings.JOANIE_ADMIN_ESTIMATED_COUNT_THRESHOLD
+        ):
+            return estimate
+
+        return super().count
@@ -10,6 +10,17 @@ from rest_framework import serializers
 from joanie.core import models, utils
 
 
+def get_cache_version(instance):
+    """
+    Return the version of a cached representation from the latest update of the
+    objects it is made of, when the instance has been annotated with it (see
+    `joanie.core.catalog.annotate_last_modified`), so that it is not served once
+    outdated.
+    """
+    last_modified = getattr(instance, "last_modified", None)
+    return int(last_modified.timestamp() * 1000000) if last_modified else None
+
+
 class CertificationDefinitionSerializer(serializers.ModelSerializer):
     """
     Serialize information about a certificate definition
@@ -89,6 +100,10 @@ class TargetCourseSerializer(serializers.ModelSerializer):
         Return the relevant course relation according to the resource context
         is a product or an order.
         """
+        # Order relations may have been prefetched (see `OrderViewSet`)
+        if "course_relations" in self.context:
+            return self.context["course_relations"][target_course.pk]
+
         if isinstance(self.context_resource, models.Order):
             return target_course.order_relations.get(order=self.context_resource)
 
@@ -117,6 +132,11 @@ class TargetCourseSerializer(serializers.ModelSerializer):
         """
         Return related course runs ordered by start date asc
         """
+        if "course_relations" in self.context:
+            relation = self.context["course_relations"][target_course.pk]
+            course_runs = relation.course_runs.all() or target_course.course_runs.all()
+            return CourseRunSerializer(course_runs, many=True).data
+
         course_runs = self.context_resource.target_course_runs.filter(
             course=target_course
         ).order_by("start")
@@ -216,10 +236,16 @@ class ProductSerializer(serializers.ModelSerializer):
         Cache the serializer representation that does not vary from user to user
         then, if user is authenticated, add private information to the representation
         """
+        # Products nested in another resource are part of its cached representation
+        # so they are neither cached on their own nor hold private information
+        if self.is_nested:
+            return {**super().to_representation(instance), "orders": None}
+
         cache_key = utils.get_resource_cache_key(
             "product", instance.id, is_language_sensitive=True
         )
-        representation = cache.get(cache_key)
+        cache_version = get_cache_version(instance)
+        representation = cache.get(cache_key, version=cache_version)
 
         if representation is None:
             representation = super().to_representation(instance)
@@ -227,12 +253,21 @@ class ProductSerializer(serializers.ModelSerializer):
                 cache_key,
                 representation,
                 settings.JOANIE_ANONYMOUS_SERIALIZER_DEFAULT_CACHE_TTL,
+                version=cache_version,
             )
 
         representation["orders"] = self.get_orders(instance)
 
         return representation
 
+    @property
+    def is_nested(self):
+        """Return True if the product is serialized as part of another resource."""
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is not None
+
 
 class OrderLiteSerializer(serializers.ModelSerializer):
     """
@@ -290,6 +325,39 @@ class OrderLiteSerializer(serializers.ModelSerializer):
         ).data
 
 
+class OrderOverlaySerializer(serializers.ModelSerializer):
+    """
+    Serialize the order information a user needs to complete public course and
+    product representations.
+    """
+
+    id = serializers.CharField(read_only=True)
+    total = MoneyField(
+        coerce_to_string=False,
+        decimal_places=2,
+        max_digits=9,
+        min_value=0,
+        read_only=True,
+    )
+    course = serializers.SlugRelatedField(read_only=True, slug_field="code")
+    product = serializers.CharField(read_only=True, source="product_id")
+    certificate = serializers.SlugRelatedField(read_only=True, slug_field="id")
+
+    class Meta:
+        model = models.Order
+        fields = [
+            "id",
+            "certificate",
+            "course",
+            "created_on",
+            "product",
+            "state",
+            "total",
+            "total_currency",
+        ]
+        read_only_fields = fields
+
+
 class CourseSerializer(serializers.ModelSerializer):
     """
     Serialize all information about a course.
@@ -339,7 +407,8 @@ class CourseSerializer(serializers.ModelSerializer):
         cache_key = utils.get_resource_cache_key(
             "course", instance.code, is_language_sensitive=True
         )
-        representation = cache.get(cache_key)
+        cache_version = get_cache_version(instance)
+        representation = cache.get(cache_key, version=cache_version)
 
         if representation is None:
             representation = super().to_representation(instance)
@@ -347,6 +416,7 @@ class CourseSerializer(serializers.ModelSerializer):
                 cache_key,
                 representation,
                 settings.JOANIE_ANONYMOUS_SERIALIZER_DEFAULT_CACHE_TTL,
+                version=cache_version,
             )
 
         representation["orders"] = self.get_orders(instance)
@@ -487,8 +557,19 @@ class OrderSerializer(serializers.ModelSerializer):
         context = self.context.copy()
         context["resource"] = order
 
+        relations = getattr(order, "prefetched_course_relations", None)
+        if relations is None:
+            target_courses = order.target_courses.all().order_by(
+                "order_relations__position"
+            )
+        else:
+            context["course_relations"] = {
+                relation.course_id: relation for relation in relations
+            }
+            target_courses = [relation.course for relation in relations]
+
         return TargetCourseSerializer(
-            instance=order.target_courses.all().order_by("order_relations__position"),
+            instance=target_courses,
             many=True,
             context=context,
         ).data
@@ -497,8 +578,20 @@ class OrderSerializer(serializers.ModelSerializer):
         """
         For the current order, retrieve its related enrollments.
         """
+        relations = getattr(order, "prefetched_course_relations", None)
+        enrollments = getattr(order.owner, "prefetched_enrollments", None)
+        if relations is None or enrollments is None:
+            enrollments = order.get_enrollments()
+        else:
+            course_ids = {relation.course_id for relation in relations}
+            enrollments = [
+                enrollment
+                for enrollment in enrollments
+                if enrollment.course_run.course_id in course_ids
+            ]
+
         return EnrollmentSerializer(
-            instance=order.get_enrollments(),
+            instance=enrollments,
             many=True,
             context=self.context,
         ).data
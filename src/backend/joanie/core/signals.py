@@ -0,0 +1,103 @@
+"""
+Receivers publishing snapshots of the catalog objects affected by a change
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+
+from joanie.core import models
+from joanie.core.catalog import get_affected_resources, publish_catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def publish_affected_snapshots(course_ids=(), product_ids=()):
+    """
+    Publish, once the current transaction is committed, snapshots of catalog
+    objects affected by a change of the given courses and products.
+    """
+    if not settings.JOANIE_CATALOG_SNAPSHOT_ON_CHANGE:
+        return
+
+    course_codes, product_ids = get_affected_resources(
+        course_ids=course_ids, product_ids=product_ids
+    )
+
+    def publish():
+        try:
+            publish_catalog_snapshot(course_codes=course_codes, product_ids=product_ids)
+        except Exception:  # pylint: disable=broad-except
+            # The full catalog command will catch up with this change
+            logger.exception("Cannot publish catalog snapshot.")
+
+    transaction.on_commit(publish)
+
+
+# pylint: disable=unused-argument
+def on_course_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of a course."""
+    publish_affected_snapshots(course_ids=[instance.pk])
+
+
+def on_course_run_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of a course run."""
+    publish_affected_snapshots(course_ids=[instance.course_id])
+
+
+def on_organization_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of an organization."""
+    publish_affected_snapshots(
+        course_ids=list(instance.course_set.values_list("pk", flat=True))
+    )
+
+
+def on_product_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of a product."""
+    publish_affected_snapshots(product_ids=[instance.pk])
+
+
+def on_certificate_definition_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of a certificate definition."""
+    publish_affected_snapshots(
+        product_ids=list(instance.product_set.values_list("pk", flat=True))
+    )
+
+
+def on_product_course_relation_change(sender, instance, **kwargs):
+    """Publish snapshots affected by a change of a product target course."""
+    publish_affected_snapshots(product_ids=[instance.product_id])
+
+
+def on_course_products_change(sender, instance, action, pk_set, **kwargs):
+    """Publish snapshots affected by products added to or removed from a course."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    # Removed products or courses are not related to the instance anymore
+    related_ids = list(pk_set or [])
+    if isinstance(instance, models.Course):
+        publish_affected_snapshots(course_ids=[instance.pk], product_ids=related_ids)
+    else:
+        publish_affected_snapshots(course_ids=related_ids, product_ids=[instance.pk])
+
+
+CATALOG_RECEIVERS = (
+    (models.Course, on_course_change),
+    (models.CourseRun, on_course_run_change),
+    (models.Organization, on_organization_change),
+    (models.Product, on_product_change),
+    (models.CertificateDefinition, on_certificate_definition_change),
+    (models.ProductCourseRelation, on_product_course_relation_change),
+)
+
+
+def connect_catalog_receivers():
+    """Connect receivers publishing snapshots on changes of catalog objects."""
+    for sender, receiver in CATALOG_RECEIVERS:
+        post_save.connect(receiver, sender=sender)
+        pre_delete.connect(receiver, sender=sender)
+    m2m_changed.connect(
+        on_course_products_change, sender=models.Course.products.through
+    )
@@ -4,11 +4,19 @@ Utils that can be useful throughout Joanie's core app
 import base64
 import collections.abc
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.text import slugify
 from django.utils.translation import get_language
 
 from PIL import ImageFile as PillowImageFile
 
+# Cache backends whose entries are only seen by the process which stored them
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
 
 def normalize_code(code):
     """Normalize object codes to avoid duplicates."""
@@ -85,3 +93,42 @@ def get_resource_cache_key(
         cache_key = f"{cache_key}-{current_language}"
 
     return cache_key
+
+
+def is_cache_shared():
+    """Return whether the default cache is shared by all processes."""
+    return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def check_shared_cache():
+    """
+    Raise ImproperlyConfigured if the default cache is local to each process while
+    it must be shared by all processes: when required by the
+    `JOANIE_SHARED_CACHE_REQUIRED` setting, when the web hook through which LMS push
+    grades is enabled, as grades are stored in cache by the web worker which received
+    them and read by the others and by the `generate_certificates` command, when
+    read replicas are declared, as a client which wrote through a web worker must
+    read from the primary database through the others, or when catalog snapshots
+    are published on changes, as web workers lock the manifest through the cache, or
+    when the OBF badge provider is configured, as its access token renewal is locked
+    through the cache.
+    """
+    required_by = [
+        name
+        for name in (
+            "JOANIE_SHARED_CACHE_REQUIRED",
+            "JOANIE_GRADES_PUSH_SECRETS",
+            "JOANIE_DATABASE_REPLICAS",
+            "JOANIE_CATALOG_SNAPSHOT_ON_CHANGE",
+        )
+        if getattr(settings, name, None)
+    ]
+    if settings.JOANIE_BADGE_PROVIDERS.get("obf", {}).get("client_id"):
+        required_by.append("OBF_CLIENT_ID")
+    if required_by and not is_cache_shared():
+        raise ImproperlyConfigured(
+            f"The {settings.CACHES['default']['BACKEND']:s} cache backend is local "
+            f"to each process but {', '.join(required_by):s} require(s) a cache "
+            "shared by all processes, configure it through the CACHE_BACKEND and "
+            "CACHE_LOCATION environment variables."
+        )
@@ -42,3 +42,38 @@ class LMSHandler:
                 return import_string(lms_configuration["BACKEND"])(lms_configuration)
 
         return None
+
+    @staticmethod
+    def group_by_lms(resource_links):
+        """
+        Route a collection of resource links to their LMS backend at once.
+
+        Return a list of `(lms, resource_links)` tuples with one LMS backend instance
+        per configuration involved. Resource links matching no LMS are grouped under a
+        `None` backend.
+        """
+        groups = {}
+        for resource_link in set(resource_links):
+            index = None
+            if resource_link is not None:
+                for position, lms_configuration in enumerate(
+                    settings.JOANIE_LMS_BACKENDS
+                ):
+                    if re.match(
+                        lms_configuration.get("SELECTOR_REGEX", r".*"), resource_link
+                    ):
+                        index = position
+                        break
+            groups.setdefault(index, []).append(resource_link)
+
+        return [
+            (
+                None
+                if index is None
+                else import_string(settings.JOANIE_LMS_BACKENDS[index]["BACKEND"])(
+                    settings.JOANIE_LMS_BACKENDS[index]
+                ),
+                links,
+            )
+            for index, links in groups.items()
+        ]
@@ -9,26 +9,29 @@ from django.conf import settings
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from joanie.core import models, utils
+from joanie.core import grades, models, utils
+from joanie.core.helpers import (
+    generate_certificates_for_orders,
+    get_orders_for_learners,
+)
 from joanie.lms_handler import LMSHandler
+from joanie.lms_handler.serializers import PushGradesSerializer
 
 
-# pylint: disable=too-many-return-statements,unused-argument, too-many-locals,too-many-branches
-@api_view(["POST"])
-def course_runs_sync(request):
-    """View for the web hook to create or update course runs based on their resource link.
-
-    - A new course run is created or the existing course run is updated
+def check_signature(request, secrets):
+    """Check the HMAC signature of a web hook request against a list of secrets.
 
     Parameters
     ----------
     request : Type[django.http.request.HttpRequest]
-        The request on the API endpoint, it should contain a payload with course run fields.
+        The request on the web hook, it should be signed in its Authorization header.
+    secrets : list
+        The secrets any of which may have signed the request.
 
     Returns
     -------
-    Type[rest_framework.response.Response]
-        HttpResponse acknowledging the success or failure of the synchronization operation.
+    Type[rest_framework.response.Response] or None
+        HttpResponse rejecting the request if its signature is missing or invalid.
     """
     msg = request.body.decode("utf-8")
 
@@ -49,12 +52,38 @@ def course_runs_sync(request):
                 digestmod=hashlib.sha256,
             ).hexdigest()
         )
-        for secret in getattr(settings, "JOANIE_COURSE_RUN_SYNC_SECRETS", [])
+        for secret in secrets
     )
 
     if not signature_is_valid:
         return Response("Invalid authentication.", status=401)
 
+    return None
+
+
+# pylint: disable=too-many-return-statements,unused-argument, too-many-locals,too-many-branches
+@api_view(["POST"])
+def course_runs_sync(request):
+    """View for the web hook to create or update course runs based on their resource link.
+
+    - A new course run is created or the existing course run is updated
+
+    Parameters
+    ----------
+    request : Type[django.http.request.HttpRequest]
+        The request on the API endpoint, it should contain a payload with course run fields.
+
+    Returns
+    -------
+    Type[rest_framework.response.Response]
+        HttpResponse acknowledging the success or failure of the synchronization operation.
+    """
+    signature_error = check_signature(
+        request, getattr(settings, "JOANIE_COURSE_RUN_SYNC_SECRETS", [])
+    )
+    if signature_error is not None:
+        return signature_error
+
     # Select LMS from resource link
     resource_link = request.data.get("resource_link")
     if not resource_link:
@@ -99,3 +128,55 @@ def course_runs_sync(request):
         models.CourseRun.objects.create(**serializer.validated_data, course=course)
 
     return Response({"success": True})
+
+
+@api_view(["POST"])
+def grades_push(request):
+    """View for the web hook through which the LMS pushes grades of learners.
+
+    - Grades are stored in the grade cache, which must be shared by all processes
+      for other web workers and the `generate_certificates` command to see them
+      (see `joanie.core.utils.check_shared_cache`)
+    - Orders of the learners are checked for certification if they passed, only
+      from grades in cache so that the LMS is not requested while it waits for
+      the response. Orders with other grades missing are left to the
+      `generate_certificates` command.
+
+    Parameters
+    ----------
+    request : Type[django.http.request.HttpRequest]
+        The request on the API endpoint, it should contain a payload with a list of
+        grades by username and resource link.
+
+    Returns
+    -------
+    Type[rest_framework.response.Response]
+        HttpResponse acknowledging the grades with the number of certificates generated.
+    """
+    signature_error = check_signature(
+        request, getattr(settings, "JOANIE_GRADES_PUSH_SECRETS", [])
+    )
+    if signature_error is not None:
+        return signature_error
+
+    serializer = PushGradesSerializer(data=request.data)
+    if serializer.is_valid() is not True:
+        return Response(serializer.errors, status=400)
+
+    passed = set()
+    for pushed_grade in serializer.validated_data["grades"]:
+        learner = (pushed_grade["username"], pushed_grade["resource_link"])
+        grades.set_grade(*learner, pushed_grade["grade"])
+        if pushed_grade["grade"]["passed"]:
+            passed.add(learner)
+
+    # Only orders of learners who passed a course run may become eligible
+    certificates_count = (
+        generate_certificates_for_orders(
+            get_orders_for_learners(passed), cached_only=True
+        )
+        if passed
+        else 0
+    )
+
+    return Response({"success": True, "certificates": certificates_count})
@@ -1,6 +1,9 @@
 """
 Base Backend to connect Joanie to a LMS
 """
+from concurrent.futures import ThreadPoolExecutor
+
+from joanie.core.exceptions import EnrollmentError
 
 
 class BaseLMSBackend:
@@ -19,12 +22,66 @@ class BaseLMSBackend:
             "subclasses of BaseLMSBackend must provide a get_enrollment() method"
         )
 
+    def get_enrollments(self, enrollments, max_workers=1, rate_limiter=None):
+        """
+        Retrieve the state of a batch of enrollments given as (username, resource_link)
+        tuples, requesting the LMS within `max_workers` threads and spacing out calls
+        through the `rate_limiter` if provided. Return a dictionary of the LMS
+        enrollment activity by tuple, None if it could not be retrieved.
+
+        Backends supporting bulk operations should override this method.
+        """
+
+        def get_is_active(enrollment):
+            if rate_limiter is not None:
+                rate_limiter.wait()
+            try:
+                data = self.get_enrollment(*enrollment)
+            except EnrollmentError:
+                return None
+            return None if data is None else bool(data.get("is_active"))
+
+        enrollments = list(enrollments)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(enrollments, executor.map(get_is_active, enrollments)))
+
     def set_enrollment(self, username, resource_link, active=True):
         """Activate/deactivate an enrollment according to a username and a resource_link."""
         raise NotImplementedError(
             "subclasses of BaseLMSBackend must provide a set_enrollment() method"
         )
 
+    def set_enrollments(
+        self, enrollments, active=True, max_workers=1, rate_limiter=None
+    ):
+        """
+        Activate/deactivate enrollments given as (username, resource_link) tuples,
+        calling the LMS once per enrollment within `max_workers` threads and spacing
+        out calls through the `rate_limiter` if provided. Return the list of tuples
+        for which the LMS call failed.
+
+        Backends supporting bulk operations should override this method.
+        """
+
+        def set_enrollment(enrollment):
+            if rate_limiter is not None:
+                rate_limiter.wait()
+            try:
+                self.set_enrollment(*enrollment, active)
+            except EnrollmentError:
+                return False
+            return True
+
+        enrollments = list(enrollments)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [
+                enrollment
+                for enrollment, is_set in zip(
+                    enrollments, executor.map(set_enrollment, enrollments)
+                )
+                if not is_set
+            ]
+
     def get_grades(self, username, resource_link):
         """Get user's grades for a course run given its url."""
         raise NotImplementedError(
@@ -5,10 +5,14 @@ import json
 import logging
 import re
 
+from django.conf import settings
+from django.utils.functional import cached_property
+
 import requests
 from requests.auth import AuthBase
 
 from joanie.core.exceptions import EnrollmentError, GradeError
+from joanie.lms_handler.resilience import raise_for_unavailability, resilient
 from joanie.lms_handler.serializers import SyncCourseRunSerializer
 
 from .base import BaseLMSBackend
@@ -58,19 +62,42 @@ class TokenAPIClient(requests.Session):
     https://requests.readthedocs.io/en/master/user/advanced/#session-objects
     """
 
-    def __init__(self, token, *args, **kwargs):
-        """Extending the session object by setting the authentication token."""
+    def __init__(self, token, *args, timeout=None, **kwargs):
+        """
+        Extending the session object by setting the authentication token and the
+        default timeout of requests.
+        """
         super().__init__(*args, **kwargs)
         self.auth = OpenEdXTokenAuth(token)
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        Send a request with the default timeout unless another one is given and raise
+        `requests.HTTPError` if OpenEdX answered that it is unavailable.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        response = super().request(method, url, *args, **kwargs)
+        raise_for_unavailability(response)
+        return response
 
 
 class OpenEdXLMSBackend(BaseLMSBackend):
     """LMS backend for Joanie tested with Open EdX Dogwood, Hawthorn and Ironwood."""
 
-    @property
+    @cached_property
     def api_client(self):
-        """Instantiate and return an OpenEdX token API client."""
-        return TokenAPIClient(self.configuration["API_TOKEN"])
+        """
+        Instantiate and return an OpenEdX token API client. It is bound to the backend
+        instance so consecutive calls reuse the same connection pool.
+        """
+        return TokenAPIClient(
+            self.configuration["API_TOKEN"],
+            timeout=(
+                settings.JOANIE_LMS_CONNECT_TIMEOUT,
+                settings.JOANIE_LMS_READ_TIMEOUT,
+            ),
+        )
 
     def extract_course_id(self, resource_link):
         """Extract the LMS course id from the course run url."""
@@ -78,8 +105,13 @@ class OpenEdXLMSBackend(BaseLMSBackend):
             "course_id"
         )
 
+    @resilient(EnrollmentError)
     def get_enrollment(self, username, resource_link):
-        """Get enrollment status for a user on a course run given its url"""
+        """
+        Get enrollment status for a user on a course run given its url. Return None if
+        the LMS answered with an error or raise `EnrollmentError` if it is unreachable
+        or unavailable.
+        """
         base_url = self.configuration["BASE_URL"]
         course_id = self.extract_course_id(resource_link)
         response = self.api_client.request(
@@ -93,6 +125,7 @@ class OpenEdXLMSBackend(BaseLMSBackend):
         logger.error(response.content)
         return None
 
+    @resilient(EnrollmentError)
     def set_enrollment(self, username, resource_link, active=True):
         """Set enrollment for a user with a course run given its url."""
         base_url = self.configuration["BASE_URL"]
@@ -113,6 +146,7 @@ class OpenEdXLMSBackend(BaseLMSBackend):
         logger.error(response.content)
         raise EnrollmentError()
 
+    @resilient(GradeError)
     def get_grades(self, username, resource_link):
         """Get user's grades for a course run given its url."""
         base_url = self.configuration["BASE_URL"]
@@ -0,0 +1,264 @@
+"""
+Resilience of outgoing LMS calls: a circuit breaker per LMS backend failing fast
+while the LMS is failing and a process-wide limit of concurrent LMS calls
+"""
+import functools
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+# HTTP status telling that the LMS is overloaded, as well as 5xx statuses
+HTTP_TOO_MANY_REQUESTS = 429
+
+
+class CircuitBreaker:
+    """
+    Track consecutive failures of calls to an LMS. Once they reach the
+    `JOANIE_LMS_CIRCUIT_BREAKER_FAILURE_THRESHOLD` setting, the circuit opens and calls
+    are rejected until `JOANIE_LMS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT` seconds elapsed.
+    A single trial call is then allowed: the circuit closes if it succeeds or opens
+    again if it fails.
+    """
+
+    def __init__(self, name):
+        """Start with a closed circuit and no metrics."""
+        self.name = name
+        self.state = CIRCUIT_CLOSED
+        self.failure_count = 0
+        self.opened_at = None
+        self.metrics = Counter()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Return whether a call to the LMS can be attempted. Once the recovery timeout
+        elapsed, a trial call is allowed and the timeout restarts so that a trial
+        whose outcome is never recorded does not block the LMS forever.
+        """
+        with self.lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+
+            now = time.monotonic()
+            if (
+                now - self.opened_at
+                >= settings.JOANIE_LMS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT
+            ):
+                self.state = CIRCUIT_HALF_OPEN
+                self.opened_at = now
+                return True
+
+            self.metrics["rejected"] += 1
+            return False
+
+    def record_success(self):
+        """Close the circuit after a call answered by the LMS, even with an error."""
+        with self.lock:
+            self.metrics["successes"] += 1
+            self.failure_count = 0
+            if self.state != CIRCUIT_CLOSED:
+                logger.info("Circuit closed for LMS %s.", self.name)
+            self.state = CIRCUIT_CLOSED
+
+    def record_failure(self):
+        """Open the circuit if the threshold of consecutive failures is reached."""
+        threshold = settings.JOANIE_LMS_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        with self.lock:
+            self.metrics["failures"] += 1
+            self.failure_count += 1
+            if self.state == CIRCUIT_HALF_OPEN or (
+                threshold and self.failure_count >= threshold
+            ):
+                if self.state != CIRCUIT_OPEN:
+                    logger.warning(
+                        "Circuit opened for LMS %s after %d failure(s).",
+                        self.name,
+                        self.failure_count,
+                    )
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+
+    def record_throttled(self):
+        """Count a call rejected as too many calls were running then abandon it."""
+        with self.lock:
+            self.metrics["throttled"] += 1
+        self.abandon()
+
+    def abandon(self):
+        """
+        Open the circuit again if a trial call ended without recording its outcome,
+        so that another trial is allowed once the recovery timeout elapsed.
+        """
+        with self.lock:
+            if self.state == CIRCUIT_HALF_OPEN:
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """
+    Space out LMS calls, possibly made from several threads, so that no more than
+    `rate` calls are started per second. No limit is applied if `rate` is not set.
+    """
+
+    def __init__(self, rate=None):
+        """Allow the first call right away."""
+        self.interval = 1 / rate if rate else 0
+        self.next_call_at = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call can be started."""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call_at - now
+            self.next_call_at = max(now, self.next_call_at) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+_circuit_breakers = {}
+_registry_lock = threading.Lock()
+_semaphores = {}
+
+
+def get_circuit_breaker(name):
+    """Return the circuit breaker of an LMS, creating it on first use."""
+    with _registry_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(name)
+        return _circuit_breakers[name]
+
+
+def reset_circuit_breakers():
+    """Forget the state and the metrics of all circuit breakers."""
+    with _registry_lock:
+        _circuit_breakers.clear()
+
+
+def get_semaphore():
+    """
+    Return the semaphore bounding concurrent LMS calls of the current process to the
+    `JOANIE_LMS_MAX_CONCURRENT_REQUESTS` setting.
+    """
+    size = settings.JOANIE_LMS_MAX_CONCURRENT_REQUESTS
+    with _registry_lock:
+        if size not in _semaphores:
+            _semaphores[size] = threading.BoundedSemaphore(size)
+        return _semaphores[size]
+
+
+def get_lms_metrics():
+    """
+    Return, by LMS, the state of its circuit and the number of successful (answered,
+    possibly with an error to an invalid request), failed, rejected (circuit open)
+    and throttled (too many concurrent calls) calls.
+    """
+    with _registry_lock:
+        circuit_breakers = list(_circuit_breakers.values())
+
+    metrics = {}
+    for circuit_breaker in circuit_breakers:
+        with circuit_breaker.lock:
+            metrics[circuit_breaker.name] = {
+                "state": circuit_breaker.state,
+                **{
+                    metric: circuit_breaker.metrics[metric]
+                    for metric in ("successes", "failures", "rejected", "throttled")
+                },
+            }
+    return metrics
+
+
+def log_lms_metrics():
+    """Log the metrics of each LMS called by the current process."""
+    for name, metrics in sorted(get_lms_metrics().items()):
+        logger.info(
+            "LMS %s: circuit %s, %d successful, %d failed, %d rejected and "
+            "%d throttled call(s).",
+            name,
+            metrics["state"],
+            metrics["successes"],
+            metrics["failures"],
+            metrics["rejected"],
+            metrics["throttled"],
+        )
+
+
+def raise_for_unavailability(response):
+    """
+    Raise `requests.HTTPError` if the LMS answered that it is failing (5xx) or
+    overloaded (429), so that the call counts as a failure of its circuit.
+    """
+    if response.status_code >= 500 or response.status_code == HTTP_TOO_MANY_REQUESTS:
+        raise requests.HTTPError(
+            f"{response.status_code:d} answered by {response.url:s}",
+            response=response,
+        )
+
+
+def resilient(error_class):
+    """
+    Decorate an LMS backend method so that it fails fast with `error_class` while
+    the circuit of the LMS is open or when too many LMS calls are already running.
+    Only network errors and unavailability answers (see `raise_for_unavailability`)
+    count as failures and are converted to `error_class`. Other errors raised by the
+    method, such as error answers to invalid requests (unknown user or course), tell
+    that the LMS is available and do not open its circuit.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(backend, *args, **kwargs):
+            circuit_breaker = get_circuit_breaker(backend.configuration["BASE_URL"])
+            if not circuit_breaker.allow():
+                logger.error(
+                    "Call to LMS %s rejected as its circuit is open.",
+                    circuit_breaker.name,
+                )
+                raise error_class()
+
+            semaphore = get_semaphore()
+            # pylint: disable=consider-using-with
+            if not semaphore.acquire(timeout=settings.JOANIE_LMS_CONNECT_TIMEOUT):
+                circuit_breaker.record_throttled()
+                logger.error(
+                    "Call to LMS %s rejected as too many calls are running.",
+                    circuit_breaker.name,
+                )
+                raise error_class()
+
+            try:
+                result = method(backend, *args, **kwargs)
+            except requests.RequestException as error:
+                circuit_breaker.record_failure()
+                logger.error("Call to LMS %s failed: %s", circuit_breaker.name, error)
+                raise error_class() from error
+            except Exception:
+                circuit_breaker.record_success()
+                raise
+            except BaseException:
+                # An interrupted call tells nothing about the health of the LMS
+                circuit_breaker.abandon()
+                raise
+            finally:
+                semaphore.release()
+
+            circuit_breaker.record_success()
+            return result
+
+        return wrapper
+
+    return decorator
@@ -6,6 +6,8 @@ from rest_framework import serializers
 from joanie.core.enums import ALL_LANGUAGES
 from joanie.core.models import CourseRun
 
+GRADES_PUSH_MAX_BATCH_SIZE = 1000
+
 
 class ListMultipleChoiceField(serializers.MultipleChoiceField):
     """
@@ -36,3 +38,31 @@ class SyncCourseRunSerializer(serializers.ModelSerializer):
             "languages",
         ]
         extra_kwargs = {"resource_link": {"required": True, "unique": False}}
+
+
+class PushedGradeSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Grade of a learner to a course run pushed by the LMS.
+    """
+
+    username = serializers.CharField(max_length=150)
+    resource_link = serializers.CharField(max_length=200)
+    grade = serializers.DictField()
+
+    def validate_grade(self, value):  # pylint: disable=no-self-use
+        """A grade should tell whether the learner passed the course run."""
+        if not isinstance(value.get("passed"), bool):
+            raise serializers.ValidationError(
+                "The grade should have a boolean `passed` field."
+            )
+        return value
+
+
+class PushGradesSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Grades webhook serializer.
+    """
+
+    grades = PushedGradeSerializer(
+        many=True, allow_empty=False, max_length=GRADES_PUSH_MAX_BATCH_SIZE
+    )
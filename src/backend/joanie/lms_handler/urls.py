@@ -5,10 +5,11 @@ from django.urls import re_path
 
 from rest_framework import routers
 
-from .api import course_runs_sync
+from .api import course_runs_sync, grades_push
 
 ROUTER = routers.SimpleRouter()
 
 urlpatterns = ROUTER.urls + [
     re_path("course-runs-sync/?$", course_runs_sync, name="course-runs-sync"),
+    re_path("grades-push/?$", grades_push, name="grades-push"),
 ]
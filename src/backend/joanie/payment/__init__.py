@@ -1,17 +1,62 @@
 """Payment"""
+import json
+from threading import Lock
+
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.utils.module_loading import import_string
 
+# Payment backends are stateless once instantiated but their instantiation can be
+# costly (e.g. Payplug sets its global secret key and API version). So we keep one
+# instance per configuration for the lifetime of the process.
+_payment_backends = {}
+_payment_backends_lock = Lock()
+
+
+def _get_payment_backend_cache_key(backend, configuration):
+    """Return a hashable key bound to the payment backend path and its configuration."""
+    return backend, json.dumps(configuration, sort_keys=True, default=str)
+
 
 def get_payment_backend():
-    """Instantiate a payment backend through `JOANIE_PAYMENT_BACKEND` setting."""
+    """
+    Return the payment backend configured through `JOANIE_PAYMENT_BACKEND` setting.
+
+    The backend is instantiated once per configuration then reused.
+    """
     try:
         backend = settings.JOANIE_PAYMENT_BACKEND.get("backend")
         configuration = settings.JOANIE_PAYMENT_BACKEND.get("configuration")
-        return import_string(backend)(configuration)
+        cache_key = _get_payment_backend_cache_key(backend, configuration)
+
+        try:
+            return _payment_backends[cache_key]
+        except KeyError:
+            pass
+
+        with _payment_backends_lock:
+            if cache_key not in _payment_backends:
+                _payment_backends[cache_key] = import_string(backend)(configuration)
+            return _payment_backends[cache_key]
     except (AttributeError, ImportError, TypeError) as error:
         raise ValueError(
             "Cannot instantiate a payment backend. "
             "JOANIE_PAYMENT_BACKEND configuration seems not valid. "
             "Check your settings.py."
         ) from error
+
+
+def clear_payment_backends():
+    """Forget all payment backend instances so they are instantiated again."""
+    with _payment_backends_lock:
+        _payment_backends.clear()
+
+
+# pylint: disable=unused-argument
+def on_setting_changed(setting, **kwargs):
+    """Invalidate payment backend instances when the payment configuration changes."""
+    if setting == "JOANIE_PAYMENT_BACKEND":
+        clear_payment_backends()
+
+
+setting_changed.connect(on_setting_changed)
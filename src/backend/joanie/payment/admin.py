@@ -1,11 +1,36 @@
 """
 Payment application admin
 """
+from datetime import date
+from decimal import Decimal as D
+
 from django.contrib import admin
-from django.urls import reverse
+from django.core.exceptions import PermissionDenied
+from django.db.models import DecimalField, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import re_path, reverse
 from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from djmoney.money import Money
+
+from joanie.core.paginators import EstimatedCountPaginator
 
-from . import enums, models
+from . import enums, exports, models
+
+
+def sum_subquery(queryset):
+    """Return a subquery of the sum of totals of a queryset, 0 if it is empty."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(
+                sum=Func(F("total"), function="SUM", output_field=DecimalField())
+            )
+        ),
+        D("0.00"),
+        output_field=DecimalField(),
+    )
 
 
 @admin.register(models.ProformaInvoice)
@@ -13,6 +38,10 @@ class ProformaInvoiceAdmin(admin.ModelAdmin):
     """Admin class for the ProformaInvoice model."""
 
     list_display = ("type", "reference", "recipient_name", "total", "balance")
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ("order", "parent")
+    search_fields = ("reference__exact", "order__owner__username__exact")
+    show_full_result_count = False
     readonly_fields = (
         "balance",
         "children",
@@ -58,6 +87,83 @@ class ProformaInvoiceAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        """
+        Annotate pro forma invoices with the totals their balance needs so that the
+        changelist does not run several aggregates per pro forma invoice.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                children_total=sum_subquery(
+                    models.ProformaInvoice.objects.filter(parent=OuterRef("pk"))
+                ),
+                transactions_total=sum_subquery(
+                    models.Transaction.objects.filter(
+                        Q(proforma_invoice=OuterRef("pk"))
+                        | Q(proforma_invoice__parent=OuterRef("pk"))
+                    )
+                ),
+            )
+        )
+
+    @admin.display(description=_("balance"))
+    def balance(self, obj):  # pylint: disable=no-self-use
+        """Return the balance of the pro forma invoice from annotated totals."""
+        return Money(
+            obj.transactions_total - obj.total.amount - obj.children_total,
+            obj.total.currency,
+        )
+
+    def get_urls(self):
+        """
+        Add url to export orders with their pro forma invoices and transactions.
+        """
+        url_patterns = super().get_urls()
+
+        return [
+            re_path(
+                r"^export/$",
+                self.admin_site.admin_view(self.export),
+                name="payment_proformainvoice_export",
+            )
+        ] + url_patterns
+
+    def export(self, request):
+        """
+        Stream orders with their pro forma invoices and transactions as CSV or JSON
+        lines. Accept `format`, `since` and `until` query parameters.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        export_format = request.GET.get("format", exports.EXPORT_FORMAT_CSV)
+        if export_format not in exports.EXPORT_FORMATS:
+            return HttpResponseBadRequest(
+                f"Format should be one of {', '.join(exports.EXPORT_FORMATS)}."
+            )
+
+        try:
+            since, until = (
+                date.fromisoformat(request.GET[key]) if request.GET.get(key) else None
+                for key in ("since", "until")
+            )
+        except ValueError:
+            return HttpResponseBadRequest("Dates should be formatted as YYYY-MM-DD.")
+
+        response = StreamingHttpResponse(
+            exports.export_orders(
+                export_format=export_format, since=since, until=until
+            ),
+            content_type=exports.EXPORT_CONTENT_TYPES[export_format],
+        )
+        response[
+            "Content-Disposition"
+        ] = f"attachment; filename=orders.{export_format};"
+
+        return response
+
     def get_readonly_fields(self, request, obj=None):
         """Return readonly fields."""
 
@@ -132,6 +238,32 @@ class TransactionAdmin(admin.ModelAdmin):
         return ()
 
 
+@admin.register(models.OrderLedger)
+class OrderLedgerAdmin(admin.ModelAdmin):
+    """Admin class for the order ledger model, maintained by payment backends."""
+
+    list_display = (
+        "order",
+        "invoiced",
+        "paid",
+        "refunded",
+        "balance",
+        "last_event_type",
+        "last_event_on",
+    )
+    list_filter = ("last_event_type",)
+    list_select_related = ("order__owner", "order__product")
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        """Ledgers are computed from pro forma invoices and transactions."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Ledgers are computed from pro forma invoices and transactions."""
+        return False
+
+
 @admin.register(models.CreditCard)
 class CreditCardAdmin(admin.ModelAdmin):
     """Admin class for the credit card model."""
@@ -9,6 +9,7 @@ from rest_framework import mixins, permissions, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from joanie.core.databases import use_primary
 from joanie.core.models import User
 
 from . import exceptions, get_payment_backend, serializers
@@ -17,6 +18,7 @@ logger = logging.getLogger(__name__)
 
 
 @api_view(["POST"])
+@use_primary()
 @transaction.atomic()
 def webhook(request):
     """
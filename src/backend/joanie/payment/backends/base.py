@@ -9,6 +9,7 @@ from django.urls import reverse
 from django.utils.translation import gettext as _
 from django.utils.translation import override
 
+from .. import ledgers
 from ..enums import INVOICE_STATE_REFUNDED
 from ..models import ProformaInvoice, Transaction
 
@@ -52,13 +53,15 @@ class BasePaymentBackend:
             recipient_name=recipient_name,
             recipient_address=recipient_address,
         )
+        ledgers.record_proforma_invoice(proforma_invoice)
 
         # - Store the payment transaction
-        Transaction.objects.create(
+        payment_transaction = Transaction.objects.create(
             total=payment["amount"],
             proforma_invoice=proforma_invoice,
             reference=payment["id"],
         )
+        ledgers.record_transaction(payment_transaction)
 
         # - Mark order as validated
         order.validate()
@@ -122,12 +125,14 @@ class BasePaymentBackend:
             recipient_name=proforma_invoice.recipient_name,
             recipient_address=proforma_invoice.recipient_address,
         )
+        ledgers.record_proforma_invoice(credit_note)
 
-        Transaction.objects.create(
+        refund_transaction = Transaction.objects.create(
             total=credit_note.total,
             proforma_invoice=credit_note,
             reference=refund_reference,
         )
+        ledgers.record_transaction(refund_transaction)
 
         if proforma_invoice.state == INVOICE_STATE_REFUNDED:
             # order has been fully refunded
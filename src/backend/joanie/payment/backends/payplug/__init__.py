@@ -2,6 +2,8 @@
 import logging
 from decimal import Decimal as D
 
+from django.utils.functional import cached_property
+
 import payplug
 import requests
 from payplug import notifications
@@ -29,6 +31,14 @@ class PayplugBackend(BasePaymentBackend):
         payplug.set_secret_key(self.configuration["secret_key"])
         payplug.set_api_version(self.api_version)
 
+    @cached_property
+    def session(self):
+        """
+        HTTP session used to request Payplug API manually. As the backend instance is
+        reused, its connection pool is shared between requests.
+        """
+        return requests.Session()
+
     def _get_payment_data(self, request, order, billing_address):
         """Build the generic payment object"""
 
@@ -201,7 +211,7 @@ class PayplugBackend(BasePaymentBackend):
         payplug.Card.delete is not compatible with the latest API, so we
         need to make a request to Payplug API manualy.
         """
-        response = requests.delete(
+        response = self.session.delete(
             f"https://api.payplug.com/v1/cards/{credit_card.token}",
             headers={
                 "Authorization": f'Bearer {self.configuration.get("secret_key")}',
@@ -29,3 +29,17 @@ INVOICE_STATES = (
     # - REFUNDED : invoice balances are equal to zero
     (INVOICE_STATE_REFUNDED, _("Refunded")),
 )
+
+# Transaction types
+TRANSACTION_TYPE_DEBIT = "debit"
+TRANSACTION_TYPE_CREDIT = "credit"
+
+TRANSACTION_TYPES = (
+    # - A payment received, with positive amount
+    (TRANSACTION_TYPE_DEBIT, _("Debit")),
+    # - A refund, with negative amount
+    (TRANSACTION_TYPE_CREDIT, _("Credit")),
+)
+
+# Order ledger events
+LEDGER_EVENT_TYPES = INVOICE_TYPES + TRANSACTION_TYPES
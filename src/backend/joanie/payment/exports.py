@@ -0,0 +1,113 @@
+"""
+Streaming exports of orders with their pro forma invoices and transactions
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from joanie.core.models import Order
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL)
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_JSONL: "application/jsonl",
+}
+EXPORT_CHUNK_SIZE = 2000
+
+# Exported column names mapped to the order lookups they are read from. One row is
+# exported per order, pro forma invoice and transaction so that orders without
+# pro forma invoice and pro forma invoices without transaction are exported too.
+EXPORT_FIELDS = {
+    "order_id": "id",
+    "order_created_on": "created_on",
+    "order_is_canceled": "is_canceled",
+    "order_total": "total",
+    "order_total_currency": "total_currency",
+    "owner": "owner__username",
+    "course": "course__code",
+    "product": "product_id",
+    "proforma_invoice_reference": "proforma_invoices__reference",
+    "proforma_invoice_parent_reference": "proforma_invoices__parent__reference",
+    "proforma_invoice_created_on": "proforma_invoices__created_on",
+    "proforma_invoice_total": "proforma_invoices__total",
+    "proforma_invoice_total_currency": "proforma_invoices__total_currency",
+    "transaction_reference": "proforma_invoices__transactions__reference",
+    "transaction_created_on": "proforma_invoices__transactions__created_on",
+    "transaction_total": "proforma_invoices__transactions__total",
+    "transaction_total_currency": "proforma_invoices__transactions__total_currency",
+}
+
+
+class Echo:
+    """A file-like object which returns what is written instead of buffering it."""
+
+    @staticmethod
+    def write(value):
+        """Return the value to write."""
+        return value
+
+
+def get_export_queryset(since=None, until=None):
+    """
+    Return the flat queryset of exported rows for orders created between the `since`
+    and `until` dates (both included).
+    """
+    filters = {}
+    if since is not None:
+        filters["created_on__gte"] = timezone.make_aware(
+            datetime.combine(since, time.min)
+        )
+    if until is not None:
+        filters["created_on__lt"] = timezone.make_aware(
+            datetime.combine(until + timedelta(days=1), time.min)
+        )
+
+    return (
+        Order.objects.filter(**filters)
+        .order_by("created_on", "id")
+        .values_list(*EXPORT_FIELDS.values())
+    )
+
+
+def iter_csv(rows):
+    """Yield the header then each row serialized as a CSV line."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS.keys())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    """Yield each row serialized as a JSON line."""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_orders(
+    export_format=EXPORT_FORMAT_CSV,
+    since=None,
+    until=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
+):
+    """
+    Stream orders with their pro forma invoices and transactions in the given format.
+
+    Rows are fetched through a server-side cursor by chunks of `chunk_size` rows and
+    serialized one by one, so memory usage does not depend on the number of rows.
+    """
+    rows = get_export_queryset(since=since, until=until).iterator(chunk_size=chunk_size)
+
+    if export_format == EXPORT_FORMAT_CSV:
+        return iter_csv(rows)
+    if export_format == EXPORT_FORMAT_JSONL:
+        return iter_jsonl(rows)
+
+    raise ValueError(
+        f"Unknown export format {export_format}, "
+        f"expected one of {', '.join(EXPORT_FORMATS)}."
+    )
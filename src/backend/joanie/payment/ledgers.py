@@ -0,0 +1,134 @@
+"""
+Per-order ledgers summarizing pro forma invoices and transactions
+"""
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from djmoney.money import Money
+
+from .models import OrderLedger, ProformaInvoice, Transaction
+
+LEDGERS_REBUILD_BATCH_SIZE = 500
+LEDGER_TOTAL_FIELDS = (
+    "invoiced",
+    "paid",
+    "refunded",
+    "balance",
+    "last_event_type",
+    "last_event_on",
+)
+
+
+def get_empty_ledger(order_id, currency):
+    """Return a ledger with zero totals in the given currency. Saving is left to the caller."""
+    zero = Money(0, currency)
+    return OrderLedger(
+        order_id=order_id, invoiced=zero, paid=zero, refunded=zero, balance=zero
+    )
+
+
+def build_ledgers(order_currencies):
+    """
+    Return ledgers of orders, given as a mapping of order ids to their currency,
+    computed from all their pro forma invoices and transactions in two queries.
+    Ledgers are returned by order id and saving is left to the caller.
+    """
+    ledgers = {
+        order_id: get_empty_ledger(order_id, currency)
+        for order_id, currency in order_currencies.items()
+    }
+
+    for proforma_invoice in ProformaInvoice.objects.filter(order_id__in=ledgers).only(
+        "order_id", "total", "total_currency", "created_on"
+    ):
+        ledgers[proforma_invoice.order_id].record(
+            proforma_invoice.type, proforma_invoice.created_on, proforma_invoice.total
+        )
+
+    for payment_transaction in (
+        Transaction.objects.filter(proforma_invoice__order_id__in=ledgers)
+        .select_related("proforma_invoice")
+        .only("total", "total_currency", "created_on", "proforma_invoice__order_id")
+    ):
+        ledgers[payment_transaction.proforma_invoice.order_id].record(
+            payment_transaction.type,
+            payment_transaction.created_on,
+            payment_transaction.total,
+        )
+
+    return ledgers
+
+
+def rebuild_ledgers(orders, batch_size=LEDGERS_REBUILD_BATCH_SIZE):
+    """
+    Rebuild ledgers of the provided orders from their pro forma invoices and
+    transactions by batches of `batch_size` orders, with a constant number of
+    queries per batch. Return the number of rebuilt ledgers.
+    """
+    order_currencies = orders.order_by("pk").values_list("pk", "total_currency")
+    order_currencies = order_currencies.iterator(chunk_size=batch_size)
+
+    total = 0
+    while batch := dict(islice(order_currencies, batch_size)):
+        ledgers = build_ledgers(batch)
+        with transaction.atomic():
+            OrderLedger.objects.filter(order_id__in=batch).delete()
+            OrderLedger.objects.bulk_create(ledgers.values())
+        total += len(batch)
+
+    return total
+
+
+def create_ledger(order, currency):
+    """
+    Create the ledger of an order from all its events. If a concurrent event of the
+    same order created it meanwhile, the existing ledger is locked then rebuilt from
+    all events, so that no event is missed nor recorded twice.
+    """
+    ledger = build_ledgers({order.pk: currency})[order.pk]
+    try:
+        with transaction.atomic():
+            ledger.save(validate=False)
+    except IntegrityError:
+        existing_ledger = OrderLedger.objects.select_for_update().get(order=order)
+        ledger = build_ledgers({order.pk: currency})[order.pk]
+        for field in LEDGER_TOTAL_FIELDS:
+            setattr(existing_ledger, field, getattr(ledger, field))
+        existing_ledger.save(validate=False)
+
+
+def record_event(order, event_type, event_on, amount):
+    """
+    Add an event to the ledger of an order. The ledger row is locked so concurrent
+    payment notifications of the same order are recorded one after the other.
+    An order without ledger yet gets its ledger built from all its events.
+    """
+    with transaction.atomic():
+        try:
+            ledger = OrderLedger.objects.select_for_update().get(order=order)
+        except OrderLedger.DoesNotExist:
+            create_ledger(order, amount.currency)
+        else:
+            ledger.record(event_type, event_on, amount)
+            ledger.save(validate=False)
+
+
+def record_proforma_invoice(proforma_invoice):
+    """Add a pro forma invoice or a credit note to the ledger of its order."""
+    record_event(
+        proforma_invoice.order,
+        proforma_invoice.type,
+        proforma_invoice.created_on,
+        proforma_invoice.total,
+    )
+
+
+def record_transaction(payment_transaction):
+    """Add a debit or a credit transaction to the ledger of its order."""
+    record_event(
+        payment_transaction.proforma_invoice.order,
+        payment_transaction.type,
+        payment_transaction.created_on,
+        payment_transaction.total,
+    )
@@ -0,0 +1,76 @@
+"""Management command to export orders with their pro forma invoices and transactions."""
+from datetime import date
+
+from django.core.management import BaseCommand
+
+from joanie.payment.exports import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    export_orders,
+)
+
+
+class Command(BaseCommand):
+    """
+    A command to export orders with their pro forma invoices and transactions
+    as CSV or JSON lines.
+
+    Rows are streamed to the output so the export runs with constant memory
+    whatever the number of orders. Through options, you are able to restrict the
+    export to orders created in a date range (--since, --until).
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=EXPORT_FORMATS,
+            default=EXPORT_FORMAT_CSV,
+            help="Export format.",
+        )
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Only export orders created on or after this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            help="Only export orders created on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="Path of the file to write the export to. Default to stdout.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at once.",
+        )
+
+    def handle(self, *args, **options):
+        """Stream the export to the output."""
+        lines = export_orders(
+            export_format=options["format"],
+            since=options["since"],
+            until=options["until"],
+            chunk_size=options["chunk_size"],
+        )
+
+        if options["output"] is None:
+            self._write_lines(lines, self.stdout)
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            self._write_lines(lines, output)
+
+    @staticmethod
+    def _write_lines(lines, output):
+        """Write exported lines to the output as they are produced."""
+        for line in lines:
+            output.write(line)
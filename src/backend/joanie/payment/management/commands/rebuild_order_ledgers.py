@@ -0,0 +1,67 @@
+"""Management command to rebuild order ledgers."""
+import logging
+
+from django.core.management import BaseCommand
+
+from joanie.core.models import Order
+from joanie.payment.ledgers import LEDGERS_REBUILD_BATCH_SIZE, rebuild_ledgers
+
+logger = logging.getLogger("joanie.payment.rebuild_order_ledgers")
+
+
+class Command(BaseCommand):
+    """
+    A command to rebuild order ledgers from pro forma invoices and transactions.
+
+    Ledgers are updated incrementally by payment backends. This command rebuilds
+    them, for example after pro forma invoices have been created from the admin.
+    Through options, you are able to restrict this command to a list of courses
+    (-c), products (-p) or orders (-o). Otherwise, ledgers of all orders are
+    rebuilt.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--courses",
+            "--course",
+            nargs="+",
+            help="Accept a single or a list of course code to rebuild order ledgers.",
+        )
+        parser.add_argument(
+            "-p",
+            "--products",
+            "--product",
+            nargs="+",
+            help="Accept a single or a list of product id to rebuild order ledgers.",
+        )
+        parser.add_argument(
+            "-o",
+            "--orders",
+            "--order",
+            nargs="+",
+            help="Accept a single or a list of order id to rebuild their ledger.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LEDGERS_REBUILD_BATCH_SIZE,
+            help="Number of order ledgers rebuilt per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Retrieve orders matching the options then rebuild their ledger."""
+        filters = {}
+        if options["orders"]:
+            filters["id__in"] = options["orders"]
+        if options["courses"]:
+            filters["course__code__in"] = options["courses"]
+        if options["products"]:
+            filters["product__id__in"] = options["products"]
+
+        count = rebuild_ledgers(
+            Order.objects.filter(**filters), batch_size=options["batch_size"]
+        )
+        logger.info("%d order ledgers have been rebuilt.", count)
@@ -0,0 +1,162 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:00
+
+import uuid
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import djmoney.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_course_run_languages_array"),
+        ("payment", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderLedger",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="primary key for the record as UUID",
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="id",
+                    ),
+                ),
+                (
+                    "created_on",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="date and time at which a record was created",
+                        verbose_name="created on",
+                    ),
+                ),
+                (
+                    "updated_on",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="date and time at which a record was last updated",
+                        verbose_name="updated on",
+                    ),
+                ),
+                (
+                    "invoiced_currency",
+                    djmoney.models.fields.CurrencyField(
+                        choices=[("EUR", "Euro")],
+                        default="EUR",
+                        editable=False,
+                        max_length=3,
+                    ),
+                ),
+                (
+                    "invoiced",
+                    djmoney.models.fields.MoneyField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="sum of pro forma invoices and credit notes",
+                        max_digits=9,
+                        verbose_name="invoiced",
+                    ),
+                ),
+                (
+                    "paid_currency",
+                    djmoney.models.fields.CurrencyField(
+                        choices=[("EUR", "Euro")],
+                        default="EUR",
+                        editable=False,
+                        max_length=3,
+                    ),
+                ),
+                (
+                    "paid",
+                    djmoney.models.fields.MoneyField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="sum of debit transactions",
+                        max_digits=9,
+                        verbose_name="paid",
+                    ),
+                ),
+                (
+                    "refunded_currency",
+                    djmoney.models.fields.CurrencyField(
+                        choices=[("EUR", "Euro")],
+                        default="EUR",
+                        editable=False,
+                        max_length=3,
+                    ),
+                ),
+                (
+                    "refunded",
+                    djmoney.models.fields.MoneyField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="sum of credit transactions",
+                        max_digits=9,
+                        verbose_name="refunded",
+                    ),
+                ),
+                (
+                    "balance_currency",
+                    djmoney.models.fields.CurrencyField(
+                        choices=[("EUR", "Euro")],
+                        default="EUR",
+                        editable=False,
+                        max_length=3,
+                    ),
+                ),
+                (
+                    "balance",
+                    djmoney.models.fields.MoneyField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        help_text="paid minus refunded minus invoiced",
+                        max_digits=9,
+                        verbose_name="balance",
+                    ),
+                ),
+                (
+                    "last_event_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("invoice", "Invoice"),
+                            ("credit_note", "Credit note"),
+                            ("debit", "Debit"),
+                            ("credit", "Credit"),
+                        ],
+                        max_length=20,
+                        verbose_name="last event type",
+                    ),
+                ),
+                (
+                    "last_event_on",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last event on"
+                    ),
+                ),
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger",
+                        to="core.order",
+                        verbose_name="order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Order ledger",
+                "verbose_name_plural": "Order ledgers",
+                "db_table": "joanie_order_ledger",
+            },
+        ),
+    ]
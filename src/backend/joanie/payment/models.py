@@ -308,14 +308,15 @@ class ProformaInvoice(BaseModel):
 
         return super().clean()
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validate=True, **kwargs):
         """
-        Enforce validation each time an instance is saved.
+        Enforce validation each time an instance is saved unless `validate` is False.
 
         On creation, we also create a context for each active languages.
         """
 
-        self.full_clean()
+        if validate:
+            self.full_clean()
 
         is_new = self.created_on is None
 
@@ -368,6 +369,103 @@ class Transaction(BaseModel):
         )
         return f"{transaction_type} transaction ({self.total})"
 
+    @property
+    def type(self):
+        """
+        Return the transaction type according to its total amount.
+        If total amount is negative, transaction type is "credit"
+        otherwise it's "debit"
+        """
+        if self.total.amount < 0:  # pylint: disable=no-member
+            return payment_enums.TRANSACTION_TYPE_CREDIT
+
+        return payment_enums.TRANSACTION_TYPE_DEBIT
+
+
+class OrderLedger(BaseModel):
+    """
+    OrderLedger model summarizes what an order has been invoiced, paid and refunded
+    so that money questions about an order are answered by reading one row instead
+    of aggregating its pro forma invoices and transactions.
+
+    It is updated incrementally by payment backends and can be rebuilt from pro forma
+    invoices and transactions with the `rebuild_order_ledgers` command.
+    """
+
+    order = models.OneToOneField(
+        to=Order,
+        verbose_name=_("order"),
+        related_name="ledger",
+        on_delete=models.CASCADE,
+    )
+    invoiced = MoneyField(
+        _("invoiced"),
+        help_text=_("sum of pro forma invoices and credit notes"),
+        max_digits=9,
+        decimal_places=2,
+        default=D("0.00"),
+        default_currency=settings.DEFAULT_CURRENCY,
+    )
+    paid = MoneyField(
+        _("paid"),
+        help_text=_("sum of debit transactions"),
+        max_digits=9,
+        decimal_places=2,
+        default=D("0.00"),
+        default_currency=settings.DEFAULT_CURRENCY,
+    )
+    refunded = MoneyField(
+        _("refunded"),
+        help_text=_("sum of credit transactions"),
+        max_digits=9,
+        decimal_places=2,
+        default=D("0.00"),
+        default_currency=settings.DEFAULT_CURRENCY,
+    )
+    balance = MoneyField(
+        _("balance"),
+        help_text=_("paid minus refunded minus invoiced"),
+        max_digits=9,
+        decimal_places=2,
+        default=D("0.00"),
+        default_currency=settings.DEFAULT_CURRENCY,
+    )
+    last_event_type = models.CharField(
+        _("last event type"),
+        choices=payment_enums.LEDGER_EVENT_TYPES,
+        max_length=20,
+        blank=True,
+    )
+    last_event_on = models.DateTimeField(_("last event on"), null=True, blank=True)
+
+    class Meta:
+        db_table = "joanie_order_ledger"
+        verbose_name = _("Order ledger")
+        verbose_name_plural = _("Order ledgers")
+
+    def __str__(self):
+        return f"Ledger of order {self.order_id}"
+
+    def record(self, event_type, event_on, amount):
+        """
+        Add the amount of an event to the ledger totals according to its type.
+        Saving is left to the caller.
+        """
+        if event_type in (
+            payment_enums.INVOICE_TYPE_INVOICE,
+            payment_enums.INVOICE_TYPE_CREDIT_NOTE,
+        ):
+            self.invoiced += amount
+        elif event_type == payment_enums.TRANSACTION_TYPE_DEBIT:
+            self.paid += amount
+        else:
+            self.refunded -= amount
+
+        self.balance = self.paid - self.refunded - self.invoiced
+        if self.last_event_on is None or event_on >= self.last_event_on:
+            self.last_event_type = event_type
+            self.last_event_on = event_on
+
 
 class CreditCard(BaseModel):
     """
@@ -91,6 +91,15 @@ class Base(Configuration):
             "PORT": values.Value(5432, environ_name="DB_PORT", environ_prefix=None),
         }
     }
+    # Hosts of optional read replicas of the default database, declared in
+    # DATABASES as "replica_<index>" and used by GET requests
+    DB_REPLICA_HOSTS = values.ListValue(
+        [], environ_name="DB_REPLICA_HOSTS", environ_prefix=None
+    )
+    DATABASE_ROUTERS = ["joanie.core.databases.ReplicaRouter"]
+    JOANIE_DATABASE_REPLICA_STICKINESS = values.PositiveIntegerValue(
+        10, environ_prefix=None
+    )  # Seconds during which clients read from the primary database after a write
     DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
     # Static files (CSS, JavaScript, Images)
@@ -165,6 +174,7 @@ class Base(Configuration):
         "django.contrib.auth.middleware.AuthenticationMiddleware",
         "django.contrib.messages.middleware.MessageMiddleware",
         "dockerflow.django.middleware.DockerflowMiddleware",
+        "joanie.core.databases.ReplicaRoutingMiddleware",
     ]
 
     AUTHENTICATION_BACKENDS = [
@@ -212,6 +222,9 @@ class Base(Configuration):
             ),
         }
     ]
+
+    # Badge providers, the OBF access token being shared by all processes through
+    # the cache, which must then be shared too
     JOANIE_BADGE_PROVIDERS = {
         "obf": {
             "client_id": values.Value(
@@ -222,11 +235,40 @@ class Base(Configuration):
             ),
         }
     }
+    JOANIE_BADGE_ISSUANCE_BATCH_SIZE = values.PositiveIntegerValue(
+        100, environ_prefix=None
+    )  # Number of recipients per badge issuance request
+    JOANIE_ADMIN_ESTIMATED_COUNT_THRESHOLD = values.PositiveIntegerValue(
+        100000, environ_prefix=None
+    )  # Rows above which admin changelists show an estimated count
+    JOANIE_ADMIN_CANCEL_ORDERS_MAX_COUNT = values.PositiveIntegerValue(
+        100, environ_prefix=None
+    )  # Orders canceled at once from the admin, more need the `cancel_orders` command
 
     # Cache
+    # Grades warmed up or pushed by LMS, locks and read replica stickiness are stored
+    # in the cache, so it must be shared by all processes (web workers and management
+    # commands) for them to work: use the database (after running the
+    # `createcachetable` command), Redis or Memcached cache backends in production
+    # and wherever LMS push grades (`JOANIE_GRADES_PUSH_SECRETS`), read replicas
+    # are declared (`DB_REPLICA_HOSTS`), catalog snapshots are published on changes
+    # (`JOANIE_CATALOG_SNAPSHOT_ON_CHANGE`) or the OBF badge provider is configured
+    # (`OBF_CLIENT_ID`).
     CACHES = {
-        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "default": {
+            "BACKEND": values.Value(
+                "django.core.cache.backends.locmem.LocMemCache",
+                environ_name="CACHE_BACKEND",
+                environ_prefix=None,
+            ),
+            "LOCATION": values.Value(
+                "", environ_name="CACHE_LOCATION", environ_prefix=None
+            ),
+        },
     }
+    JOANIE_SHARED_CACHE_REQUIRED = values.BooleanValue(
+        False, environ_prefix=None
+    )  # Refuse to start if the cache is local to each process
 
     JOANIE_ANONYMOUS_SERIALIZER_DEFAULT_CACHE_TTL = values.PositiveIntegerValue(
         3600, environ_prefix=None
@@ -234,6 +276,59 @@ class Base(Configuration):
     JOANIE_ENROLLMENT_GRADE_CACHE_TTL = values.PositiveIntegerValue(
         600, environ_prefix=None
     )  # 10 minutes
+    JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL = values.PositiveIntegerValue(
+        60, environ_prefix=None
+    )  # 1 minute, failures are cached shortly to spare a failing LMS
+    JOANIE_PUSHED_GRADE_CACHE_TTL = values.PositiveIntegerValue(
+        172800, environ_prefix=None
+    )  # 2 days, pushed grades must outlive the next nightly certificate generation
+    JOANIE_GRADE_WARMUP_MAX_WORKERS = values.PositiveIntegerValue(
+        4, environ_prefix=None
+    )  # Concurrent LMS requests of the `warm_grades` command
+
+    JOANIE_LMS_CONNECT_TIMEOUT = values.FloatValue(
+        3.05, environ_prefix=None
+    )  # Seconds to connect to an LMS or to wait for a concurrent LMS call slot
+    JOANIE_LMS_READ_TIMEOUT = values.FloatValue(
+        10, environ_prefix=None
+    )  # Seconds to wait for an LMS response
+    JOANIE_LMS_CIRCUIT_BREAKER_FAILURE_THRESHOLD = values.PositiveIntegerValue(
+        5, environ_prefix=None
+    )  # Consecutive failures opening the circuit of an LMS, 0 to disable it
+    JOANIE_LMS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = values.PositiveIntegerValue(
+        30, environ_prefix=None
+    )  # Seconds an LMS circuit stays open before a trial call
+    JOANIE_LMS_MAX_CONCURRENT_REQUESTS = values.PositiveIntegerValue(
+        10, environ_prefix=None
+    )  # Concurrent LMS calls by process
+
+    JOANIE_CATALOG_SNAPSHOT_DIRECTORY = values.Value(
+        "catalog", environ_prefix=None
+    )  # Directory of catalog snapshots in the default storage
+    # Publish snapshots of catalog objects affected by each change, which requires
+    # a cache shared by all processes to lock the manifest of snapshots
+    JOANIE_CATALOG_SNAPSHOT_ON_CHANGE = values.BooleanValue(False, environ_prefix=None)
+
+    # Cache-Control directives of anonymous responses of catalog endpoints, by route
+    JOANIE_CATALOG_CACHE_CONTROL = {
+        route: {
+            "max_age": values.PositiveIntegerValue(
+                60,
+                environ_name=f"JOANIE_{name}_CACHE_MAX_AGE",
+                environ_prefix=None,
+            ),
+            "stale_while_revalidate": values.PositiveIntegerValue(
+                600,
+                environ_name=f"JOANIE_{name}_CACHE_STALE_WHILE_REVALIDATE",
+                environ_prefix=None,
+            ),
+        }
+        for route, name in (
+            ("courses", "COURSES"),
+            ("course-runs", "COURSE_RUNS"),
+            ("products", "PRODUCTS"),
+        )
+    }
 
     REST_FRAMEWORK = {
         "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -270,6 +365,9 @@ class Base(Configuration):
     # Marion
     MARION_DOCUMENT_ISSUER_CHOICES_CLASS = "howard.defaults.DocumentIssuerChoices"
     MARION_CERTIFICATE_DOCUMENT_ISSUER = "howard.issuers.CertificateDocument"
+    JOANIE_CERTIFICATE_ARCHIVE_WORKERS = values.PositiveIntegerValue(
+        4, environ_prefix=None
+    )  # Number of processes rendering certificates of an archive
 
     # Django Money
     DEFAULT_CURRENCY = "EUR"
@@ -319,6 +417,21 @@ class Base(Configuration):
     # Sentry
     SENTRY_DSN = values.Value(None, environ_name="SENTRY_DSN")
 
+    def __init__(self):
+        # Declare a database per read replica, sharing the default database settings
+        for alias, host in zip(self.JOANIE_DATABASE_REPLICAS, self.DB_REPLICA_HOSTS):
+            self.DATABASES[alias] = {
+                **self.DATABASES["default"],
+                "HOST": host,
+                "TEST": {"MIRROR": "default"},
+            }
+
+    # pylint: disable=invalid-name
+    @property
+    def JOANIE_DATABASE_REPLICAS(self):
+        """Aliases of the read replica databases."""
+        return [f"replica_{index:d}" for index in range(len(self.DB_REPLICA_HOSTS))]
+
     # pylint: disable=invalid-name
     @property
     def ENVIRONMENT(self):
@@ -394,6 +507,7 @@ class Development(Base):
     }
 
     def __init__(self):
+        super().__init__()
         # pylint: disable=invalid-name
         self.INSTALLED_APPS += ["drf_yasg"]
 
@@ -416,6 +530,17 @@ class Test(Base):
     }
 
     JOANIE_ENROLLMENT_GRADE_CACHE_TTL = 0
+    JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL = 0
+    JOANIE_LMS_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 0
+
+    def __init__(self):
+        super().__init__()
+        # A database standing for a read replica, which does not mirror the default
+        # database so that tests can tell to which database queries are sent
+        self.DATABASES["replica"] = {
+            **self.DATABASES["default"],
+            "NAME": f"{self.DATABASES['default']['NAME']}_replica",
+        }
 
     LOGGING = values.DictValue(
         {
@@ -484,6 +609,9 @@ class Production(Base):
     # Privacy
     SECURE_REFERRER_POLICY = "same-origin"
 
+    # Cache
+    JOANIE_SHARED_CACHE_REQUIRED = values.BooleanValue(True, environ_prefix=None)
+
     # Media
     DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
     AWS_S3_ENDPOINT_URL = values.Value()
@@ -0,0 +1,264 @@
+"""
+A local stand-in for the Open Badge Factory API to test badge providers end-to-end
+
+It implements the endpoints used by `OBFAPIClient` in a HTTP server running in a
+thread of the current process, with a configurable latency and error injection so
+that batching and concurrency of badge providers can be measured offline.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeOBFRequestHandler(BaseHTTPRequestHandler):
+    """Handle requests to the fake OBF API."""
+
+    protocol_version = "HTTP/1.1"
+
+    routes = (
+        ("POST", r"^/v1/client/oauth2/token$", "token"),
+        ("GET", r"^/v1/ping/(?P<client_id>[^/]+)$", "ping"),
+        ("GET", r"^/v1/badge/(?P<client_id>[^/]+)$", "list_badges"),
+        ("POST", r"^/v1/badge/(?P<client_id>[^/]+)$", "create_badge"),
+        ("DELETE", r"^/v1/badge/(?P<client_id>[^/]+)$", "delete_badges"),
+        ("GET", r"^/v1/badge/(?P<client_id>[^/]+)/(?P<badge_id>[^/]+)$", "get_badge"),
+        (
+            "PUT",
+            r"^/v1/badge/(?P<client_id>[^/]+)/(?P<badge_id>[^/]+)$",
+            "update_badge",
+        ),
+        (
+            "DELETE",
+            r"^/v1/badge/(?P<client_id>[^/]+)/(?P<badge_id>[^/]+)$",
+            "delete_badge",
+        ),
+        ("POST", r"^/v1/badge/(?P<client_id>[^/]+)/(?P<badge_id>[^/]+)$", "issue"),
+        ("GET", r"^/v1/event/(?P<client_id>[^/]+)$", "list_events"),
+        ("GET", r"^/v1/event/(?P<client_id>[^/]+)/(?P<event_id>[^/]+)$", "get_event"),
+        (
+            "DELETE",
+            r"^/v1/event/(?P<client_id>[^/]+)/(?P<event_id>[^/]+)$",
+            "revoke",
+        ),
+    )
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        """Do not log requests on stderr."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Dispatch GET requests."""
+        self.dispatch()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Dispatch POST requests."""
+        self.dispatch()
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Dispatch PUT requests."""
+        self.dispatch()
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Dispatch DELETE requests."""
+        self.dispatch()
+
+    def dispatch(self):
+        """Route the request to its handler after latency and error injection."""
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        server = self.server.fake
+
+        for method, pattern, name in self.routes:
+            match = re.match(pattern, url.path)
+            if method == self.command and match:
+                break
+        else:
+            self.respond(404)
+            return
+
+        server.requests[name] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if name != "token" and server.random.random() < server.error_rate:
+            server.errors[name] += 1
+            self.respond(500)
+            return
+
+        getattr(self, f"handle_{name}")(body, parse_qs(url.query), **match.groupdict())
+
+    def respond(self, status, payload=None, headers=None, lines=None):
+        """Send a response with a JSON payload or JSON lines."""
+        if lines is not None:
+            content = b"".join(
+                json.dumps(line).encode("utf-8") + b"\n" for line in lines
+            )
+        elif payload is not None:
+            content = json.dumps(payload).encode("utf-8")
+        else:
+            content = b""
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    @staticmethod
+    def get_badge_content(body, badge_id):
+        """Return the badge as stored by OBF, without client-side fields."""
+        return {
+            **{key: value for key, value in body.items() if key != "is_created"},
+            "id": badge_id,
+        }
+
+    # pylint: disable=unused-argument
+    def handle_token(self, body, query):
+        """Grant an access token."""
+        self.respond(
+            200,
+            {
+                "access_token": uuid.uuid4().hex,
+                "expires_in": 36000,
+                "token_type": "bearer",
+            },
+        )
+
+    def handle_ping(self, body, query, client_id):
+        """Check credentials."""
+        self.respond(200, client_id)
+
+    def handle_list_badges(self, body, query, client_id):
+        """List badges as JSON lines, optionally filtered by ids."""
+        badges = self.server.fake.badges
+        if "id" in query:
+            ids = query["id"][0].split("|")
+            badges = {key: badges[key] for key in ids if key in badges}
+        self.respond(200, lines=list(badges.values()))
+
+    def handle_create_badge(self, body, query, client_id):
+        """Create a badge."""
+        badge_id = uuid.uuid4().hex[:16]
+        self.server.fake.badges[badge_id] = self.get_badge_content(body, badge_id)
+        self.respond(201, headers={"Location": f"/v1/badge/{client_id}/{badge_id}"})
+
+    def handle_delete_badges(self, body, query, client_id):
+        """Delete all badges."""
+        self.server.fake.badges.clear()
+        self.respond(204)
+
+    def handle_get_badge(self, body, query, client_id, badge_id):
+        """Get a badge."""
+        try:
+            self.respond(200, self.server.fake.badges[badge_id])
+        except KeyError:
+            self.respond(404)
+
+    def handle_update_badge(self, body, query, client_id, badge_id):
+        """Update a badge."""
+        if badge_id not in self.server.fake.badges:
+            self.respond(404)
+            return
+        self.server.fake.badges[badge_id] = self.get_badge_content(body, badge_id)
+        self.respond(204)
+
+    def handle_delete_badge(self, body, query, client_id, badge_id):
+        """Delete a badge."""
+        if self.server.fake.badges.pop(badge_id, None) is None:
+            self.respond(404)
+            return
+        self.respond(204)
+
+    def handle_issue(self, body, query, client_id, badge_id):
+        """Issue a badge to recipients."""
+        if badge_id not in self.server.fake.badges:
+            self.respond(404)
+            return
+        event_id = uuid.uuid4().hex[:16]
+        self.server.fake.events[event_id] = {
+            "id": event_id,
+            "badge_id": badge_id,
+            "recipient": list(body.get("recipient", [])),
+            "revoked": {},
+        }
+        self.respond(201, headers={"Location": f"/v1/event/{client_id}/{event_id}"})
+
+    def handle_list_events(self, body, query, client_id):
+        """List issuance events as JSON lines."""
+        self.respond(200, lines=list(self.server.fake.events.values()))
+
+    def handle_get_event(self, body, query, client_id, event_id):
+        """Get an issuance event."""
+        try:
+            self.respond(200, self.server.fake.events[event_id])
+        except KeyError:
+            self.respond(404)
+
+    def handle_revoke(self, body, query, client_id, event_id):
+        """Revoke an issuance event for recipients."""
+        try:
+            event = self.server.fake.events[event_id]
+        except KeyError:
+            self.respond(404)
+            return
+        for email in query.get("email", [""])[0].split("|"):
+            event["revoked"][email] = int(time.time())
+        self.respond(204)
+
+
+# pylint: disable=too-many-instance-attributes
+class FakeOBFServer:
+    """
+    A fake OBF API server running in a thread.
+
+    Use it as a context manager and give its `url` as `api_root_url` to the OBF
+    provider. Each request waits for `latency` seconds and fails with a 500 error
+    with an `error_rate` probability (access token requests never fail). Requests
+    and injected errors are counted by endpoint.
+    """
+
+    def __init__(self, latency=0, error_rate=0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.badges = {}
+        self.events = {}
+        self.requests = Counter()
+        self.errors = Counter()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Return the root URL of the fake API."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving on a free local port."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOBFRequestHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
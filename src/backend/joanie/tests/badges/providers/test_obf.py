@@ -1,7 +1,11 @@
 """Test suite for the OBF badge provider."""
 
+import json
 import re
+from io import BytesIO
+from unittest import mock
 
+from django.core.cache import cache
 from django.test import TestCase
 
 import pytest
@@ -118,6 +122,65 @@ class OBFAPIClientTestCase(TestCase):
                 client_secret="fake_secret",
             )
 
+    def test_access_token_shared_cache(self):
+        """Access tokens should be stored in the Django cache until shortly before
+        they expire then renewed proactively."""
+
+        self.requests_mock.post(
+            "https://openbadgefactory.com/v1/client/oauth2/token",
+            json={
+                "access_token": "accesstoken123",
+                "expires_in": 600,
+            },
+            status=200,
+        )
+        credentials = (
+            "real_client",
+            "super_duper",
+            "v1",
+            "https://openbadgefactory.com",
+        )
+        # pylint: disable=protected-access
+        token_cache = OBFAPIClient._access_token
+        key = token_cache.get_key(*credentials)
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as mock_set:
+            assert token_cache(*credentials) == "accesstoken123"
+        mock_set.assert_called_once_with(key, "accesstoken123", 540)
+        assert cache.get(key) == "accesstoken123"
+
+        # Another process renews the access token before its expiration
+        cache.set(key, "accesstoken456")
+        api_client = OBFAPIClient(client_id="real_client", client_secret="super_duper")
+        assert api_client.auth.access_token == "accesstoken456"
+        assert len(self.requests_mock.calls) == 1
+
+    def test_access_token_renewal_lock(self):
+        """When another process is renewing the access token, it should wait for it
+        instead of requesting a new one."""
+
+        credentials = (
+            "real_client",
+            "super_duper",
+            "v1",
+            "https://openbadgefactory.com",
+        )
+        # pylint: disable=protected-access
+        token_cache = OBFAPIClient._access_token
+        key = token_cache.get_key(*credentials)
+        cache.add(f"{key}_lock", True)
+
+        def renew(_seconds):
+            cache.set(key, "accesstoken789")
+
+        try:
+            with mock.patch("time.sleep", side_effect=renew):
+                assert token_cache(*credentials) == "accesstoken789"
+        finally:
+            cache.delete(f"{key}_lock")
+            cache.delete(key)
+        assert len(self.requests_mock.calls) == 0
+
     def test_request(self):
         """Test the OBF provider request method."""
 
@@ -223,36 +286,72 @@ class OBFAPIClientTestCase(TestCase):
             )
             api_client.check_auth()
 
-    # pylint: disable=protected-access
+    @staticmethod
+    def _response(content, content_type="application/json"):
+        """Build a streamed response with the given body."""
+
+        response = requests.Response()
+        response.raw = BytesIO(content)
+        response.headers["Content-Type"] = content_type
+        return response
+
     def test_iter_json(self):
         """Test the OBF provider iter_json method."""
 
-        response = requests.Response()
-        response._content = b'{"id": 1}'
+        response = self._response(b'{"id": 1}')
         assert list(OBFAPIClient.iter_json(response)) == [{"id": 1}]
 
-        response = requests.Response()
-        response._content = b'[{"id": 1},{"id": 2}]'
+        response = self._response(b'[{"id": 1},{"id": 2}]')
         assert list(OBFAPIClient.iter_json(response)) == [{"id": 1}, {"id": 2}]
 
-        response = requests.Response()
-        response._content = b'[\n{"id": 1},\n{"id": 2}\n]'
+        response = self._response(b'[\n{"id": 1},\n{"id": 2}\n]')
         assert list(OBFAPIClient.iter_json(response)) == [{"id": 1}, {"id": 2}]
 
-        response = requests.Response()
-        response._content = b"[]"
+        response = self._response(b"[]")
         assert not list(OBFAPIClient.iter_json(response))
 
-        response = requests.Response()
-        response._content = b'{"id": 1}\n{"id": 2}\n{"id": 3}\n'
-        with pytest.raises(requests.JSONDecodeError):
-            response.json()
+        response = self._response(b"")
+        assert not list(OBFAPIClient.iter_json(response))
+
+        response = self._response(b'{"id": 1}\n{"id": 2}\n{"id": 3}\n')
         assert list(OBFAPIClient.iter_json(response)) == [
             {"id": 1},
             {"id": 2},
             {"id": 3},
         ]
 
+        response = self._response(
+            b'{"id": 1}\n\n{"id": 2}\n', content_type="application/x-ndjson"
+        )
+        assert list(OBFAPIClient.iter_json(response)) == [{"id": 1}, {"id": 2}]
+
+    def test_iter_json_streaming(self):
+        """JSON lines should be parsed as they are read, not once the whole response
+        has been downloaded."""
+
+        line = json.dumps({"id": "abcd1234", "name": "Badge"}).encode("utf-8")
+
+        class LazyBody:
+            """A JSON lines body generated while it is read."""
+
+            def __init__(self):
+                self.read_count = 0
+
+            def read(self, size):
+                """Return about `size` bytes of JSON lines, 10000 lines at most."""
+                count = min(size // (len(line) + 1) or 1, 10000 - self.read_count)
+                self.read_count += count
+                return (line + b"\n") * count
+
+        response = requests.Response()
+        response.raw = LazyBody()
+        badges = OBFAPIClient.iter_json(response)
+
+        assert next(badges) == {"id": "abcd1234", "name": "Badge"}
+        assert 0 < response.raw.read_count < 10000
+        assert sum(1 for _ in badges) == 9999
+        assert response.raw.read_count == 10000
+
 
 class BadgeQueryModelTestCase(TestCase):
     """Tests for the BadgeQuery model"""
@@ -0,0 +1,176 @@
+"""
+Benchmarks of badge providers against the fake OBF server
+
+They are skipped unless the `JOANIE_BENCHMARKS` environment variable is set, e.g.:
+
+    JOANIE_BENCHMARKS=1 bin/pytest -s joanie/tests/badges/test_benchmarks_obf.py
+
+Scale and latency can be tuned with the `JOANIE_BENCHMARKS_SIZE` (number of users or
+badges, default 1000) and `JOANIE_BENCHMARKS_LATENCY` (seconds per request, default
+0.02) environment variables.
+"""
+import json
+import os
+import time
+import tracemalloc
+from itertools import islice
+from unittest import skipUnless
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import requests
+
+from joanie.badges import factories, helpers, models
+from joanie.badges.providers.obf import OBF, Badge, OBFAPIClient
+from joanie.core import factories as core_factories
+
+from .obf_server import FakeOBFServer
+
+BENCHMARKS_SIZE = int(os.environ.get("JOANIE_BENCHMARKS_SIZE", 1000))
+BENCHMARKS_LATENCY = float(os.environ.get("JOANIE_BENCHMARKS_LATENCY", 0.02))
+
+
+@skipUnless(os.environ.get("JOANIE_BENCHMARKS"), "Benchmarks are not enabled.")
+class OBFBenchmarksTestCase(TestCase):
+    """Measure badge issuance, synchronization and revocation throughput."""
+
+    def setUp(self):
+        """Start the fake OBF server and configure the OBF provider to use it."""
+        self.server = FakeOBFServer(latency=BENCHMARKS_LATENCY).start()
+        self.settings_override = override_settings(
+            JOANIE_BADGE_PROVIDERS={
+                "obf": {
+                    "client_id": "real_client",
+                    "client_secret": "super_duper",
+                    "api_root_url": self.server.url,
+                }
+            }
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Stop the fake OBF server."""
+        self.settings_override.disable()
+        self.server.stop()
+        # pylint: disable=protected-access
+        OBFAPIClient._access_token.cache_clear()
+
+    def report(self, scenario, duration, count):
+        """Print the throughput of a scenario."""
+        print(
+            f"\n{scenario}: {count} items in {duration:.2f}s "
+            f"({count / duration:.0f} items/s, {dict(self.server.requests)})"
+        )
+
+    def create_badge(self):
+        """Create a badge on the fake server and mirror it locally."""
+        provider_badge = OBF(
+            "real_client", "super_duper", api_root_url=self.server.url
+        ).create(Badge(name="benchmark", description="benchmark"))
+        return factories.BadgeFactory(
+            provider="OBF",
+            iri=f"{self.server.url}/v1/badge/real_client/{provider_badge.id}",
+        )
+
+    def test_benchmarks_obf_issuance(self):
+        """Issue a badge to BENCHMARKS_SIZE users for several batch sizes."""
+        badge = self.create_badge()
+        core_factories.UserFactory.create_batch(BENCHMARKS_SIZE)
+
+        for batch_size in (1, 10, 100):
+            models.IssuedBadge.objects.all().delete()
+            self.server.requests.clear()
+            start = time.perf_counter()
+            count = helpers.issue_badges(
+                badge, models.User.objects.all(), batch_size=batch_size
+            )
+            self.report(
+                f"Issuance by batches of {batch_size}",
+                time.perf_counter() - start,
+                count,
+            )
+
+    def test_benchmarks_obf_sync(self):
+        """Synchronize a catalogue of BENCHMARKS_SIZE badges, then again unchanged."""
+        for index in range(BENCHMARKS_SIZE):
+            self.server.badges[f"badge{index}"] = {
+                "id": f"badge{index}",
+                "name": f"Badge {index}",
+                "description": "benchmark",
+            }
+        provider = helpers.get_badge_provider("OBF")
+
+        for scenario in ("Initial synchronization", "Unchanged synchronization"):
+            self.server.requests.clear()
+            start = time.perf_counter()
+            counts = helpers.sync_badges(provider)
+            self.report(scenario, time.perf_counter() - start, sum(counts))
+
+    def test_benchmarks_obf_revocation(self):
+        """Revoke badges of BENCHMARKS_SIZE canceled orders for several workers."""
+        badge = self.create_badge()
+        orders = core_factories.OrderFactory.create_batch(
+            BENCHMARKS_SIZE, is_canceled=True
+        )
+        helpers.issue_badges(
+            badge,
+            models.User.objects.all(),
+            batch_size=10,
+            orders=models.Order.objects.all(),
+        )
+
+        for max_workers in (1, 4, 16):
+            models.IssuedBadge.objects.update(revoked_on=None)
+            self.server.requests.clear()
+            start = time.perf_counter()
+            count = helpers.revoke_badges(
+                helpers.get_issued_badges_to_revoke(),
+                batch_size=10,
+                max_workers=max_workers,
+            )
+            self.report(
+                f"Revocation with {max_workers} workers",
+                time.perf_counter() - start,
+                count,
+            )
+        self.assertEqual(count, len(orders))
+
+
+@skipUnless(os.environ.get("JOANIE_BENCHMARKS"), "Benchmarks are not enabled.")
+class OBFAPIClientBenchmarksTestCase(SimpleTestCase):
+    """Measure the memory used to parse large OBF responses."""
+
+    def test_benchmarks_obf_iter_json(self):
+        """JSON lines should be parsed with bounded memory from a 100 MB response."""
+        line = json.dumps(
+            {"id": "abcd1234", "name": "Badge", "description": "x" * 160}
+        ).encode("utf-8")
+        line_count = 100 * 1024 * 1024 // (len(line) + 1)
+
+        class LazyBody:
+            """A 100 MB JSON lines body generated while it is read."""
+
+            def __init__(self):
+                self.lines = (line + b"\n" for _ in range(line_count))
+
+            def read(self, size):
+                """Return about `size` bytes of JSON lines."""
+                return b"".join(islice(self.lines, size // (len(line) + 1) or 1))
+
+        response = requests.Response()
+        response.raw = LazyBody()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            count = sum(1 for _ in OBFAPIClient.iter_json(response))
+            __, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        print(
+            f"\nParsing of a 100 MB response: {count} items in "
+            f"{time.perf_counter() - start:.2f}s (peak memory {peak / 1024:.0f} KiB)"
+        )
+        self.assertEqual(count, line_count)
+        self.assertLess(peak, 5 * 1024 * 1024)
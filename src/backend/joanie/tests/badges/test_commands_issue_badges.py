@@ -0,0 +1,60 @@
+"""Test suite for the management command 'issue_badges'"""
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+import responses
+
+from joanie.badges import factories, models
+from joanie.badges.providers.obf import OBFAPIClient
+from joanie.core import factories as core_factories
+
+
+@override_settings(
+    JOANIE_BADGE_PROVIDERS={
+        "obf": {"client_id": "real_client", "client_secret": "super_duper"}
+    }
+)
+class IssueBadgesCommandTestCase(TestCase):
+    """Test case for the management command 'issue_badges'"""
+
+    def tearDown(self):
+        """Forget the OBF access token."""
+        # pylint: disable=protected-access
+        OBFAPIClient._access_token.cache_clear()
+
+    def test_commands_issue_badges_unknown_badge(self):
+        """An error should be raised if the badge does not exist."""
+        with self.assertRaises(CommandError):
+            call_command("issue_badges", "unknown")
+
+    @responses.activate
+    def test_commands_issue_badges(self):
+        """
+        The command should issue the badge to owners of certificates of orders which
+        were not canceled only.
+        """
+        badge = factories.BadgeFactory(
+            provider="OBF",
+            iri="https://openbadgefactory.com/v1/badge/real_client/abcd1234",
+        )
+        certificate = core_factories.CertificateFactory()
+        core_factories.UserFactory()
+        # Owners of canceled certified orders should not be awarded
+        core_factories.CertificateFactory(order__is_canceled=True)
+        responses.post(
+            "https://openbadgefactory.com/v1/client/oauth2/token",
+            json={"access_token": "accesstoken123"},
+            status=200,
+        )
+        responses.post(
+            "https://openbadgefactory.com/v1/badge/real_client/abcd1234",
+            status=201,
+            headers={"Location": "/v1/event/real_client/event_1"},
+        )
+
+        call_command("issue_badges", str(badge.pk))
+
+        issued_badge = models.IssuedBadge.objects.get()
+        self.assertEqual(issued_badge.user, certificate.order.owner)
+        self.assertEqual(issued_badge.badge, badge)
+        self.assertEqual(issued_badge.order, certificate.order)
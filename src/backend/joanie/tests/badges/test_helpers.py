@@ -0,0 +1,262 @@
+"""Test suite for the badges helpers."""
+import json
+
+from django.test import TestCase, override_settings
+
+import responses
+
+from joanie.badges import factories, helpers, models
+from joanie.badges.providers.obf import OBFAPIClient
+from joanie.core import enums
+from joanie.core import factories as core_factories
+
+
+@override_settings(
+    JOANIE_BADGE_PROVIDERS={
+        "obf": {"client_id": "real_client", "client_secret": "super_duper"}
+    }
+)
+class BadgesHelpersTestCase(TestCase):
+    """Test suite for the badges issuance pipeline."""
+
+    def setUp(self):
+        """Mock the OBF API."""
+        self.requests_mock = responses.RequestsMock(assert_all_requests_are_fired=False)
+        self.requests_mock.start()
+        self.requests_mock.post(
+            "https://openbadgefactory.com/v1/client/oauth2/token",
+            json={"access_token": "accesstoken123"},
+            status=200,
+        )
+        self.badge = factories.BadgeFactory(
+            provider="OBF",
+            iri="https://openbadgefactory.com/v1/badge/real_client/abcd1234",
+        )
+
+    def tearDown(self):
+        """Stop mocking the OBF API."""
+        self.requests_mock.stop()
+        self.requests_mock.reset()
+        # pylint: disable=protected-access
+        OBFAPIClient._access_token.cache_clear()
+
+    def mock_issue(self, *event_ids):
+        """Mock OBF responses to badge issuance requests."""
+        for event_id in event_ids:
+            self.requests_mock.post(
+                "https://openbadgefactory.com/v1/badge/real_client/abcd1234",
+                status=201,
+                headers={"Location": f"/v1/event/real_client/{event_id}"},
+            )
+
+    def test_helpers_get_badge_provider_not_configured(self):
+        """Requesting an unknown provider should raise an error."""
+        with self.assertRaises(helpers.BadgeProviderError):
+            helpers.get_badge_provider("FAK")
+
+    def test_helpers_issue_badges_by_batches(self):
+        """
+        Recipients should be sent by batches, one request per batch, and issued
+        badges should be recorded for each recipient.
+        """
+        users = core_factories.UserFactory.create_batch(5)
+        self.mock_issue("event_1", "event_2", "event_3")
+
+        issued_count = helpers.issue_badges(
+            self.badge,
+            models.User.objects.all(),
+            resource_link="https://example.com/courses/1",
+            batch_size=2,
+        )
+
+        self.assertEqual(issued_count, 5)
+        issue_calls = [
+            call
+            for call in self.requests_mock.calls
+            if call.request.url.endswith("abcd1234")
+        ]
+        self.assertEqual(len(issue_calls), 3)
+        self.assertEqual(
+            [len(json.loads(call.request.body)["recipient"]) for call in issue_calls],
+            [2, 2, 1],
+        )
+        self.assertCountEqual(
+            models.IssuedBadge.objects.values_list("user", flat=True),
+            [user.pk for user in users],
+        )
+        self.assertEqual(
+            models.IssuedBadge.objects.filter(
+                iri="https://openbadgefactory.com/v1/event/real_client/event_3",
+                resource_link="https://example.com/courses/1",
+            ).count(),
+            1,
+        )
+
+    def test_helpers_issue_badges_skips_awarded_users(self):
+        """
+        Users already awarded the badge for the resource link or without email
+        should not be sent to the provider.
+        """
+        awarded_user, new_user = core_factories.UserFactory.create_batch(2)
+        core_factories.UserFactory(email="")
+        factories.IssuedBadgeFactory(
+            badge=self.badge, user=awarded_user, resource_link=""
+        )
+        self.mock_issue("event_1")
+
+        issued_count = helpers.issue_badges(self.badge, models.User.objects.all())
+
+        self.assertEqual(issued_count, 1)
+        self.assertEqual(
+            json.loads(self.requests_mock.calls[-1].request.body)["recipient"],
+            [new_user.email],
+        )
+
+        # - Issuing the badge again should not call the provider
+        self.assertEqual(helpers.issue_badges(self.badge, models.User.objects.all()), 0)
+
+    def mock_badges(self, *badges):
+        """Mock the OBF badge list response as JSON lines."""
+        self.requests_mock.get(
+            "https://openbadgefactory.com/v1/badge/real_client",
+            body="\n".join(json.dumps(badge) for badge in badges),
+            status=200,
+        )
+
+    def test_helpers_sync_badges(self):
+        """
+        Badges should be created then updated in bulk only when their content
+        changed.
+        """
+        provider = helpers.get_badge_provider("OBF")
+        self.mock_badges(
+            {"id": "badge1", "name": "Badge 1", "description": "First"},
+            {"id": "badge2", "name": "Badge 2", "description": "Second"},
+        )
+
+        self.assertEqual(helpers.sync_badges(provider, batch_size=1), (2, 0, 0))
+
+        badge = models.Badge.objects.get(
+            iri="https://openbadgefactory.com/v1/badge/real_client/badge1"
+        )
+        self.assertEqual(badge.provider, "OBF")
+        self.assertEqual(badge.safe_translation_getter("name"), "Badge 1")
+
+        self.requests_mock.reset()
+        self.mock_badges(
+            {"id": "badge1", "name": "Badge 1", "description": "First"},
+            {"id": "badge2", "name": "Badge 2", "description": "Updated"},
+        )
+
+        self.assertEqual(helpers.sync_badges(provider), (0, 1, 1))
+
+        badge = models.Badge.objects.get(
+            iri="https://openbadgefactory.com/v1/badge/real_client/badge2"
+        )
+        self.assertEqual(badge.safe_translation_getter("description"), "Updated")
+        self.assertEqual(models.Badge.objects.count(), 3)
+
+    def test_helpers_revoke_badges(self):
+        """
+        Badges issued for canceled orders should be revoked by issuance event then
+        marked as revoked in bulk.
+        """
+        event_iri = "https://openbadgefactory.com/v1/event/real_client/event_1"
+        canceled_orders = core_factories.OrderFactory.create_batch(2, is_canceled=True)
+        issued_badges = [
+            factories.IssuedBadgeFactory(
+                badge=self.badge, iri=event_iri, user=order.owner, order=order
+            )
+            for order in canceled_orders
+        ]
+        kept_badge = factories.IssuedBadgeFactory(
+            badge=self.badge, iri=event_iri, order=core_factories.OrderFactory()
+        )
+        self.requests_mock.delete(
+            "https://openbadgefactory.com/v1/event/real_client/event_1", status=204
+        )
+
+        # - In dry run mode, nothing is revoked
+        self.assertEqual(
+            helpers.revoke_badges(helpers.get_issued_badges_to_revoke(), dry_run=True),
+            2,
+        )
+        self.assertFalse(
+            [
+                call
+                for call in self.requests_mock.calls
+                if call.request.method == "DELETE"
+            ]
+        )
+
+        self.assertEqual(
+            helpers.revoke_badges(helpers.get_issued_badges_to_revoke()), 2
+        )
+
+        [revoke_call] = [
+            call for call in self.requests_mock.calls if call.request.method == "DELETE"
+        ]
+        self.assertCountEqual(
+            revoke_call.request.params["email"].split("|"),
+            [order.owner.email for order in canceled_orders],
+        )
+        for issued_badge in issued_badges:
+            issued_badge.refresh_from_db()
+            self.assertIsNotNone(issued_badge.revoked_on)
+        kept_badge.refresh_from_db()
+        self.assertIsNone(kept_badge.revoked_on)
+        self.assertFalse(helpers.get_issued_badges_to_revoke().exists())
+
+    def test_helpers_get_issued_badges_to_revoke_other_order(self):
+        """
+        Badges should not be revoked while their user owns another certified order
+        for the same product which is not canceled.
+        """
+        product = core_factories.ProductFactory(type=enums.PRODUCT_TYPE_CERTIFICATE)
+        kept_certificate, revoked_certificate = [
+            core_factories.CertificateFactory(
+                order__product=product, order__is_canceled=True
+            )
+            for _ in range(2)
+        ]
+        valid_order = core_factories.OrderFactory(
+            owner=kept_certificate.order.owner, product=product
+        )
+        core_factories.CertificateFactory(order=valid_order)
+        kept_badge, revoked_badge = [
+            factories.IssuedBadgeFactory(
+                badge=self.badge, user=certificate.order.owner, order=certificate.order
+            )
+            for certificate in (kept_certificate, revoked_certificate)
+        ]
+
+        self.assertEqual(list(helpers.get_issued_badges_to_revoke()), [revoked_badge])
+
+        # - Once the other order is canceled, the badge should be revoked
+        valid_order.is_canceled = True
+        valid_order.save(validate=False)
+        self.assertCountEqual(
+            helpers.get_issued_badges_to_revoke(), [kept_badge, revoked_badge]
+        )
+
+    def test_helpers_get_issued_badges_to_revoke_without_order(self):
+        """
+        Badges issued before orders were recorded should be revoked if their user
+        owns a canceled certified order but no other certified order.
+        """
+        canceled_certificate = core_factories.CertificateFactory(
+            order__is_canceled=True
+        )
+        revoked_badge = factories.IssuedBadgeFactory(
+            badge=self.badge, user=canceled_certificate.order.owner, order=None
+        )
+        certificate = core_factories.CertificateFactory()
+        core_factories.CertificateFactory(
+            order__owner=certificate.order.owner, order__is_canceled=True
+        )
+        factories.IssuedBadgeFactory(
+            badge=self.badge, user=certificate.order.owner, order=None
+        )
+        factories.IssuedBadgeFactory(badge=self.badge, order=None)
+
+        self.assertEqual(list(helpers.get_issued_badges_to_revoke()), [revoked_badge])
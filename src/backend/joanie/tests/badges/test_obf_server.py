@@ -0,0 +1,82 @@
+"""Test suite for the OBF provider against the fake OBF server."""
+from django.test import TestCase
+
+import pytest
+import requests
+
+from joanie.badges.exceptions import BadgeProviderError
+from joanie.badges.providers.obf import (
+    OBF,
+    Badge,
+    BadgeIssue,
+    BadgeQuery,
+    BadgeRevokation,
+    OBFAPIClient,
+)
+
+from .obf_server import FakeOBFServer
+
+
+class FakeOBFServerTestCase(TestCase):
+    """Tests for the OBF provider through the fake OBF server"""
+
+    def tearDown(self):
+        """Forget access tokens granted by the fake server."""
+
+        # pylint: disable=protected-access
+        OBFAPIClient._access_token.cache_clear()
+
+    def test_obf_server_badge_lifecycle(self):
+        """The provider should create, read, update, issue, revoke and delete badges."""
+
+        with FakeOBFServer() as server:
+            obf = OBF("real_client", "super_duper", api_root_url=server.url)
+
+            badge = obf.create(Badge(name="test", description="lorem ipsum"))
+            assert badge.id in server.badges
+            assert [item.id for item in obf.read()] == [badge.id]
+            assert [item.id for item in obf.read(query=BadgeQuery(id=[badge.id]))] == [
+                badge.id
+            ]
+
+            badge.description = "dolor sit amet"
+            obf.update(badge)
+            assert next(obf.read(badge=badge)).description == "dolor sit amet"
+
+            __, event_id = obf.issue(
+                badge, BadgeIssue(recipient=["foo@example.org", "bar@example.org"])
+            )
+            assert server.events[event_id]["recipient"] == [
+                "foo@example.org",
+                "bar@example.org",
+            ]
+
+            obf.revoke(
+                BadgeRevokation(event_id=event_id, recipient=["foo@example.org"])
+            )
+            assert list(server.events[event_id]["revoked"]) == ["foo@example.org"]
+
+            obf.delete(badge)
+            assert not server.badges
+
+        assert server.requests["token"] == 1
+
+    def test_obf_server_error_injection(self):
+        """Requests should fail with the configured error rate."""
+
+        with FakeOBFServer(error_rate=1) as server:
+            obf = OBF("real_client", "super_duper", api_root_url=server.url)
+
+            with pytest.raises(BadgeProviderError, match="Cannot create badge"):
+                obf.create(Badge(name="test", description="lorem ipsum"))
+
+            obf = OBF(
+                "real_client",
+                "super_duper",
+                raise_for_status=True,
+                api_root_url=server.url,
+            )
+            with pytest.raises(requests.HTTPError):
+                obf.api_client.check_auth()
+
+        assert server.errors == {"create_badge": 1, "ping": 1}
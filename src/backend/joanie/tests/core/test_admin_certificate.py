@@ -0,0 +1,63 @@
+"""
+Test suite for certificates admin pages
+"""
+import zipfile
+from io import BytesIO
+
+from django.urls import reverse
+
+from pdfminer.high_level import extract_text as pdf_extract_text
+
+from joanie.core import factories
+from joanie.tests.base import BaseAPITestCase
+
+
+class CertificateAdminTestCase(BaseAPITestCase):
+    """Test suite for admin to manipulate certificates."""
+
+    def test_admin_certificate_archive_anonymous(self):
+        """Anonymous users should not be able to download an archive of certificates."""
+        factories.CertificateFactory()
+
+        response = self.client.get(reverse("admin:core_certificate_archive"))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_admin_certificate_archive(self):
+        """
+        Staff users should be able to download a ZIP archive with the documents
+        of certificates of a course.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        [certificate, _other_certificate] = factories.CertificateFactory.create_batch(2)
+
+        response = self.client.get(
+            reverse("admin:core_certificate_archive"),
+            {"course": certificate.order.course.code},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(
+            response["Content-Disposition"], "attachment; filename=certificates.zip;"
+        )
+
+        with zipfile.ZipFile(BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), [f"{certificate.id}.pdf"])
+            document = archive.read(f"{certificate.id}.pdf")
+        document_text = pdf_extract_text(BytesIO(document)).replace("\n", "")
+        self.assertRegex(document_text, r"CERTIFICATE")
+
+    def test_admin_certificate_archive_invalid_parameters(self):
+        """Invalid dates or product ids should be rejected."""
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        url = reverse("admin:core_certificate_archive")
+
+        response = self.client.get(url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, {"product": "unknown"})
+        self.assertEqual(response.status_code, 400)
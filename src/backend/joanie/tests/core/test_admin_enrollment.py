@@ -0,0 +1,67 @@
+"""
+Test suite for enrollments admin pages
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from joanie.core import factories
+from joanie.tests.base import BaseAPITestCase
+
+
+class EnrollmentAdminTestCase(BaseAPITestCase):
+    """Test suite for admin to manipulate enrollments."""
+
+    @staticmethod
+    def create_enrollments(count):
+        """Create enrollments to listed course runs opened for enrollment."""
+        now = timezone.now()
+        return [
+            factories.EnrollmentFactory(
+                course_run=factories.CourseRunFactory(
+                    start=now - timedelta(hours=1),
+                    end=now + timedelta(hours=2),
+                    enrollment_end=now + timedelta(hours=1),
+                    is_listed=True,
+                )
+            )
+            for _ in range(count)
+        ]
+
+    def test_admin_enrollment_changelist_queries(self):
+        """
+        The enrollment changelist should cost the same number of queries whatever
+        the number of enrollments displayed.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        enrollment_changelist_page = reverse("admin:core_enrollment_changelist")
+        [enrollment] = self.create_enrollments(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(enrollment_changelist_page)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, enrollment.user.username)
+
+        self.create_enrollments(3)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(enrollment_changelist_page)
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_enrollment_changelist_search(self):
+        """Enrollments should be searchable by exact course run resource link."""
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        [enrollment, other_enrollment] = self.create_enrollments(2)
+
+        response = self.client.get(
+            reverse("admin:core_enrollment_changelist"),
+            {"q": enrollment.course_run.resource_link},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, enrollment.user.username)
+        self.assertNotContains(response, other_enrollment.user.username)
@@ -4,23 +4,24 @@ Test suite for orders admin pages
 
 from unittest import mock
 
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from joanie.core import factories, models
+from joanie.core import factories, helpers, models
 from joanie.tests.base import BaseAPITestCase
 
 
 class OrderAdminTestCase(BaseAPITestCase):
     """Test suite for admin to manipulate orders."""
 
-    @mock.patch.object(models.Order, "cancel")
-    def test_admin_order_action_cancel(self, mock_cancel):
+    def test_admin_order_action_cancel(self):
         """
-        Order admin should display an action to cancel an order which call
-        order.cancel method.
+        Order admin should display an action to cancel orders in bulk.
         """
         user = factories.UserFactory(is_staff=True, is_superuser=True)
-        order = factories.OrderFactory()
+        orders = factories.OrderFactory.create_batch(2)
         self.client.login(username=user.username, password="password")
         order_changelist_page = reverse("admin:core_order_changelist")
         response = self.client.get(order_changelist_page)
@@ -28,8 +29,98 @@ class OrderAdminTestCase(BaseAPITestCase):
         self.assertContains(response, "Cancel selected orders")
 
         # - Trigger "cancel" action
-        self.client.post(
-            order_changelist_page, {"action": "cancel", "_selected_action": order.pk}
+        with mock.patch.object(models.Order, "cancel") as mock_cancel:
+            response = self.client.post(
+                order_changelist_page,
+                {"action": "cancel", "_selected_action": [o.pk for o in orders]},
+                follow=True,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "2 orders have been canceled.")
+        # - Orders are canceled in bulk, not one by one
+        mock_cancel.assert_not_called()
+        for order in orders:
+            order.refresh_from_db()
+            self.assertTrue(order.is_canceled)
+
+    @override_settings(JOANIE_ADMIN_CANCEL_ORDERS_MAX_COUNT=1)
+    def test_admin_order_action_cancel_too_many(self):
+        """
+        Canceling more orders than allowed from the admin should be refused in favor
+        of the cancel_orders management command.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        orders = factories.OrderFactory.create_batch(2)
+        self.client.login(username=user.username, password="password")
+
+        with mock.patch.object(helpers, "cancel_orders") as mock_cancel_orders:
+            response = self.client.post(
+                reverse("admin:core_order_changelist"),
+                {"action": "cancel", "_selected_action": [o.pk for o in orders]},
+                follow=True,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response,
+            "2 orders are selected but at most 1 can be canceled from the admin. "
+            "Please cancel them with the cancel_orders management command.",
         )
+        mock_cancel_orders.assert_not_called()
+        self.assertFalse(models.Order.objects.filter(is_canceled=True).exists())
+
+    def test_admin_order_changelist_queries(self):
+        """
+        The order changelist should cost the same number of queries whatever the
+        number of orders displayed.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        order_changelist_page = reverse("admin:core_order_changelist")
+        factories.OrderFactory()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(order_changelist_page)
+        self.assertEqual(response.status_code, 200)
+
+        factories.OrderFactory.create_batch(3)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(order_changelist_page)
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_order_changelist_search(self):
+        """Orders should be searchable by exact owner username."""
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        [order, other_order] = factories.OrderFactory.create_batch(2)
+
+        response = self.client.get(
+            reverse("admin:core_order_changelist"), {"q": order.owner.username}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, order.id)
+        self.assertNotContains(response, other_order.id)
+
+    @override_settings(JOANIE_ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_admin_order_changelist_estimated_count(self):
+        """
+        The order changelist should display the number of orders estimated by the
+        database when it is above the threshold instead of counting them.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        factories.OrderFactory()
+
+        with mock.patch("joanie.core.paginators.estimate_count", return_value=1234567):
+            response = self.client.get(reverse("admin:core_order_changelist"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "1234567 Orders")
+
+        with mock.patch("joanie.core.paginators.estimate_count", return_value=12):
+            response = self.client.get(reverse("admin:core_order_changelist"))
+
         self.assertEqual(response.status_code, 200)
-        mock_cancel.assert_called_once_with()
+        self.assertContains(response, "1 Order")
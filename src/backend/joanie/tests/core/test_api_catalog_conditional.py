@@ -0,0 +1,150 @@
+"""Test suite for conditional requests and cache headers of catalog endpoints"""
+from django.test.utils import override_settings
+from django.utils.http import http_date
+
+from joanie.core import factories
+from joanie.tests.base import BaseAPITestCase
+
+
+class CatalogConditionalApiTest(BaseAPITestCase):
+    """Test HTTP validators and cache headers of course, product and course run APIs."""
+
+    def test_api_catalog_conditional_course_headers(self):
+        """
+        Anonymous responses should bear validators and be cacheable publicly.
+        """
+        course = factories.CourseFactory()
+
+        response = self.client.get(f"/api/v1.0/courses/{course.code}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertEqual(
+            response["Last-Modified"], http_date(int(course.updated_on.timestamp()))
+        )
+        self.assertEqual(
+            response["Cache-Control"],
+            "public, max-age=60, stale-while-revalidate=600",
+        )
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_api_catalog_conditional_course_not_modified(self):
+        """
+        A request with the entity tag of the current representation should be answered
+        with a 304 response without serializing the course.
+        """
+        course_run = factories.CourseRunFactory()
+        product = factories.ProductFactory(target_courses=[course_run.course])
+        course = factories.CourseFactory(products=[product])
+        etag = self.client.get(f"/api/v1.0/courses/{course.code}/")["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f"/api/v1.0/courses/{course.code}/", HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_api_catalog_conditional_course_modified(self):
+        """
+        Updating an object the course representation is made of should change its
+        entity tag and the cached representation should not be served anymore.
+        """
+        course_run = factories.CourseRunFactory()
+        product = factories.ProductFactory(target_courses=[course_run.course])
+        course = factories.CourseFactory(products=[product])
+        etag = self.client.get(f"/api/v1.0/courses/{course.code}/")["ETag"]
+
+        course_run.title = "New title"
+        course_run.save()
+
+        response = self.client.get(
+            f"/api/v1.0/courses/{course.code}/", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        target_course = response.json()["products"][0]["target_courses"][0]
+        self.assertEqual(target_course["course_runs"][0]["title"], "New title")
+
+    def test_api_catalog_conditional_course_language(self):
+        """The entity tag should depend on the language of the representation."""
+        course = factories.CourseFactory()
+
+        response_en = self.client.get(f"/api/v1.0/courses/{course.code}/")
+        response_fr = self.client.get(
+            f"/api/v1.0/courses/{course.code}/", HTTP_ACCEPT_LANGUAGE="fr-fr"
+        )
+
+        self.assertNotEqual(response_en["ETag"], response_fr["ETag"])
+
+    def test_api_catalog_conditional_course_authenticated(self):
+        """
+        Responses of authenticated users hold private information so they should
+        not be cached publicly nor answered conditionally.
+        """
+        course = factories.CourseFactory()
+        token = self.get_user_token("panoramix")
+        etag = self.client.get(f"/api/v1.0/courses/{course.code}/")["ETag"]
+
+        response = self.client.get(
+            f"/api/v1.0/courses/{course.code}/",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+    @override_settings(
+        JOANIE_CATALOG_CACHE_CONTROL={
+            "products": {"max_age": 10, "stale_while_revalidate": 20}
+        }
+    )
+    def test_api_catalog_conditional_product_cache_control_setting(self):
+        """Cache-Control directives should be configurable by endpoint."""
+        product = factories.ProductFactory()
+        factories.CourseFactory(products=[product])
+
+        response = self.client.get(f"/api/v1.0/products/{product.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=10, stale-while-revalidate=20"
+        )
+
+    def test_api_catalog_conditional_product_not_modified(self):
+        """
+        A product representation not modified should be answered with a 304 response.
+        """
+        product = factories.ProductFactory()
+        factories.CourseFactory(products=[product])
+        etag = self.client.get(f"/api/v1.0/products/{product.id}/")["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f"/api/v1.0/products/{product.id}/", HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_api_catalog_conditional_course_run_if_modified_since(self):
+        """
+        A course run not modified since the given date should be answered with a 304
+        response.
+        """
+        course_run = factories.CourseRunFactory(is_listed=True)
+        last_modified = self.client.get(f"/api/v1.0/course-runs/{course_run.id}/")[
+            "Last-Modified"
+        ]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f"/api/v1.0/course-runs/{course_run.id}/",
+                HTTP_IF_MODIFIED_SINCE=last_modified,
+            )
+
+        self.assertEqual(response.status_code, 304)
@@ -3,10 +3,12 @@
 import json
 import random
 import uuid
+from datetime import timedelta
 from io import BytesIO
 from unittest import mock
 
 from django.core.cache import cache
+from django.utils import timezone
 
 from djmoney.money import Money
 from pdfminer.high_level import extract_text as pdf_extract_text
@@ -54,7 +56,7 @@ class OrderApiTest(BaseAPITestCase):
         # The owner can see his/her order
         token = self.get_user_token(order.owner.username)
 
-        with self.assertNumQueries(12):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 "/api/v1.0/orders/",
                 HTTP_AUTHORIZATION=f"Bearer {token}",
@@ -91,7 +93,7 @@ class OrderApiTest(BaseAPITestCase):
         # The owner of the other order can only see his/her order
         token = self.get_user_token(other_order.owner.username)
 
-        with self.assertNumQueries(12):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 "/api/v1.0/orders/",
                 HTTP_AUTHORIZATION=f"Bearer {token}",
@@ -139,7 +141,7 @@ class OrderApiTest(BaseAPITestCase):
         token = self.get_user_token(user.username)
 
         # Retrieve user's order related to the product 1
-        with self.assertNumQueries(12):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 f"/api/v1.0/orders/?product={product_1.id}",
                 HTTP_AUTHORIZATION=f"Bearer {token}",
@@ -206,7 +208,7 @@ class OrderApiTest(BaseAPITestCase):
         token = self.get_user_token(user.username)
 
         # Retrieve user's order related to the first course linked to the product 1
-        with self.assertNumQueries(13):
+        with self.assertNumQueries(11):
             response = self.client.get(
                 f"/api/v1.0/orders/?course={product_1.courses.first().code}",
                 HTTP_AUTHORIZATION=f"Bearer {token}",
@@ -254,7 +256,7 @@ class OrderApiTest(BaseAPITestCase):
         token = self.get_user_token(user.username)
 
         # Retrieve user's order related to the product 1
-        with self.assertNumQueries(12):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 "/api/v1.0/orders/?state=pending", HTTP_AUTHORIZATION=f"Bearer {token}"
             )
@@ -301,7 +303,7 @@ class OrderApiTest(BaseAPITestCase):
         token = self.get_user_token(user.username)
 
         # Retrieve user's order related to the product 1
-        with self.assertNumQueries(11):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 "/api/v1.0/orders/?state=canceled", HTTP_AUTHORIZATION=f"Bearer {token}"
             )
@@ -351,7 +353,7 @@ class OrderApiTest(BaseAPITestCase):
         token = self.get_user_token(user.username)
 
         # Retrieve user's order related to the product 1
-        with self.assertNumQueries(11):
+        with self.assertNumQueries(10):
             response = self.client.get(
                 "/api/v1.0/orders/?state=validated",
                 HTTP_AUTHORIZATION=f"Bearer {token}",
@@ -385,6 +387,56 @@ class OrderApiTest(BaseAPITestCase):
             },
         )
 
+    def test_api_order_read_list_constant_queries(self):
+        """
+        Orders should be listed with their target courses, course runs, enrollments
+        and main pro forma invoice in a number of queries independent of the number
+        of orders.
+        """
+        user = factories.UserFactory()
+        token = self.get_user_token(user.username)
+
+        def create_order():
+            course_run = factories.CourseRunFactory(
+                is_listed=True,
+                start=timezone.now() - timedelta(days=1),
+                end=timezone.now() + timedelta(days=2),
+                enrollment_end=timezone.now() + timedelta(days=1),
+            )
+            product = factories.ProductFactory(target_courses=[course_run.course])
+            order = factories.OrderFactory(owner=user, product=product)
+            ProformaInvoiceFactory(order=order, total=order.total)
+            factories.EnrollmentFactory(
+                user=user, course_run=course_run, is_active=True
+            )
+
+        create_order()
+        with self.assertNumQueries(16):
+            response = self.client.get(
+                "/api/v1.0/orders/", HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+        self.assertEqual(response.json()["count"], 1)
+
+        for _ in range(4):
+            create_order()
+        with self.assertNumQueries(16):
+            response = self.client.get(
+                "/api/v1.0/orders/", HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+
+        content = response.json()
+        self.assertEqual(content["count"], 5)
+        for result in content["results"]:
+            self.assertEqual(result["state"], "validated")
+            self.assertIsNotNone(result["main_proforma_invoice"])
+            self.assertEqual(len(result["target_courses"]), 1)
+            self.assertEqual(len(result["target_courses"][0]["course_runs"]), 1)
+            self.assertEqual(len(result["enrollments"]), 1)
+            self.assertEqual(
+                result["enrollments"][0]["course_run"]["id"],
+                result["target_courses"][0]["course_runs"][0]["id"],
+            )
+
     def test_api_order_read_list_filtered_by_invalid_state(self):
         """
         Authenticated user providing an invalid state to filter its orders
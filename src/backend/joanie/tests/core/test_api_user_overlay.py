@@ -0,0 +1,136 @@
+"""Test suite for the user overlay API"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from joanie.core import factories
+from joanie.payment.factories import ProformaInvoiceFactory
+from joanie.tests.base import BaseAPITestCase
+
+
+def create_opened_course_run(**kwargs):
+    """Create a listed course run opened for enrollment."""
+    return factories.CourseRunFactory(
+        is_listed=True,
+        start=timezone.now() - timedelta(days=1),
+        end=timezone.now() + timedelta(days=2),
+        enrollment_end=timezone.now() + timedelta(days=1),
+        **kwargs,
+    )
+
+
+class UserOverlayApiTest(BaseAPITestCase):
+    """Test the API returning user orders and enrollments for courses and products."""
+
+    def test_api_user_overlay_anonymous(self):
+        """Anonymous users should not be allowed to retrieve an overlay."""
+        course = factories.CourseFactory()
+
+        response = self.client.get(f"/api/v1.0/user-overlays/?courses={course.code}")
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_api_user_overlay_without_filters(self):
+        """At least one course or product should be requested."""
+        token = self.get_user_token("panoramix")
+
+        response = self.client.get(
+            "/api/v1.0/user-overlays/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            ["At least one course code or product id should be provided."],
+        )
+
+    def test_api_user_overlay_invalid_product(self):
+        """Product ids should be valid uuids."""
+        token = self.get_user_token("panoramix")
+
+        response = self.client.get(
+            "/api/v1.0/user-overlays/?products=invalid",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"products": ["invalid is not a valid product id."]}
+        )
+
+    def test_api_user_overlay_too_many_resources(self):
+        """The number of requested courses and products should be limited."""
+        token = self.get_user_token("panoramix")
+        codes = ",".join(f"course-{i:d}" for i in range(101))
+
+        response = self.client.get(
+            f"/api/v1.0/user-overlays/?courses={codes}",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_user_overlay_constant_queries(self):
+        """
+        The user orders and enrollments related to requested courses and products
+        should be retrieved in a constant number of queries whatever their number.
+        """
+        user = factories.UserFactory()
+        token = self.get_user_token(user.username)
+        courses = []
+        orders = []
+        enrollments = []
+        for _ in range(3):
+            course_run = create_opened_course_run()
+            product = factories.ProductFactory(target_courses=[course_run.course])
+            course = factories.CourseFactory(products=[product])
+            order = factories.OrderFactory(owner=user, product=product, course=course)
+            ProformaInvoiceFactory(order=order, total=order.total)
+            courses.append(course)
+            orders.append(order)
+            enrollments.append(
+                factories.EnrollmentFactory(
+                    user=user, course_run=course_run, is_active=True
+                )
+            )
+
+        # - Orders and enrollments of other users or other courses are ignored
+        other_course_run = create_opened_course_run()
+        factories.EnrollmentFactory(course_run=other_course_run, is_active=True)
+        factories.OrderFactory(course=courses[0], product=courses[0].products.get())
+        factories.EnrollmentFactory(
+            user=user, course_run=create_opened_course_run(), is_active=True
+        )
+        # - Canceled orders are ignored
+        factories.OrderFactory(
+            owner=user,
+            course=courses[0],
+            product=courses[0].products.get(),
+            is_canceled=True,
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                "/api/v1.0/user-overlays/"
+                f"?courses={courses[0].code},{courses[1].code}"
+                f"&products={orders[2].product_id}",
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertCountEqual(
+            [order["id"] for order in content["orders"]],
+            [str(order.id) for order in orders],
+        )
+        self.assertEqual(content["orders"][0]["state"], "validated")
+        self.assertEqual(content["orders"][0]["course"], orders[2].course.code)
+        self.assertEqual(content["orders"][0]["product"], str(orders[2].product_id))
+        self.assertCountEqual(
+            [enrollment["id"] for enrollment in content["enrollments"]],
+            [str(enrollment.id) for enrollment in enrollments],
+        )
+        self.assertEqual(
+            content["enrollments"][0]["course_run"]["title"],
+            enrollments[2].course_run.title,
+        )
@@ -0,0 +1,201 @@
+"""Test suite for snapshots of the catalog"""
+import hashlib
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+
+from joanie.core import catalog, factories
+from joanie.core.catalog import publish_catalog_snapshot
+
+
+@override_settings(
+    JOANIE_CATALOG_SNAPSHOT_DIRECTORY="catalog",
+    LANGUAGES=(("en-us", "English"), ("fr-fr", "French")),
+)
+class CatalogSnapshotTestCase(TestCase):
+    """Test case for the publication of catalog snapshots to a storage."""
+
+    def setUp(self):
+        """Publish snapshots to a temporary directory."""
+        self.location = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.location)
+
+    def tearDown(self):
+        """Remove published snapshots."""
+        shutil.rmtree(self.location)
+
+    def read(self, name):
+        """Return the content of a published file."""
+        with self.storage.open(name) as file:
+            return file.read()
+
+    def test_catalog_snapshot_publish(self):
+        """
+        Public representations of courses and products should be written in each
+        language with a manifest of their content hashes.
+        """
+        course = factories.CourseFactory()
+        product = factories.ProductFactory(courses=[course])
+
+        written, unchanged, deleted = publish_catalog_snapshot(storage=self.storage)
+
+        self.assertEqual((written, unchanged, deleted), (4, 0, 0))
+        manifest = json.loads(self.read("catalog/manifest.json"))["files"]
+        self.assertEqual(
+            sorted(manifest),
+            [
+                f"catalog/en-us/courses/{course.code}.json",
+                f"catalog/en-us/products/{product.id}.json",
+                f"catalog/fr-fr/courses/{course.code}.json",
+                f"catalog/fr-fr/products/{product.id}.json",
+            ],
+        )
+        for name, content_hash in manifest.items():
+            self.assertEqual(hashlib.sha256(self.read(name)).hexdigest(), content_hash)
+
+        content = json.loads(self.read(f"catalog/en-us/courses/{course.code}.json"))
+        self.assertEqual(content["code"], course.code)
+        self.assertIsNone(content["orders"])
+        self.assertEqual(content["products"][0]["id"], str(product.id))
+
+    def test_catalog_snapshot_skip_unchanged(self):
+        """Objects whose representation did not change should not be written again."""
+        course_run = factories.CourseRunFactory()
+        course = factories.CourseFactory()
+        factories.ProductFactory(courses=[course], target_courses=[course_run.course])
+        publish_catalog_snapshot(storage=self.storage)
+
+        written, unchanged, deleted = publish_catalog_snapshot(storage=self.storage)
+        self.assertEqual((written, unchanged, deleted), (0, 6, 0))
+
+        course_run.title = "New title"
+        course_run.save()
+
+        written, unchanged, deleted = publish_catalog_snapshot(storage=self.storage)
+        # Only the target course representation does not include its course runs
+        self.assertEqual((written, unchanged, deleted), (4, 2, 0))
+        content = json.loads(self.read(f"catalog/en-us/courses/{course.code}.json"))
+        target_course = content["products"][0]["target_courses"][0]
+        self.assertEqual(target_course["course_runs"][0]["title"], "New title")
+
+    def test_catalog_snapshot_restricted(self):
+        """
+        Snapshots can be restricted to courses and products, snapshots of requested
+        objects which do not belong to the catalog anymore being deleted.
+        """
+        product = factories.ProductFactory(courses=[])
+        course, other_course = factories.CourseFactory.create_batch(
+            2, products=[product]
+        )
+        publish_catalog_snapshot(storage=self.storage)
+
+        # As in the admin, the course is saved along with its products
+        for course_without_product in (course, other_course):
+            course_without_product.products.clear()
+            course_without_product.save()
+        written, unchanged, deleted = publish_catalog_snapshot(
+            course_codes=[course.code], storage=self.storage
+        )
+
+        self.assertEqual((written, unchanged, deleted), (2, 0, 0))
+        written, unchanged, deleted = publish_catalog_snapshot(
+            product_ids=[str(product.id)], storage=self.storage
+        )
+        self.assertEqual((written, unchanged, deleted), (0, 0, 2))
+        manifest = json.loads(self.read("catalog/manifest.json"))["files"]
+        self.assertEqual(len(manifest), 4)
+        self.assertFalse(
+            self.storage.exists(f"catalog/en-us/products/{product.id}.json")
+        )
+
+    def test_catalog_snapshot_delete_removed_objects(self):
+        """A whole snapshot should delete snapshots of objects removed from catalog."""
+        course = factories.CourseFactory()
+        publish_catalog_snapshot(storage=self.storage)
+
+        course.delete()
+        written, unchanged, deleted = publish_catalog_snapshot(storage=self.storage)
+
+        self.assertEqual((written, unchanged, deleted), (0, 0, 2))
+        self.assertEqual(json.loads(self.read("catalog/manifest.json"))["files"], {})
+
+    def test_catalog_snapshot_concurrent_publications(self):
+        """
+        A publication should not lose manifest entries written by a concurrent
+        publication meanwhile.
+        """
+        course, other_course = factories.CourseFactory.create_batch(2)
+        iter_snapshots = catalog.iter_snapshots
+
+        def iter_snapshots_concurrently(course_codes=None, **_kwargs):
+            yield from iter_snapshots(course_codes=course_codes, product_ids=[])
+            if course_codes == [course.code]:
+                publish_catalog_snapshot(
+                    course_codes=[other_course.code], storage=self.storage
+                )
+
+        with mock.patch.object(
+            catalog, "iter_snapshots", side_effect=iter_snapshots_concurrently
+        ):
+            publish_catalog_snapshot(course_codes=[course.code], storage=self.storage)
+
+        manifest = json.loads(self.read("catalog/manifest.json"))["files"]
+        self.assertEqual(
+            sorted(manifest),
+            sorted(
+                f"catalog/{language}/courses/{code}.json"
+                for language in ("en-us", "fr-fr")
+                for code in (course.code, other_course.code)
+            ),
+        )
+
+    @mock.patch.object(catalog, "SNAPSHOT_MANIFEST_LOCK_TIMEOUT", 0)
+    def test_catalog_snapshot_manifest_locked(self):
+        """The manifest should not be written while another publication locks it."""
+        factories.CourseFactory()
+        cache.add(catalog.SNAPSHOT_MANIFEST_LOCK_KEY, True)
+        self.addCleanup(cache.delete, catalog.SNAPSHOT_MANIFEST_LOCK_KEY)
+
+        with self.assertRaises(TimeoutError):
+            publish_catalog_snapshot(storage=self.storage)
+
+        self.assertFalse(self.storage.exists("catalog/manifest.json"))
+
+    @override_settings(JOANIE_CATALOG_SNAPSHOT_ON_CHANGE=True)
+    def test_catalog_snapshot_on_change(self):
+        """
+        Snapshots of objects affected by a change should be published once the
+        transaction is committed.
+        """
+        with override_settings(JOANIE_CATALOG_SNAPSHOT_ON_CHANGE=False):
+            course_run = factories.CourseRunFactory()
+            course = factories.CourseFactory()
+            product = factories.ProductFactory(
+                courses=[course], target_courses=[course_run.course]
+            )
+            factories.CourseFactory()
+
+        with self.settings(MEDIA_ROOT=self.location):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                course_run.title = "New title"
+                course_run.save()
+
+        self.assertEqual(len(callbacks), 1)
+        manifest = json.loads(self.read("catalog/manifest.json"))["files"]
+        self.assertEqual(
+            sorted(manifest),
+            sorted(
+                f"catalog/{language}/{resource_name}/{identifier}.json"
+                for language in ("en-us", "fr-fr")
+                for resource_name, identifier in (
+                    ("courses", course.code),
+                    ("courses", course_run.course.code),
+                    ("products", product.id),
+                )
+            ),
+        )
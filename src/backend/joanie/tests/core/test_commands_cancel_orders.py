@@ -0,0 +1,31 @@
+"""Test suite for the management command 'cancel_orders'"""
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from joanie.core import factories, models
+
+
+class CancelOrdersCommandTestCase(TestCase):
+    """Test case for the management command 'cancel_orders'"""
+
+    def test_commands_cancel_orders_requires_a_filter(self):
+        """The command should refuse to cancel all orders at once."""
+        factories.OrderFactory()
+
+        with self.assertRaises(CommandError):
+            call_command("cancel_orders")
+
+        self.assertFalse(models.Order.objects.filter(is_canceled=True).exists())
+
+    def test_commands_cancel_orders_restricted_to_product(self):
+        """Only orders related to the provided product should be canceled."""
+        [order, other_order] = factories.OrderFactory.create_batch(2)
+
+        with self.assertLogs("joanie.core.cancel_orders", "INFO") as logs:
+            call_command("cancel_orders", products=[str(order.product.pk)])
+
+        order.refresh_from_db()
+        other_order.refresh_from_db()
+        self.assertTrue(order.is_canceled)
+        self.assertFalse(other_order.is_canceled)
+        self.assertIn("1/1 orders canceled.", logs.output[0])
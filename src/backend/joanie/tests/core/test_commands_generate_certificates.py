@@ -1,12 +1,18 @@
 """Test suite for the management command 'generate_certificates'"""
 import uuid
 from datetime import timedelta
+from unittest import mock
 
+from django.core.cache import cache
 from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.utils import timezone
 
-from joanie.core import enums, factories, models
+from joanie.core import enums, factories, grades, helpers, models
+from joanie.core.exceptions import GradeError
+from joanie.core.management.commands import generate_certificates
+from joanie.lms_handler.backends.openedx import OpenEdXLMSBackend
 
 
 class CreateCertificatesTestCase(TestCase):
@@ -161,12 +167,12 @@ class CreateCertificatesTestCase(TestCase):
         self.assertEqual(certificate_qs.count(), 0)
 
         # A certificate should be generated for the 1st product
-        with self.assertNumQueries(15):
+        with self.assertNumQueries(16):
             call_command("generate_certificates", product=product_1.id)
         self.assertEqual(certificate_qs.filter(order=orders[0]).count(), 1)
 
         # Then a certificate should be generated for the 2nd product
-        with self.assertNumQueries(14):
+        with self.assertNumQueries(15):
             call_command("generate_certificates", product=product_2.id)
         self.assertEqual(certificate_qs.filter(order=orders[1]).count(), 1)
 
@@ -263,11 +269,204 @@ class CreateCertificatesTestCase(TestCase):
         self.assertEqual(certificate_qs.count(), 0)
 
         # A certificate should be generated for the 1st product
-        with self.assertNumQueries(15):
+        with self.assertNumQueries(16):
             call_command("generate_certificates", product=product_1.id)
         self.assertEqual(certificate_qs.filter(order=orders[0]).count(), 1)
 
         # Then a certificate should be generated for the 2nd product
-        with self.assertNumQueries(14):
+        with self.assertNumQueries(15):
             call_command("generate_certificates", product=product_2.id)
         self.assertEqual(certificate_qs.filter(order=orders[1]).count(), 1)
+
+    @override_settings(
+        JOANIE_LMS_BACKENDS=[
+            {
+                "API_TOKEN": "FakeEdXAPIKey",
+                "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+                "BASE_URL": "http://edx:8073",
+                "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+                "SELECTOR_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            }
+        ],
+        JOANIE_ENROLLMENT_GRADE_CACHE_TTL=600,
+    )
+    @mock.patch.object(OpenEdXLMSBackend, "set_enrollment", return_value=True)
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", return_value={"passed": True})
+    def test_commands_generate_certificates_warm_grades(self, mock_get_grades, _):
+        """
+        Grades should be retrieved and cached by the command itself before orders are
+        checked, whatever the cache backend, as a cache local to each process would not
+        be filled by another one.
+        """
+        cache.clear()
+        course_runs = [
+            factories.CourseRunFactory(
+                enrollment_end=timezone.now() + timedelta(hours=1),
+                enrollment_start=timezone.now() - timedelta(hours=1),
+                is_gradable=True,
+                start=timezone.now() - timedelta(hours=1),
+                resource_link=(
+                    f"http://openedx.test/courses/course-v1:edx+{number:06d}+Demo/course"
+                ),
+            )
+            for number in range(2)
+        ]
+        product = factories.ProductFactory(
+            price="0.00",
+            type=enums.PRODUCT_TYPE_CREDENTIAL,
+            target_courses=[course_run.course for course_run in course_runs],
+        )
+        course = factories.CourseFactory(products=[product])
+        # The owner of a free order is enrolled to the target course runs
+        order = factories.OrderFactory(product=product, course=course)
+        # An enrollment of another learner should not be retrieved
+        factories.EnrollmentFactory(course_run=course_runs[0], is_active=True)
+
+        def assert_grades_cached(orders, **kwargs):
+            for course_run in course_runs:
+                self.assertEqual(
+                    cache.get(
+                        grades.get_grade_cache_key(
+                            order.owner.username, course_run.resource_link
+                        )
+                    ),
+                    {"passed": True},
+                )
+            return helpers.generate_certificates_for_orders(orders, **kwargs)
+
+        with mock.patch.object(
+            generate_certificates,
+            "generate_certificates_for_orders",
+            side_effect=assert_grades_cached,
+        ):
+            call_command("generate_certificates", max_workers=2)
+
+        self.assertEqual(models.Certificate.objects.filter(order=order).count(), 1)
+        self.assertEqual(
+            sorted(call.kwargs["resource_link"] for call in mock_get_grades.mock_calls),
+            sorted(course_run.resource_link for course_run in course_runs),
+        )
+
+    def test_commands_generate_certificates_incremental(self):
+        """
+        With the incremental option, only orders which changed since the last run over
+        all orders should be reviewed, all orders being reviewed on the first run.
+        """
+        course_runs = factories.CourseRunFactory.create_batch(
+            2,
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            enrollment_start=timezone.now() - timedelta(hours=1),
+            is_gradable=False,
+            start=timezone.now() - timedelta(hours=1),
+        )
+        orders = []
+        for course_run in course_runs:
+            product = factories.ProductFactory(
+                price="0.00",
+                type=enums.PRODUCT_TYPE_CREDENTIAL,
+                target_courses=[course_run.course],
+            )
+            course = factories.CourseFactory(products=[product])
+            orders.append(factories.OrderFactory(product=product, course=course))
+
+        with mock.patch.object(
+            helpers,
+            "generate_certificate_for_order",
+            wraps=helpers.generate_certificate_for_order,
+        ) as mock_generate:
+            call_command("generate_certificates", incremental=True)
+            self.assertEqual(mock_generate.call_count, 2)
+
+            run = models.CertificateGenerationRun.objects.get()
+            self.assertTrue(run.is_full)
+            self.assertTrue(run.is_completed)
+            self.assertEqual(run.certificates_count, 0)
+
+            # - Nothing changed so no order is reviewed
+            mock_generate.reset_mock()
+            call_command("generate_certificates", incremental=True)
+            mock_generate.assert_not_called()
+
+            # - The first course run is now gradable
+            course_runs[0].is_gradable = True
+            course_runs[0].save()
+            call_command("generate_certificates", incremental=True)
+            mock_generate.assert_called_once_with(orders[0], cached_only=False)
+            self.assertTrue(models.Certificate.objects.filter(order=orders[0]).exists())
+            self.assertEqual(
+                models.CertificateGenerationRun.objects.values_list(
+                    "is_full", "certificates_count"
+                )[0],
+                (False, 1),
+            )
+
+            # - A full rescan reviews all orders not certified yet
+            mock_generate.reset_mock()
+            call_command("generate_certificates")
+            mock_generate.assert_called_once_with(orders[1], cached_only=False)
+
+    @override_settings(
+        JOANIE_LMS_BACKENDS=[
+            {
+                "API_TOKEN": "FakeEdXAPIKey",
+                "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+                "BASE_URL": "http://edx:8073",
+                "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+                "SELECTOR_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            }
+        ],
+    )
+    @mock.patch.object(OpenEdXLMSBackend, "set_enrollment", return_value=True)
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", side_effect=GradeError)
+    def test_commands_generate_certificates_incremental_lms_failing(
+        self, mock_get_grades, _
+    ):
+        """
+        A run during which grades could not be retrieved should not move the
+        watermark, otherwise orders of course runs which ended meanwhile would never
+        be reviewed again.
+        """
+        course_run = factories.CourseRunFactory(
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            enrollment_start=timezone.now() - timedelta(hours=1),
+            is_gradable=True,
+            start=timezone.now() - timedelta(hours=2),
+            resource_link="http://openedx.test/courses/course-v1:edx+000001+Demo/course",
+        )
+        product = factories.ProductFactory(
+            price="0.00",
+            type=enums.PRODUCT_TYPE_CREDENTIAL,
+            target_courses=[course_run.course],
+        )
+        course = factories.CourseFactory(products=[product])
+        order = factories.OrderFactory(product=product, course=course)
+        # The course run ended before the first run, without being updated since
+        models.CourseRun.objects.filter(pk=course_run.pk).update(
+            end=timezone.now() - timedelta(hours=1)
+        )
+
+        with self.assertLogs("joanie.core.generate_certificates", "WARNING") as logs:
+            call_command("generate_certificates", incremental=True)
+
+        self.assertIn("1 order(s) could not be checked", logs.output[0])
+        run = models.CertificateGenerationRun.objects.get()
+        self.assertFalse(run.is_completed)
+        self.assertIsNone(models.CertificateGenerationRun.get_watermark())
+
+        # - Once the LMS answers again, the order is reviewed by the next run
+        mock_get_grades.side_effect = None
+        mock_get_grades.return_value = {"passed": True}
+        call_command("generate_certificates", incremental=True)
+
+        self.assertTrue(models.Certificate.objects.filter(order=order).exists())
+        self.assertTrue(
+            models.CertificateGenerationRun.objects.values_list(
+                "is_completed", flat=True
+            )[0]
+        )
+
+    def test_commands_generate_certificates_restricted_runs_not_recorded(self):
+        """Runs restricted to some orders should not move the watermark."""
+        call_command("generate_certificates", courses="00000", incremental=True)
+
+        self.assertFalse(models.CertificateGenerationRun.objects.exists())
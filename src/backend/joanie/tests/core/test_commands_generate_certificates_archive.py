@@ -0,0 +1,63 @@
+"""Test suite for the management command 'generate_certificates_archive'"""
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from joanie.core import enums, factories, models
+
+
+class GenerateCertificatesArchiveCommandTestCase(TestCase):
+    """Test case for the management command 'generate_certificates_archive'"""
+
+    def test_commands_generate_certificates_archive(self):
+        """
+        The command should write a ZIP archive containing the document of each
+        certificate of the given products.
+        """
+        product = factories.ProductFactory(type=enums.PRODUCT_TYPE_CERTIFICATE)
+        certificates = factories.CertificateFactory.create_batch(
+            3, order__product=product
+        )
+        other_certificate = factories.CertificateFactory()
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "certificates.zip")
+            call_command(
+                "generate_certificates_archive",
+                output,
+                product=[str(product.id)],
+                workers=2,
+            )
+
+            with zipfile.ZipFile(output) as archive:
+                self.assertIsNone(archive.testzip())
+                names = archive.namelist()
+
+        self.assertCountEqual(
+            names, [f"{certificate.id}.pdf" for certificate in certificates]
+        )
+        self.assertNotIn(f"{other_certificate.id}.pdf", names)
+
+    def test_commands_generate_certificates_archive_date_range(self):
+        """Certificates can be restricted to a date range of issuance."""
+        [certificate, old_certificate] = factories.CertificateFactory.create_batch(2)
+        models.Certificate.objects.filter(pk=old_certificate.pk).update(
+            issued_on=timezone.now() - timedelta(days=10)
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "certificates.zip")
+            call_command(
+                "generate_certificates_archive",
+                output,
+                since=(timezone.now() - timedelta(days=1)).date(),
+                workers=1,
+            )
+
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual(archive.namelist(), [f"{certificate.id}.pdf"])
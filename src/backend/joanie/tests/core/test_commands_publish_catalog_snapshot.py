@@ -0,0 +1,62 @@
+"""Test suite for the management command 'publish_catalog_snapshot'"""
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from joanie.core import factories
+
+
+@override_settings(
+    JOANIE_CATALOG_SNAPSHOT_DIRECTORY="catalog",
+    LANGUAGES=(("en-us", "English"), ("fr-fr", "French")),
+)
+class PublishCatalogSnapshotCommandTestCase(TestCase):
+    """Test case for the management command 'publish_catalog_snapshot'"""
+
+    def setUp(self):
+        """Publish snapshots to a temporary media root."""
+        self.location = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove published snapshots."""
+        shutil.rmtree(self.location)
+
+    def test_commands_publish_catalog_snapshot(self):
+        """The whole catalog should be published to the default storage."""
+        factories.CourseFactory.create_batch(2)
+
+        with self.settings(MEDIA_ROOT=self.location):
+            with self.assertLogs(
+                "joanie.core.publish_catalog_snapshot", "INFO"
+            ) as logs:
+                call_command("publish_catalog_snapshot")
+
+        self.assertIn(
+            "4 snapshot(s) written, 0 unchanged and 0 deleted.", logs.output[0]
+        )
+        with open(
+            os.path.join(self.location, "catalog", "manifest.json"), encoding="utf-8"
+        ) as manifest:
+            self.assertEqual(len(json.load(manifest)["files"]), 4)
+
+    def test_commands_publish_catalog_snapshot_restricted_to_course(self):
+        """Only the provided courses should be published."""
+        course, __ = factories.CourseFactory.create_batch(2)
+
+        with self.settings(MEDIA_ROOT=self.location):
+            with self.assertLogs(
+                "joanie.core.publish_catalog_snapshot", "INFO"
+            ) as logs:
+                call_command("publish_catalog_snapshot", courses=[course.code])
+
+        self.assertIn(
+            "2 snapshot(s) written, 0 unchanged and 0 deleted.", logs.output[0]
+        )
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.location, "catalog", "en-us"))),
+            ["courses"],
+        )
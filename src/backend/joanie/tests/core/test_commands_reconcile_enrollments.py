@@ -0,0 +1,225 @@
+"""Test suite for the management command 'reconcile_enrollments'"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from joanie.core import enums, factories, models
+from joanie.lms_handler.backends.dummy import DummyLMSBackend
+from joanie.lms_handler.backends.failing import FailingLMSBackend
+
+
+class ReconcileEnrollmentsTestCase(TestCase):
+    """Test case for the management command 'reconcile_enrollments'"""
+
+    def setUp(self):
+        """Start each test with no enrollment in the dummy LMS."""
+        cache.clear()
+
+    @staticmethod
+    def create_enrollments(count, **kwargs):
+        """Create enrollments to an opened course run then mark them as failed."""
+        course_run = factories.CourseRunFactory(
+            start=timezone.now() - timedelta(hours=1),
+            end=timezone.now() + timedelta(hours=2),
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            is_listed=True,
+        )
+        enrollments = factories.EnrollmentFactory.create_batch(
+            count, course_run=course_run, is_active=True, **kwargs
+        )
+        models.Enrollment.objects.filter(
+            pk__in=[enrollment.pk for enrollment in enrollments]
+        ).update(state=enums.ENROLLMENT_STATE_FAILED)
+        return enrollments
+
+    @staticmethod
+    def is_active_in_lms(enrollment):
+        """Return whether the enrollment is active in the dummy LMS."""
+        return cache.get(
+            DummyLMSBackend.get_cache_key(
+                enrollment.user.username, enrollment.course_run.resource_link
+            )
+        )
+
+    def test_commands_reconcile_enrollments(self):
+        """
+        Failed enrollments in sync with the LMS should be marked as set and the others
+        set again in the LMS.
+        """
+        in_sync, out_of_sync = self.create_enrollments(2)
+        cache.delete(
+            DummyLMSBackend.get_cache_key(
+                out_of_sync.user.username, out_of_sync.course_run.resource_link
+            )
+        )
+        # - Enrollments set are not reconciled
+        set_enrollment = factories.EnrollmentFactory(
+            course_run=in_sync.course_run, is_active=True
+        )
+        cache.clear()
+
+        with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+            call_command("reconcile_enrollments")
+
+        self.assertIn(
+            "0 enrollment(s) in sync, 2 set again, 0 failed and 0 unchecked.",
+            logs.output[-1],
+        )
+        for enrollment in (in_sync, out_of_sync):
+            enrollment.refresh_from_db()
+            self.assertEqual(enrollment.state, enums.ENROLLMENT_STATE_SET)
+            self.assertTrue(self.is_active_in_lms(enrollment))
+        self.assertFalse(self.is_active_in_lms(set_enrollment))
+
+        # - Reconciling again checks enrollments set but not updated for a while
+        with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+            call_command("reconcile_enrollments", stale_days=0)
+
+        self.assertIn(
+            "2 enrollment(s) in sync, 1 set again, 0 failed and 0 unchecked.",
+            logs.output[-1],
+        )
+        self.assertTrue(self.is_active_in_lms(set_enrollment))
+
+    def test_commands_reconcile_enrollments_dry_run(self):
+        """On dry run, the LMS and enrollments should be left untouched."""
+        enrollment_in_sync, enrollment = self.create_enrollments(2)
+        cache.delete(
+            DummyLMSBackend.get_cache_key(
+                enrollment.user.username, enrollment.course_run.resource_link
+            )
+        )
+
+        with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+            call_command("reconcile_enrollments", dry_run=True)
+
+        self.assertIn(
+            "1 enrollment(s) in sync, 1 to set again, 0 failed and 0 unchecked.",
+            logs.output[-1],
+        )
+        self.assertFalse(self.is_active_in_lms(enrollment))
+        self.assertEqual(
+            models.Enrollment.objects.filter(
+                pk__in=[enrollment_in_sync.pk, enrollment.pk],
+                state=enums.ENROLLMENT_STATE_FAILED,
+            ).count(),
+            2,
+        )
+
+    def test_commands_reconcile_enrollments_batches(self):
+        """
+        Enrollments should be reconciled by batches reporting the last enrollment
+        processed, and the reconciliation can be resumed after an enrollment.
+        """
+        enrollments = sorted(self.create_enrollments(5), key=lambda e: e.pk)
+
+        with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+            call_command(
+                "reconcile_enrollments",
+                batch_size=2,
+                max_workers=2,
+                after=str(enrollments[0].pk),
+            )
+
+        self.assertEqual(len(logs.output), 3)
+        self.assertIn(f"last enrollment: {enrollments[2].pk}", logs.output[0])
+        self.assertIn(f"last enrollment: {enrollments[4].pk}", logs.output[1])
+        self.assertIn("4 enrollment(s) in sync", logs.output[2])
+        enrollments[0].refresh_from_db()
+        self.assertEqual(enrollments[0].state, enums.ENROLLMENT_STATE_FAILED)
+
+    def test_commands_reconcile_enrollments_lms_failing(self):
+        """
+        Enrollments whose state cannot be retrieved should be reported as unchecked
+        and left untouched.
+        """
+        (enrollment,) = self.create_enrollments(1)
+
+        with override_settings(
+            JOANIE_LMS_BACKENDS=[
+                {
+                    "BACKEND": "joanie.lms_handler.backends.failing.FailingLMSBackend",
+                    "BASE_URL": "http://failing.test",
+                    "SELECTOR_REGEX": r".*",
+                    "COURSE_REGEX": r"^(?P<course_id>.*)$",
+                }
+            ]
+        ):
+            with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+                call_command("reconcile_enrollments", courses=["unknown"])
+                call_command(
+                    "reconcile_enrollments", courses=[enrollment.course_run.course.code]
+                )
+
+        self.assertEqual(
+            logs.output[-1],
+            "INFO:joanie.core.reconcile_enrollments:"
+            "0 enrollment(s) in sync, 0 set again, 0 failed and 1 unchecked.",
+        )
+        self.assertIn(
+            "0 enrollment(s) in sync, 0 set again, 0 failed and 0 unchecked.",
+            logs.output[0],
+        )
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.state, enums.ENROLLMENT_STATE_FAILED)
+
+    def test_commands_reconcile_enrollments_lms_failing_stale(self):
+        """
+        Enrollments set whose state cannot be retrieved should not be marked as
+        failed while those which cannot be set again should.
+        """
+        (set_enrollment,) = self.create_enrollments(1)
+        models.Enrollment.objects.filter(pk=set_enrollment.pk).update(
+            state=enums.ENROLLMENT_STATE_SET
+        )
+        (failed_enrollment,) = self.create_enrollments(1)
+
+        with override_settings(
+            JOANIE_LMS_BACKENDS=[
+                {
+                    "BACKEND": "joanie.lms_handler.backends.failing.FailingLMSBackend",
+                    "BASE_URL": "http://failing.test",
+                    "SELECTOR_REGEX": r".*",
+                    "COURSE_REGEX": r"^(?P<course_id>.*)$",
+                }
+            ]
+        ), mock.patch.object(
+            FailingLMSBackend,
+            "get_enrollment",
+            side_effect=lambda username, resource_link: (
+                None if resource_link == set_enrollment.course_run.resource_link else {}
+            ),
+        ):
+            with self.assertLogs("joanie.core.reconcile_enrollments", "INFO") as logs:
+                call_command("reconcile_enrollments", stale_days=0)
+
+        self.assertIn(
+            "0 enrollment(s) in sync, 0 set again, 1 failed and 1 unchecked.",
+            logs.output[-1],
+        )
+        set_enrollment.refresh_from_db()
+        self.assertEqual(set_enrollment.state, enums.ENROLLMENT_STATE_SET)
+        failed_enrollment.refresh_from_db()
+        self.assertEqual(failed_enrollment.state, enums.ENROLLMENT_STATE_FAILED)
+
+    @mock.patch("time.sleep")
+    def test_commands_reconcile_enrollments_rate(self, mock_sleep):
+        """Both LMS lookups and writes should be spaced out according to the rate."""
+        enrollments = self.create_enrollments(2)
+        cache.clear()
+
+        with mock.patch("time.monotonic", return_value=100):
+            call_command("reconcile_enrollments", rate=2)
+
+        # - 2 lookups then 2 writes, the first call being started right away
+        self.assertEqual(
+            mock_sleep.call_args_list,
+            [mock.call(0.5), mock.call(1.0), mock.call(1.5)],
+        )
+        for enrollment in enrollments:
+            self.assertTrue(self.is_active_in_lms(enrollment))
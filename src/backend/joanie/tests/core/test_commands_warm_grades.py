@@ -0,0 +1,121 @@
+"""Test suite for the management command 'warm_grades'"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from joanie.core import factories
+from joanie.core.utils import is_cache_shared
+from joanie.lms_handler.backends.openedx import OpenEdXLMSBackend
+
+
+@override_settings(
+    JOANIE_LMS_BACKENDS=[
+        {
+            "API_TOKEN": "FakeEdXAPIKey",
+            "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+            "BASE_URL": "http://edx:8073",
+            "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            "SELECTOR_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+        }
+    ],
+    JOANIE_ENROLLMENT_GRADE_CACHE_TTL=600,
+)
+@mock.patch.object(OpenEdXLMSBackend, "set_enrollment", return_value=True)
+class WarmGradesTestCase(TestCase):
+    """Test case for the management command 'warm_grades'"""
+
+    def setUp(self):
+        """
+        Start each test with an empty cache, considered as shared by all processes
+        unless a test says otherwise. LMS requests are sent from other threads which
+        would not see a database cache table created within the test transaction.
+        """
+        cache.clear()
+        patcher = mock.patch(
+            "joanie.core.management.commands.warm_grades.is_cache_shared",
+            return_value=True,
+        )
+        self.mock_is_cache_shared = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def create_course_run(number, **kwargs):
+        """Create an opened course run related to the OpenEdX LMS."""
+        return factories.CourseRunFactory(
+            start=timezone.now() - timedelta(hours=1),
+            end=timezone.now() + timedelta(hours=2),
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            resource_link=(
+                f"http://openedx.test/courses/course-v1:edx+{number:06d}+Demo/course"
+            ),
+            **kwargs,
+        )
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", return_value={"passed": True})
+    def test_commands_warm_grades(self, mock_get_grades, _):
+        """
+        Grades of active enrollments to started gradable course runs should be
+        retrieved and cached so that checking enrollments does not request the LMS.
+        """
+        gradable_course_run = self.create_course_run(1, is_gradable=True)
+        enrollment = factories.EnrollmentFactory(
+            course_run=gradable_course_run, is_active=True
+        )
+        factories.EnrollmentFactory(course_run=gradable_course_run, is_active=False)
+        factories.EnrollmentFactory(
+            course_run=self.create_course_run(2, is_gradable=False), is_active=True
+        )
+
+        with self.assertLogs("joanie.core.warm_grades", "INFO") as logs:
+            call_command("warm_grades")
+
+        self.assertIn("1 grade(s) retrieved and 0 failed.", logs.output[0])
+        mock_get_grades.assert_called_once_with(
+            username=enrollment.user.username,
+            resource_link=gradable_course_run.resource_link,
+        )
+
+        mock_get_grades.reset_mock()
+        self.assertIs(enrollment.is_passed, True)
+        call_command("warm_grades")
+        mock_get_grades.assert_not_called()
+
+        # - Unless refresh is forced
+        call_command("warm_grades", force=True)
+        mock_get_grades.assert_called_once()
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", return_value={"passed": True})
+    def test_commands_warm_grades_restricted_to_courses(self, mock_get_grades, _):
+        """The warmup can be restricted to a list of courses."""
+        course_run = self.create_course_run(1, is_gradable=True)
+        enrollment = factories.EnrollmentFactory(course_run=course_run, is_active=True)
+        factories.EnrollmentFactory(
+            course_run=self.create_course_run(2, is_gradable=True), is_active=True
+        )
+
+        call_command("warm_grades", courses=[course_run.course.code], max_workers=1)
+
+        mock_get_grades.assert_called_once_with(
+            username=enrollment.user.username, resource_link=course_run.resource_link
+        )
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades")
+    def test_commands_warm_grades_process_local_cache(self, mock_get_grades, _):
+        """
+        The command should refuse to run with a cache local to its process as grades
+        would be lost when it exits.
+        """
+        self.mock_is_cache_shared.side_effect = is_cache_shared
+        factories.EnrollmentFactory(
+            course_run=self.create_course_run(1, is_gradable=True), is_active=True
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("warm_grades")
+
+        mock_get_grades.assert_not_called()
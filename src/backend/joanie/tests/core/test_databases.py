@@ -0,0 +1,171 @@
+"""Test suite for the routing of database queries to read replicas"""
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from joanie.core import models
+from joanie.core.databases import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    use_primary,
+    use_replicas,
+)
+
+
+def read_database_view(request):
+    """Respond with the database alias used to read courses."""
+    return HttpResponse(ReplicaRouter.db_for_read(models.Course))
+
+
+@use_primary()
+def primary_read_database_view(request):
+    """Respond with the database alias used to read courses from a primary view."""
+    return read_database_view(request)
+
+
+@override_settings(JOANIE_DATABASE_REPLICAS=["replica_0"])
+class ReplicaRouterTestCase(TestCase):
+    """Test suite for the replica database router and its middleware."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.middleware = ReplicaRoutingMiddleware(read_database_view)
+
+    def test_databases_router_reads_from_primary_by_default(self):
+        """Outside of requests, reads should go to the primary database."""
+        self.assertEqual(ReplicaRouter.db_for_read(models.Course), "default")
+
+    def test_databases_router_use_replicas(self):
+        """Reads should go to replicas only when allowed, and writes never."""
+        with use_replicas():
+            self.assertEqual(ReplicaRouter.db_for_read(models.Course), "replica_0")
+            self.assertEqual(ReplicaRouter.db_for_write(models.Course), "default")
+
+            with use_primary():
+                self.assertEqual(ReplicaRouter.db_for_read(models.Course), "default")
+
+            self.assertEqual(ReplicaRouter.db_for_read(models.Course), "replica_0")
+
+    @override_settings(JOANIE_DATABASE_REPLICAS=[])
+    def test_databases_router_use_replicas_without_replica(self):
+        """Without replica, reads should always go to the primary database."""
+        with use_replicas():
+            self.assertEqual(ReplicaRouter.db_for_read(models.Course), "default")
+
+    def test_databases_router_allow_migrate(self):
+        """Only the primary database should be migrated."""
+        self.assertTrue(ReplicaRouter.allow_migrate("default", "core"))
+        self.assertFalse(ReplicaRouter.allow_migrate("replica_0", "core"))
+
+    def test_databases_middleware_safe_requests(self):
+        """Safe requests should read from replicas."""
+        response = self.middleware(RequestFactory().get("/"))
+
+        self.assertEqual(response.content, b"replica_0")
+
+    def test_databases_middleware_unsafe_requests(self):
+        """
+        Unsafe requests should read from the primary database, then the client
+        should stick to it for a while but not other clients.
+        """
+        factory = RequestFactory()
+
+        response = self.middleware(factory.post("/", HTTP_AUTHORIZATION="Bearer 1"))
+        self.assertEqual(response.content, b"default")
+
+        response = self.middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 1"))
+        self.assertEqual(response.content, b"default")
+
+        response = self.middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 2"))
+        self.assertEqual(response.content, b"replica_0")
+
+    @override_settings(JOANIE_DATABASE_REPLICA_STICKINESS=0)
+    def test_databases_middleware_unsafe_requests_no_stickiness(self):
+        """Clients should read from replicas again once the stickiness expired."""
+        factory = RequestFactory()
+        self.middleware(factory.post("/", HTTP_AUTHORIZATION="Bearer 1"))
+
+        response = self.middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 1"))
+        self.assertEqual(response.content, b"replica_0")
+
+    def test_databases_middleware_use_primary_view(self):
+        """Views decorated with `use_primary` should read from the primary database."""
+        middleware = ReplicaRoutingMiddleware(primary_read_database_view)
+
+        response = middleware(RequestFactory().get("/"))
+
+        self.assertEqual(response.content, b"default")
+
+
+def list_users_view(request):
+    """Respond with the usernames of users read from the database."""
+    return HttpResponse(
+        ",".join(
+            models.User.objects.order_by("username").values_list("username", flat=True)
+        )
+    )
+
+
+@override_settings(JOANIE_DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingDatabasesTestCase(TestCase):
+    """
+    Test suite for the routing of queries between two real databases: the replica
+    does not mirror the default database so that each query shows where it went.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        models.User.objects.db_manager("default").create(username="primary")
+        models.User.objects.db_manager("replica").create(username="replica")
+
+    def test_databases_routing_reads_from_replica(self):
+        """Reads should go to the replica only when allowed."""
+        self.assertEqual(models.User.objects.get().username, "primary")
+
+        with use_replicas():
+            self.assertEqual(models.User.objects.get().username, "replica")
+
+            with use_primary():
+                self.assertEqual(models.User.objects.get().username, "primary")
+
+    def test_databases_routing_writes_to_primary(self):
+        """Writes and locking reads should go to the primary database."""
+        with use_replicas():
+            models.User.objects.create(username="written")
+
+            with transaction.atomic():
+                locked = models.User.objects.select_for_update().order_by("username")
+                self.assertEqual(
+                    list(locked.values_list("username", flat=True)),
+                    ["primary", "written"],
+                )
+
+        self.assertTrue(
+            models.User.objects.using("default").filter(username="written").exists()
+        )
+        self.assertFalse(
+            models.User.objects.using("replica").filter(username="written").exists()
+        )
+
+    def test_databases_routing_sticky_requests(self):
+        """
+        After a write, a client should read from the primary database while other
+        clients read from the replica.
+        """
+        middleware = ReplicaRoutingMiddleware(list_users_view)
+        factory = RequestFactory()
+
+        response = middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 1"))
+        self.assertEqual(response.content, b"replica")
+
+        middleware(factory.post("/", HTTP_AUTHORIZATION="Bearer 1"))
+
+        response = middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 1"))
+        self.assertEqual(response.content, b"primary")
+        response = middleware(factory.get("/", HTTP_AUTHORIZATION="Bearer 2"))
+        self.assertEqual(response.content, b"replica")
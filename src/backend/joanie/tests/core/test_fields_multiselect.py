@@ -0,0 +1,94 @@
+"""Test suite for the MultiSelectField"""
+from django.core.exceptions import FieldError, ValidationError
+from django.db import connection
+from django.test import TestCase
+
+from joanie.core import factories, models
+
+
+class MultiSelectFieldTestCase(TestCase):
+    """Test suite for the MultiSelectField through the course run languages."""
+
+    def test_fields_multiselect_round_trip(self):
+        """List values should be stored and read back as lists."""
+        course_run = factories.CourseRunFactory(languages=["fr", "en"])
+
+        course_run.refresh_from_db()
+
+        self.assertEqual(course_run.languages, ["fr", "en"])
+
+    def test_fields_multiselect_lookups(self):
+        """
+        The `contains` lookup should match rows including all values and the
+        `overlap` lookup rows including any of them.
+        """
+        french_english = factories.CourseRunFactory(languages=["fr", "en"])
+        french = factories.CourseRunFactory(languages=["fr"])
+        german = factories.CourseRunFactory(languages=["de"])
+        course_runs = models.CourseRun.objects.all()
+
+        self.assertCountEqual(
+            course_runs.filter(languages__contains=["fr", "en"]), [french_english]
+        )
+        self.assertCountEqual(
+            course_runs.filter(languages__contains="fr"), [french_english, french]
+        )
+        self.assertCountEqual(
+            course_runs.filter(languages__overlap=["en", "de"]),
+            [french_english, german],
+        )
+        self.assertFalse(course_runs.filter(languages__overlap=["es"]).exists())
+
+    def test_fields_multiselect_exact_lookups(self):
+        """The `exact` and `isnull` lookups should compare whole list values."""
+        french_english = factories.CourseRunFactory(languages=["fr", "en"])
+        factories.CourseRunFactory(languages=["fr"])
+        course_runs = models.CourseRun.objects.all()
+
+        self.assertEqual(
+            list(course_runs.filter(languages=["fr", "en"])), [french_english]
+        )
+        self.assertFalse(course_runs.filter(languages=["en", "fr"]).exists())
+        self.assertFalse(course_runs.filter(languages__isnull=True).exists())
+
+    def test_fields_multiselect_unsupported_lookups(self):
+        """
+        String lookups inherited from CharField should not be available as they do
+        not behave the same on a comma separated string and a native array.
+        """
+        for lookup in ("icontains", "startswith", "in", "iexact"):
+            with self.subTest(lookup=lookup), self.assertRaises(FieldError):
+                models.CourseRun.objects.filter(**{f"languages__{lookup}": "fr"})
+
+    def test_fields_multiselect_index(self):
+        """
+        The index declared on the field should use GIN on PostgreSQL only, other
+        databases getting a regular index.
+        """
+        [index] = models.CourseRun._meta.indexes
+
+        sql = str(index.create_sql(models.CourseRun, connection.schema_editor()))
+
+        if connection.vendor == "postgresql":
+            self.assertIn("USING gin", sql)
+        else:
+            self.assertNotIn("USING", sql)
+        self.assertIn("joanie_course_run_lang_gin", sql)
+
+    def test_fields_multiselect_choice_keys(self):
+        """Valid choice keys should be computed once as a frozenset."""
+        field = models.CourseRun._meta.get_field("languages")
+
+        self.assertIsInstance(field.choice_keys, frozenset)
+        self.assertIn("fr", field.choice_keys)
+        self.assertIs(field.choice_keys, field.choice_keys)
+
+    def test_fields_multiselect_validate(self):
+        """Values which are not valid choices should be rejected."""
+        course_run = factories.CourseRunFactory(languages=["fr"])
+        course_run.full_clean()
+
+        course_run.languages = ["fr", "invalid"]
+        with self.assertRaises(ValidationError) as context:
+            course_run.full_clean()
+        self.assertIn("Value invalid is not a valid choice.", str(context.exception))
@@ -0,0 +1,163 @@
+"""Test suite for the cache of learner grades"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from joanie.core.exceptions import GradeError
+from joanie.core.grades import (
+    get_cached_grade,
+    get_grade,
+    get_grade_cache_key,
+    get_grade_cache_stats,
+    reset_grade_cache_stats,
+    set_grade,
+    warm_grades,
+)
+from joanie.lms_handler.backends.openedx import OpenEdXLMSBackend
+
+RESOURCE_LINK = "http://openedx.test/courses/course-v1:edx+000001+Demo_Course/course"
+
+
+@override_settings(
+    JOANIE_LMS_BACKENDS=[
+        {
+            "API_TOKEN": "FakeEdXAPIKey",
+            "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+            "BASE_URL": "http://edx:8073",
+            "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            "SELECTOR_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+        }
+    ],
+    JOANIE_ENROLLMENT_GRADE_CACHE_TTL=600,
+    JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL=60,
+)
+class GradesTestCase(TestCase):
+    """Test case for the cache of grades keyed by learner and course run."""
+
+    def setUp(self):
+        """Start each test with an empty cache and no statistics."""
+        cache.clear()
+        reset_grade_cache_stats()
+
+    def test_grades_cache_key(self):
+        """Cache keys should be valid for any cache backend."""
+        key = get_grade_cache_key("jo", RESOURCE_LINK)
+
+        self.assertRegex(key, r"^grade_[0-9a-f]{64}$")
+        self.assertNotEqual(key, get_grade_cache_key("jo", f"{RESOURCE_LINK}/"))
+        self.assertNotEqual(key, get_grade_cache_key("joe", RESOURCE_LINK))
+
+    @override_settings(JOANIE_PUSHED_GRADE_CACHE_TTL=172800)
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades")
+    def test_grades_set_grade(self, mock_get_grades):
+        """
+        Pushed grades should be kept longer than polled grades and read from cache
+        without requesting the LMS.
+        """
+        self.assertIsNone(get_cached_grade("jo", RESOURCE_LINK))
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as mock_set:
+            set_grade("jo", RESOURCE_LINK, {"passed": True})
+
+        mock_set.assert_called_once_with(
+            get_grade_cache_key("jo", RESOURCE_LINK), {"passed": True}, 172800
+        )
+        self.assertEqual(get_cached_grade("jo", RESOURCE_LINK), {"passed": True})
+        self.assertEqual(get_grade("jo", RESOURCE_LINK), {"passed": True})
+        mock_get_grades.assert_not_called()
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", side_effect=GradeError)
+    def test_grades_get_cached_grade_failure(self, _):
+        """A failure in cache should not be returned as a grade."""
+        get_grade("jo", RESOURCE_LINK)
+
+        self.assertIsNone(get_cached_grade("jo", RESOURCE_LINK))
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", return_value={"passed": True})
+    def test_grades_get_grade_cached(self, mock_get_grades):
+        """A grade should be requested once then served from cache."""
+        self.assertEqual(get_grade("jo", RESOURCE_LINK), {"passed": True})
+        self.assertEqual(get_grade("jo", RESOURCE_LINK), {"passed": True})
+
+        mock_get_grades.assert_called_once_with(
+            username="jo", resource_link=RESOURCE_LINK
+        )
+        self.assertEqual(
+            get_grade_cache_stats(),
+            {"hits": 1, "misses": 1, "negative_hits": 0, "errors": 0},
+        )
+
+        # - Unless refresh is forced
+        self.assertEqual(get_grade("jo", RESOURCE_LINK, force=True), {"passed": True})
+        self.assertEqual(mock_get_grades.call_count, 2)
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", side_effect=GradeError())
+    def test_grades_get_grade_failure_cached(self, mock_get_grades):
+        """A failure should be cached so that a failing LMS is not requested again."""
+        self.assertIsNone(get_grade("jo", RESOURCE_LINK))
+        self.assertIsNone(get_grade("jo", RESOURCE_LINK))
+
+        mock_get_grades.assert_called_once()
+        self.assertEqual(
+            get_grade_cache_stats(),
+            {"hits": 0, "misses": 1, "negative_hits": 1, "errors": 1},
+        )
+
+    @override_settings(JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL=0)
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades", side_effect=GradeError())
+    def test_grades_get_grade_failure_not_cached(self, mock_get_grades):
+        """Caching of failures can be disabled."""
+        self.assertIsNone(get_grade("jo", RESOURCE_LINK))
+        self.assertIsNone(get_grade("jo", RESOURCE_LINK))
+
+        self.assertEqual(mock_get_grades.call_count, 2)
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades")
+    def test_grades_get_grade_no_lms(self, mock_get_grades):
+        """Course runs related to no LMS should have no grade."""
+        with self.assertLogs("joanie.core.grades", "ERROR"):
+            self.assertIsNone(get_grade("jo", "http://unknown.test/course"))
+
+        mock_get_grades.assert_not_called()
+
+    def test_grades_warm_grades(self):
+        """
+        Grades not in cache should be retrieved once per learner and course run,
+        failures being reported.
+        """
+
+        def get_grades(username, resource_link):
+            if username == "failing":
+                raise GradeError()
+            return {"passed": resource_link == RESOURCE_LINK}
+
+        other_resource_link = RESOURCE_LINK.replace("000001", "000002")
+        cache.set(get_grade_cache_key("cached", RESOURCE_LINK), {"passed": False})
+
+        with mock.patch.object(
+            OpenEdXLMSBackend, "get_grades", side_effect=get_grades
+        ) as mock_get_grades:
+            self.assertEqual(
+                warm_grades(
+                    [
+                        ("jo", RESOURCE_LINK),
+                        ("jo", RESOURCE_LINK),
+                        ("jo", other_resource_link),
+                        ("failing", RESOURCE_LINK),
+                        ("cached", RESOURCE_LINK),
+                    ],
+                    max_workers=2,
+                ),
+                (2, 1),
+            )
+
+        self.assertEqual(mock_get_grades.call_count, 3)
+        self.assertEqual(get_grade("jo", RESOURCE_LINK), {"passed": True})
+        self.assertEqual(get_grade("jo", other_resource_link), {"passed": False})
+        self.assertIsNone(get_grade("failing", RESOURCE_LINK))
+        self.assertEqual(
+            get_grade_cache_stats(),
+            {"hits": 2, "misses": 3, "negative_hits": 1, "errors": 1},
+        )
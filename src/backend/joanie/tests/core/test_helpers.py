@@ -150,6 +150,64 @@ class HelpersTestCase(TestCase):
             self.assertEqual(helpers.generate_certificate_for_order(order), 0)
         self.assertEqual(certificate_qs.count(), 1)
 
+    def test_helpers_get_orders_changed_since(self):
+        """
+        Orders whose eligibility for certification may have changed since a date
+        should be those which changed, whose enrollments or course runs changed or
+        which rely on gradable course runs still running at that date.
+        """
+        course_run = factories.CourseRunFactory(
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            enrollment_start=timezone.now() - timedelta(hours=1),
+            is_gradable=False,
+            start=timezone.now() - timedelta(hours=1),
+        )
+        product = factories.ProductFactory(
+            price="0.00",
+            type=enums.PRODUCT_TYPE_CREDENTIAL,
+            target_courses=[course_run.course],
+        )
+        course = factories.CourseFactory(products=[product])
+        order, other_order = factories.OrderFactory.create_batch(
+            2, product=product, course=course
+        )
+        since = timezone.now()
+
+        self.assertFalse(
+            helpers.get_orders_changed_since(models.Order.objects.all(), since).exists()
+        )
+
+        # - An enrollment changed
+        order.get_enrollments().get().save()
+        self.assertEqual(
+            list(helpers.get_orders_changed_since(models.Order.objects.all(), since)),
+            [order],
+        )
+
+        # - The course run changed and is now gradable
+        course_run.is_gradable = True
+        course_run.save()
+        self.assertCountEqual(
+            helpers.get_orders_changed_since(models.Order.objects.all(), since),
+            [order, other_order],
+        )
+
+        # - Orders relying on gradable course runs running at that date are reviewed
+        # as grades may have changed
+        self.assertCountEqual(
+            helpers.get_orders_changed_since(
+                models.Order.objects.all(), timezone.now()
+            ),
+            [order, other_order],
+        )
+        course_run.end = timezone.now() - timedelta(minutes=1)
+        course_run.save(validate=False)
+        self.assertFalse(
+            helpers.get_orders_changed_since(
+                models.Order.objects.all(), timezone.now()
+            ).exists()
+        )
+
     def test_helpers_generate_certificates_for_orders(self):
         """
         This method should generate a certificate for each order eligible for certification.
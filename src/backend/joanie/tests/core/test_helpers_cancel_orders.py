@@ -0,0 +1,211 @@
+"""
+Test suite for the cancel_orders helper
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from moneyed import Money
+
+from joanie.core import enums, factories, models
+from joanie.core.helpers import cancel_orders
+from joanie.lms_handler.backends.dummy import DummyLMSBackend
+
+
+class CancelOrdersTestCase(TestCase):
+    """Test suite for the `cancel_orders` helper."""
+
+    @staticmethod
+    def _create_enrolled_orders(count, is_listed=False):
+        """
+        Create `count` free orders, each of them owned by a user enrolled to a course
+        run of the product target course.
+        """
+        [course, target_course] = factories.CourseFactory.create_batch(2)
+        course_run = factories.CourseRunFactory.create_batch(
+            2,
+            course=target_course,
+            start=timezone.now() - timedelta(hours=1),
+            end=timezone.now() + timedelta(hours=2),
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            is_listed=is_listed,
+        )[0]
+        product = factories.ProductFactory(
+            courses=[course], target_courses=[target_course], price=Money("0.00", "EUR")
+        )
+        orders = []
+        for _ in range(count):
+            order = factories.OrderFactory(product=product, course=course)
+            factories.EnrollmentFactory(
+                course_run=course_run, user=order.owner, is_active=True
+            )
+            orders.append(order)
+
+        return orders
+
+    def test_helpers_cancel_orders(self):
+        """
+        All orders should be canceled and related enrollments to not listed course
+        runs should be deactivated.
+        """
+        orders = self._create_enrolled_orders(3)
+
+        count = cancel_orders(
+            models.Order.objects.filter(pk__in=[o.pk for o in orders])
+        )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(models.Order.objects.filter(is_canceled=True).count(), 3)
+        self.assertEqual(models.Enrollment.objects.filter(is_active=True).count(), 0)
+        self.assertEqual(
+            models.Enrollment.objects.filter(
+                is_active=False, state=enums.ENROLLMENT_STATE_SET
+            ).count(),
+            3,
+        )
+
+    def test_helpers_cancel_orders_ignores_canceled_orders(self):
+        """Orders already canceled should not be counted nor processed again."""
+        orders = self._create_enrolled_orders(2)
+        orders[0].cancel()
+
+        count = cancel_orders(
+            models.Order.objects.filter(pk__in=[o.pk for o in orders])
+        )
+
+        self.assertEqual(count, 1)
+        self.assertEqual(models.Order.objects.filter(is_canceled=True).count(), 2)
+
+    def test_helpers_cancel_orders_with_listed_course_run(self):
+        """Enrollments to listed course runs should be kept active."""
+        orders = self._create_enrolled_orders(2, is_listed=True)
+
+        cancel_orders(models.Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        self.assertEqual(models.Order.objects.filter(is_canceled=True).count(), 2)
+        self.assertEqual(models.Enrollment.objects.filter(is_active=True).count(), 2)
+
+    def test_helpers_cancel_orders_with_course_implied_in_several_products(self):
+        """
+        If the owner still owns another product targeting the course of an enrollment,
+        this enrollment should be kept active.
+        """
+        order = self._create_enrolled_orders(1)[0]
+        other_product = factories.ProductFactory(
+            courses=[order.course],
+            target_courses=order.product.target_courses.all(),
+            price=Money("0.00", "EUR"),
+        )
+        factories.OrderFactory(
+            owner=order.owner, product=other_product, course=order.course
+        )
+
+        cancel_orders(models.Order.objects.filter(pk=order.pk))
+
+        order.refresh_from_db()
+        self.assertTrue(order.is_canceled)
+        self.assertEqual(models.Enrollment.objects.filter(is_active=True).count(), 1)
+
+    def test_helpers_cancel_orders_lms_failure(self):
+        """
+        When the LMS fails to unenroll a user, the enrollment should be deactivated
+        anyway but marked as failed.
+        """
+        orders = self._create_enrolled_orders(2)
+
+        with mock.patch.object(
+            DummyLMSBackend,
+            "set_enrollments",
+            side_effect=lambda enrollments, active: list(enrollments)[:1],
+        ) as mock_set_enrollments:
+            cancel_orders(models.Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        # - LMS calls are grouped by backend
+        mock_set_enrollments.assert_called_once()
+        self.assertEqual(
+            models.Enrollment.objects.filter(
+                is_active=False, state=enums.ENROLLMENT_STATE_FAILED
+            ).count(),
+            1,
+        )
+        self.assertEqual(
+            models.Enrollment.objects.filter(
+                is_active=False, state=enums.ENROLLMENT_STATE_SET
+            ).count(),
+            1,
+        )
+
+    def test_helpers_cancel_orders_query_count(self):
+        """The number of queries should not depend on the number of orders."""
+        orders = self._create_enrolled_orders(1)
+        with CaptureQueriesContext(connection) as single_order_queries:
+            cancel_orders(models.Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        orders = self._create_enrolled_orders(5)
+        with CaptureQueriesContext(connection) as several_orders_queries:
+            cancel_orders(models.Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        self.assertEqual(
+            len(several_orders_queries.captured_queries),
+            len(single_order_queries.captured_queries),
+        )
+
+    def test_helpers_cancel_orders_by_batches(self):
+        """Orders should be processed by batches and the progress reported."""
+        orders = self._create_enrolled_orders(3)
+        on_progress = mock.Mock()
+
+        cancel_orders(
+            models.Order.objects.filter(pk__in=[o.pk for o in orders]),
+            batch_size=2,
+            on_progress=on_progress,
+        )
+
+        self.assertEqual(on_progress.call_args_list, [mock.call(2, 3), mock.call(3, 3)])
+        self.assertEqual(models.Order.objects.filter(is_canceled=True).count(), 3)
+
+    def test_helpers_cancel_orders_lms_called_after_commit(self):
+        """
+        Users should be unenrolled from the LMS once orders and enrollments of the
+        batch are updated, outside of the transaction.
+        """
+        orders = self._create_enrolled_orders(1)
+        atomic = transaction.atomic
+        atomic_blocks = []
+
+        @contextmanager
+        def tracked_atomic(*args, **kwargs):
+            with atomic(*args, **kwargs):
+                atomic_blocks.append(True)
+                try:
+                    yield
+                finally:
+                    atomic_blocks.pop()
+
+        def set_enrollments(*_args, **_kwargs):
+            self.assertEqual(atomic_blocks, [])
+            self.assertTrue(models.Order.objects.get(pk=orders[0].pk).is_canceled)
+            self.assertFalse(
+                models.Enrollment.objects.filter(
+                    user=orders[0].owner, is_active=True
+                ).exists()
+            )
+            return []
+
+        with mock.patch.object(
+            DummyLMSBackend, "set_enrollments", side_effect=set_enrollments
+        ) as mock_set_enrollments, mock.patch(
+            "joanie.core.helpers.transaction.atomic", side_effect=tracked_atomic
+        ):
+            cancel_orders(models.Order.objects.filter(pk=orders[0].pk))
+
+        mock_set_enrollments.assert_called_once()
+        self.assertEqual(
+            models.Enrollment.objects.get(user=orders[0].owner).state,
+            enums.ENROLLMENT_STATE_SET,
+        )
@@ -4,6 +4,7 @@ Test suite for order models
 from datetime import timedelta
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -251,15 +252,16 @@ class EnrollmentModelsTestCase(TestCase):
         # - But `get_grades` should not have been called again
         mock_get_grades.assert_not_called()
 
-    @override_settings(JOANIE_ENROLLMENT_GRADE_CACHE_TTL=600)
+    @override_settings(
+        JOANIE_ENROLLMENT_GRADE_CACHE_TTL=600,
+        JOANIE_ENROLLMENT_GRADE_ERROR_CACHE_TTL=60,
+    )
     @mock.patch.object(OpenEdXLMSBackend, "set_enrollment", return_value=True)
     @mock.patch.object(OpenEdXLMSBackend, "get_grades", side_effect=GradeError())
-    def test_models_enrollment_is_passed_not_cached_on_failure(
-        self, mock_get_grades, _
-    ):
+    def test_models_enrollment_is_passed_failure_cached(self, mock_get_grades, _):
         """
         In case of get_grades LMS request fails, `is_passed` property should be False
-        and the result should not be cached.
+        and the failure should be cached for a shorter time.
         """
         resource_link = (
             "http://openedx.test/courses/course-v1:edx+000001+Demo_Course/course"
@@ -280,10 +282,15 @@ class EnrollmentModelsTestCase(TestCase):
             username=enrollment.user.username, resource_link=course_run.resource_link
         )
 
-        # - Calling it again should trigger the `get_grades` method
+        # - Calling it again should not trigger the `get_grades` method
         mock_get_grades.reset_mock()
         mock_get_grades.return_value = {"passed": True}
         mock_get_grades.side_effect = None
+        self.assertIs(enrollment.is_passed, False)
+        mock_get_grades.assert_not_called()
+
+        # - Once the failure expired, the grade should be retrieved again
+        cache.delete(enrollment.grade_cache_key)
         self.assertIs(enrollment.is_passed, True)
         mock_get_grades.assert_called_once_with(
             username=enrollment.user.username, resource_link=course_run.resource_link
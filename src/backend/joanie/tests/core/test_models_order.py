@@ -10,7 +10,7 @@ from django.utils import timezone
 
 from moneyed import Money
 
-from joanie.core import enums, factories
+from joanie.core import enums, factories, models
 from joanie.core.models import Enrollment
 from joanie.payment.factories import ProformaInvoiceFactory
 
@@ -220,12 +220,26 @@ class OrderModelsTestCase(TestCase):
         self.assertEqual(Enrollment.objects.filter(is_active=True).count(), 1)
 
         # - When order is canceled, user should not be unenrolled to related enrollments
-        with self.assertNumQueries(7):
+        with self.assertNumQueries(4):
             order.cancel()
         self.assertEqual(order.is_canceled, True)
         self.assertEqual(Enrollment.objects.count(), 1)
         self.assertEqual(Enrollment.objects.filter(is_active=True).count(), 1)
 
+    def test_models_order_save_validate(self):
+        """
+        Saving an order should validate it once unless trusted callers pass
+        `validate=False` to skip the validation queries.
+        """
+        order = factories.OrderFactory()
+
+        # - Related objects are checked then the order is updated
+        with self.assertNumQueries(4):
+            order.save()
+
+        with self.assertNumQueries(1):
+            order.save(validate=False)
+
     def test_models_order_cancel_with_listed_course_run(self):
         """
         On order cancellation, if order's enrollment relies on course with `is_listed`
@@ -258,7 +272,7 @@ class OrderModelsTestCase(TestCase):
         self.assertEqual(Enrollment.objects.filter(is_active=True).count(), 1)
 
         # - When order is canceled, user should not be unenrolled to related enrollments
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(2):
             order.cancel()
         self.assertEqual(order.is_canceled, True)
         self.assertEqual(Enrollment.objects.count(), 1)
@@ -327,3 +341,50 @@ class OrderModelsTestCase(TestCase):
             course_runs = order.target_course_runs.order_by("pk")
             self.assertEqual(len(course_runs), 3)
             self.assertCountEqual(list(course_runs), [cr1, cr2, cr3])
+
+    def test_models_order_queryset_validated(self):
+        """
+        The `validated` queryset method should only return orders which state is
+        validated, in one query.
+        """
+        product = factories.ProductFactory(price=Money("10.00", "EUR"))
+        free_product = factories.ProductFactory(price=Money("0.00", "EUR"))
+        pending_order = factories.OrderFactory(product=product)
+        paid_order = factories.OrderFactory(product=product)
+        ProformaInvoiceFactory(order=paid_order, total=paid_order.total)
+        free_order = factories.OrderFactory(product=free_product)
+        factories.OrderFactory(product=free_product, is_canceled=True)
+
+        with self.assertNumQueries(1):
+            validated_orders = list(models.Order.objects.validated())
+
+        self.assertCountEqual(validated_orders, [paid_order, free_order])
+        self.assertEqual(pending_order.state, enums.ORDER_STATE_PENDING)
+        for order in validated_orders:
+            self.assertEqual(order.state, enums.ORDER_STATE_VALIDATED)
+
+    def test_models_order_queryset_granting_access_to(self):
+        """
+        The `granting_access_to` queryset method should return orders which course
+        relations allow to enroll to the given course run.
+        """
+        [course1, course2] = factories.CourseFactory.create_batch(2)
+        [cr1, cr2] = factories.CourseRunFactory.create_batch(2, course=course1)
+        [cr3, cr4] = factories.CourseRunFactory.create_batch(2, course=course2)
+        other_course_run = factories.CourseRunFactory()
+        product = factories.ProductFactory(target_courses=[course1, course2])
+
+        # - Restrict course2 to cr3
+        relation = product.course_relations.get(course=course2)
+        relation.course_runs.add(cr3)
+
+        order = factories.OrderFactory(product=product)
+
+        for course_run in [cr1, cr2, cr3]:
+            self.assertEqual(
+                list(models.Order.objects.granting_access_to(course_run)), [order]
+            )
+        for course_run in [cr4, other_course_run]:
+            self.assertFalse(
+                models.Order.objects.granting_access_to(course_run).exists()
+            )
@@ -1,8 +1,10 @@
 """Test core utils."""
 
+from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
+from django.test.utils import override_settings
 
-from joanie.core.utils import merge_dict
+from joanie.core.utils import check_shared_cache, merge_dict
 
 
 class UtilsTestCase(TestCase):
@@ -16,3 +18,100 @@ class UtilsTestCase(TestCase):
             merge_dict(dict_1, dict_2),
             {"k1": {"k11": {"a": 0, "b": 10}, "k12": {"a": 3}}},
         )
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=True,
+    )
+    def test_utils_check_shared_cache_process_local(self):
+        """A cache local to each process should be refused if a shared one is required."""
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache()
+
+        with override_settings(JOANIE_SHARED_CACHE_REQUIRED=False):
+            check_shared_cache()
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=False,
+        JOANIE_GRADES_PUSH_SECRETS=["secret"],
+    )
+    def test_utils_check_shared_cache_grades_push(self):
+        """
+        A cache local to each process should be refused if the web hook through which
+        LMS push grades is enabled, as other processes would not see pushed grades.
+        """
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "JOANIE_GRADES_PUSH_SECRETS require(s) a cache"
+        ):
+            check_shared_cache()
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "joanie_cache",
+            }
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=True,
+    )
+    def test_utils_check_shared_cache_shared(self):
+        """A cache shared by all processes should be accepted."""
+        check_shared_cache()
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=False,
+        JOANIE_DATABASE_REPLICAS=["replica_0"],
+    )
+    def test_utils_check_shared_cache_database_replicas(self):
+        """
+        A cache local to each process should be refused if read replicas are declared,
+        as other web workers would not know that a client wrote recently.
+        """
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "JOANIE_DATABASE_REPLICAS require(s) a cache"
+        ):
+            check_shared_cache()
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=False,
+        JOANIE_CATALOG_SNAPSHOT_ON_CHANGE=True,
+    )
+    def test_utils_check_shared_cache_catalog_snapshot_on_change(self):
+        """
+        A cache local to each process should be refused if catalog snapshots are
+        published on changes, as the manifest lock would not exclude other processes.
+        """
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "JOANIE_CATALOG_SNAPSHOT_ON_CHANGE require(s) a cache"
+        ):
+            check_shared_cache()
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        JOANIE_SHARED_CACHE_REQUIRED=False,
+        JOANIE_BADGE_PROVIDERS={
+            "obf": {"client_id": "real_client", "client_secret": "super_duper"}
+        },
+    )
+    def test_utils_check_shared_cache_obf(self):
+        """
+        A cache local to each process should be refused if the OBF badge provider is
+        configured, as access token renewals would not be locked across processes.
+        """
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "OBF_CLIENT_ID require(s) a cache"
+        ):
+            check_shared_cache()
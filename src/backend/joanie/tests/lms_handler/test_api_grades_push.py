@@ -0,0 +1,217 @@
+"""
+Tests for the grades web hook.
+"""
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from joanie.core import enums, factories, models
+from joanie.core.grades import get_grade
+from joanie.lms_handler.backends.openedx import OpenEdXLMSBackend
+
+
+def sign(payload, secret="shared secret"):
+    """Return the authorization header signing the payload with the secret."""
+    signature = hmac.new(
+        secret.encode("utf-8"), msg=payload.encode("utf-8"), digestmod=hashlib.sha256
+    ).hexdigest()
+    return f"SIG-HMAC-SHA256 {signature:s}"
+
+
+@override_settings(
+    JOANIE_GRADES_PUSH_SECRETS=["shared secret"],
+    JOANIE_LMS_BACKENDS=[
+        {
+            "API_TOKEN": "FakeEdXAPIKey",
+            "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+            "BASE_URL": "http://openedx.test",
+            "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            "SELECTOR_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+        }
+    ],
+    JOANIE_PUSHED_GRADE_CACHE_TTL=600,
+)
+@mock.patch.object(OpenEdXLMSBackend, "set_enrollment", return_value=True)
+class GradesPushApiTestCase(TestCase):
+    """Test calls to push grades via API endpoint."""
+
+    def setUp(self):
+        """Start each test with an empty grade cache."""
+        cache.clear()
+
+    def post(self, data, authorization=None):
+        """Post the payload to the web hook, signed unless authorization is given."""
+        payload = json.dumps(data)
+        return self.client.post(
+            "/api/v1.0/grades-push",
+            payload,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=authorization or sign(payload),
+        )
+
+    @staticmethod
+    def create_order(*numbers):
+        """
+        Create a validated order of a certifying product with one graded course per
+        number.
+        """
+        course_runs = [
+            factories.CourseRunFactory(
+                enrollment_end=timezone.now() + timedelta(hours=1),
+                enrollment_start=timezone.now() - timedelta(hours=1),
+                is_gradable=True,
+                start=timezone.now() - timedelta(hours=1),
+                resource_link=(
+                    f"http://openedx.test/courses/course-v1:edx+{number:06d}+Demo/course"
+                ),
+            )
+            for number in numbers
+        ]
+        product = factories.ProductFactory(
+            price="0.00",
+            type=enums.PRODUCT_TYPE_CREDENTIAL,
+            target_courses=[course_run.course for course_run in course_runs],
+        )
+        course = factories.CourseFactory(products=[product])
+        return factories.OrderFactory(product=product, course=course)
+
+    def test_api_grades_push_missing_signature(self, _):
+        """The grades web hook requires a signature."""
+        response = self.client.post(
+            "/api/v1.0/grades-push", {"grades": []}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), "Missing authentication.")
+
+    def test_api_grades_push_invalid_signature(self, _):
+        """The grades web hook requires a signature made with a known secret."""
+        payload = json.dumps({"grades": []})
+
+        response = self.client.post(
+            "/api/v1.0/grades-push",
+            payload,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=sign(payload, "unknown secret"),
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), "Invalid authentication.")
+
+    def test_api_grades_push_invalid_grades(self, _):
+        """Grades should be a non empty list of grades telling if the learner passed."""
+        response = self.post({"grades": []})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {"grades": {"non_field_errors": ["This list may not be empty."]}},
+        )
+
+        response = self.post(
+            {
+                "grades": [
+                    {
+                        "username": "joanie",
+                        "resource_link": "http://openedx.test/courses/x/course",
+                        "grade": {"percent": 0.5},
+                    }
+                ]
+            }
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {
+                "grades": [
+                    {"grade": ["The grade should have a boolean `passed` field."]}
+                ]
+            },
+        )
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades")
+    def test_api_grades_push(self, mock_get_grades, _):
+        """
+        Pushed grades should be stored in the grade cache and orders of learners who
+        passed should be certified without requesting the LMS.
+        """
+        passed_order, failed_order, other_order = [
+            self.create_order(number) for number in range(3)
+        ]
+        grades = [
+            {
+                "username": order.owner.username,
+                "resource_link": order.target_courses.get()
+                .course_runs.get()
+                .resource_link,
+                "grade": {"passed": passed, "percent": 1.0 if passed else 0.2},
+            }
+            for order, passed in ((passed_order, True), (failed_order, False))
+        ]
+
+        response = self.post({"grades": grades})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"success": True, "certificates": 1})
+        mock_get_grades.assert_not_called()
+        self.assertTrue(models.Certificate.objects.filter(order=passed_order).exists())
+        self.assertFalse(
+            models.Certificate.objects.filter(
+                order__in=[failed_order, other_order]
+            ).exists()
+        )
+        self.assertEqual(
+            get_grade(grades[1]["username"], grades[1]["resource_link"]),
+            {"passed": False, "percent": 0.2},
+        )
+        mock_get_grades.assert_not_called()
+
+    @mock.patch.object(OpenEdXLMSBackend, "get_grades")
+    def test_api_grades_push_other_grades_not_cached(self, mock_get_grades, _):
+        """
+        Orders with another graded course whose grade is not in cache should not be
+        checked against the LMS but left to the nightly certificate generation.
+        """
+        order = self.create_order(1, 2)
+        first_link, second_link = [
+            f"http://openedx.test/courses/course-v1:edx+{number:06d}+Demo/course"
+            for number in (1, 2)
+        ]
+
+        response = self.post(
+            {
+                "grades": [
+                    {
+                        "username": order.owner.username,
+                        "resource_link": first_link,
+                        "grade": {"passed": True},
+                    }
+                ]
+            }
+        )
+
+        self.assertEqual(response.json(), {"success": True, "certificates": 0})
+        mock_get_grades.assert_not_called()
+
+        # - Once the other grade is pushed, the order is certified
+        response = self.post(
+            {
+                "grades": [
+                    {
+                        "username": order.owner.username,
+                        "resource_link": second_link,
+                        "grade": {"passed": True},
+                    }
+                ]
+            }
+        )
+
+        self.assertEqual(response.json(), {"success": True, "certificates": 1})
+        mock_get_grades.assert_not_called()
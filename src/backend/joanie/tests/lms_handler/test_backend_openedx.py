@@ -78,7 +78,8 @@ class OpenEdXLMSBackendTestCase(TestCase):
     @responses.activate
     def test_backend_openedx_get_enrollment_failed(self):
         """
-        If retrieving course run's enrollment failed, it should return None.
+        If the LMS answered with an error to the request of a course run's enrollment,
+        it should return None.
         """
         username = "joanie"
         resource_link = (
@@ -90,7 +91,7 @@ class OpenEdXLMSBackendTestCase(TestCase):
         )
 
         responses.add(
-            responses.GET, url, status=500, json={"error": "Something went wrong..."}
+            responses.GET, url, status=404, json={"error": "Something went wrong..."}
         )
 
         backend = LMSHandler.select_lms(resource_link)
@@ -105,6 +106,26 @@ class OpenEdXLMSBackendTestCase(TestCase):
         self.assertIsNone(responses.calls[0].request.body)
         self.assertIsNone(enrollment)
 
+    @responses.activate
+    def test_backend_openedx_get_enrollment_unavailable(self):
+        """
+        If the LMS answered that it is unavailable to the request of a course run's
+        enrollment, it should raise an EnrollmentError.
+        """
+        resource_link = (
+            "http://openedx.test/courses/course-v1:edx+000001+Demo_Course/course"
+        )
+        url = (
+            "http://openedx.test/api/enrollment/v1/enrollment/"
+            "joanie,course-v1:edx+000001+Demo_Course"
+        )
+        responses.add(responses.GET, url, status=503)
+
+        with self.assertRaises(EnrollmentError):
+            LMSHandler.select_lms(resource_link).get_enrollment("joanie", resource_link)
+
+        self.assertEqual(len(responses.calls), 1)
+
     @responses.activate
     def test_backend_openedx_set_enrollment_successfully(self):
         """
@@ -76,3 +76,48 @@ class LMSHandlerTestCase(TestCase):
         self.assertEqual(second_lms.configuration["BASE_URL"], "http://lms-2.test")
         self.assertEqual(second_lms.configuration["SELECTOR_REGEX"], r".*")
         self.assertEqual(second_lms.configuration["COURSE_REGEX"], r".*")
+
+    @override_settings(
+        JOANIE_LMS_BACKENDS=[
+            {
+                "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+                "BASE_URL": "http://openedx.test",
+                "SELECTOR_REGEX": r".*openedx.test.*",
+            },
+            {
+                "BACKEND": "joanie.lms_handler.backends.base.BaseLMSBackend",
+                "BASE_URL": "http://moodle.test",
+                "SELECTOR_REGEX": r".*moodle.test.*",
+            },
+        ]
+    )
+    def test_lms_handler_group_by_lms(self):
+        """
+        The "group_by_lms" util function should group resource links by LMS with
+        one backend instance per LMS and group resource links without LMS under None.
+        """
+        groups = LMSHandler.group_by_lms(
+            [
+                "http://openedx.test/courses/1",
+                "http://moodle.test/courses/2",
+                "http://openedx.test/courses/3",
+                "http://unknown-lms.test/courses/4",
+                "http://openedx.test/courses/1",
+            ]
+        )
+        self.assertEqual(len(groups), 3)
+        groups = {
+            lms.configuration["BASE_URL"] if lms else None: sorted(links)
+            for lms, links in groups
+        }
+        self.assertEqual(
+            groups,
+            {
+                "http://openedx.test": [
+                    "http://openedx.test/courses/1",
+                    "http://openedx.test/courses/3",
+                ],
+                "http://moodle.test": ["http://moodle.test/courses/2"],
+                None: ["http://unknown-lms.test/courses/4"],
+            },
+        )
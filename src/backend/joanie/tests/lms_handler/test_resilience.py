@@ -0,0 +1,330 @@
+"""Test suite for the resilience of outgoing LMS calls."""
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+import requests
+import responses
+
+from joanie.core import enums, factories
+from joanie.core.exceptions import EnrollmentError, GradeError
+from joanie.lms_handler import LMSHandler
+from joanie.lms_handler.resilience import (
+    RateLimiter,
+    get_circuit_breaker,
+    get_lms_metrics,
+    get_semaphore,
+    log_lms_metrics,
+    reset_circuit_breakers,
+)
+
+RESOURCE_LINK = "http://openedx.test/courses/course-v1:edx+000001+Demo_Course/course"
+GRADES_URL = (
+    "http://openedx.test/fun/api/grades/course-v1:edx+000001+Demo_Course/joanie"
+)
+ENROLLMENT_URL = "http://openedx.test/api/enrollment/v1/enrollment"
+
+
+@override_settings(
+    JOANIE_LMS_BACKENDS=[
+        {
+            "API_TOKEN": "a_secure_api_token",
+            "BACKEND": "joanie.lms_handler.backends.openedx.OpenEdXLMSBackend",
+            "BASE_URL": "http://openedx.test",
+            "COURSE_REGEX": r"^.*/courses/(?P<course_id>.*)/course/?$",
+            "SELECTOR_REGEX": r".*",
+        }
+    ],
+    JOANIE_LMS_CIRCUIT_BREAKER_FAILURE_THRESHOLD=2,
+    JOANIE_LMS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT=30,
+    JOANIE_LMS_CONNECT_TIMEOUT=1,
+    JOANIE_LMS_READ_TIMEOUT=5,
+)
+class LMSResilienceTestCase(TestCase):
+    """Test suite for timeouts, circuit breaker and concurrency limit of LMS calls."""
+
+    def setUp(self):
+        """Start each test with closed circuits."""
+        reset_circuit_breakers()
+        self.addCleanup(reset_circuit_breakers)
+
+    @responses.activate
+    def test_resilience_timeouts(self):
+        """Requests to OpenEdX should be sent with connect and read timeouts."""
+        responses.add(responses.GET, GRADES_URL, status=200, json={"passed": True})
+
+        LMSHandler.select_lms(RESOURCE_LINK).get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(responses.calls[0].request.req_kwargs["timeout"], (1, 5))
+
+    @responses.activate
+    def test_resilience_circuit_opens_after_failures(self):
+        """
+        Once the threshold of consecutive failures is reached, calls should fail
+        fast without requesting the LMS.
+        """
+        responses.add(responses.GET, GRADES_URL, status=500)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+
+        for _ in range(3):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            get_lms_metrics(),
+            {
+                "http://openedx.test": {
+                    "state": "open",
+                    "successes": 0,
+                    "failures": 2,
+                    "rejected": 1,
+                    "throttled": 0,
+                }
+            },
+        )
+
+        # - The circuit is shared by all instances of the backend
+        with self.assertRaises(EnrollmentError):
+            LMSHandler.select_lms(RESOURCE_LINK).set_enrollment("joanie", RESOURCE_LINK)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_resilience_circuit_unavailable_answers(self):
+        """Overloaded (429) answers of the LMS should count as failures."""
+        responses.add(responses.GET, GRADES_URL, status=429)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+
+        for _ in range(3):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["state"], "open")
+
+    @responses.activate
+    def test_resilience_circuit_error_answers(self):
+        """
+        Error answers of the LMS to invalid requests (unknown user or course) should
+        not open the circuit as the LMS is available.
+        """
+        responses.add(responses.GET, GRADES_URL, status=404)
+        responses.add(responses.POST, ENROLLMENT_URL, status=400)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+
+        for _ in range(3):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+            with self.assertRaises(EnrollmentError):
+                backend.set_enrollment("joanie", RESOURCE_LINK)
+
+        self.assertEqual(len(responses.calls), 6)
+        self.assertEqual(
+            get_lms_metrics()["http://openedx.test"],
+            {
+                "state": "closed",
+                "successes": 6,
+                "failures": 0,
+                "rejected": 0,
+                "throttled": 0,
+            },
+        )
+
+        # - A failing LMS still opens the circuit, whatever answers came before
+        responses.replace(responses.GET, GRADES_URL, status=502)
+        for _ in range(3):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+        self.assertEqual(len(responses.calls), 8)
+
+    @responses.activate
+    def test_resilience_circuit_recovers(self):
+        """
+        Once the recovery timeout elapsed, a trial call should be allowed and close
+        the circuit if it succeeds.
+        """
+        responses.add(responses.GET, GRADES_URL, status=500)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+        with mock.patch("time.monotonic", return_value=100):
+            for _ in range(2):
+                with self.assertRaises(GradeError):
+                    backend.get_grades("joanie", RESOURCE_LINK)
+
+        responses.replace(responses.GET, GRADES_URL, status=200, json={"passed": True})
+        with mock.patch("time.monotonic", return_value=129):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        with mock.patch("time.monotonic", return_value=130):
+            self.assertEqual(
+                backend.get_grades("joanie", RESOURCE_LINK), {"passed": True}
+            )
+
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["state"], "closed")
+        self.assertEqual(backend.get_grades("joanie", RESOURCE_LINK), {"passed": True})
+
+    @override_settings(
+        JOANIE_LMS_MAX_CONCURRENT_REQUESTS=1, JOANIE_LMS_CONNECT_TIMEOUT=0
+    )
+    @responses.activate
+    def test_resilience_circuit_trial_throttled(self):
+        """
+        A trial call rejected as too many calls are running should open the circuit
+        again so that another trial is allowed once the recovery timeout elapsed.
+        """
+        responses.add(responses.GET, GRADES_URL, status=500)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+        with mock.patch("time.monotonic", return_value=100):
+            for _ in range(2):
+                with self.assertRaises(GradeError):
+                    backend.get_grades("joanie", RESOURCE_LINK)
+
+        responses.replace(responses.GET, GRADES_URL, status=200, json={"passed": True})
+        with mock.patch("time.monotonic", return_value=130), get_semaphore():
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["state"], "open")
+        with mock.patch("time.monotonic", return_value=159):
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        with mock.patch("time.monotonic", return_value=160):
+            self.assertEqual(
+                backend.get_grades("joanie", RESOURCE_LINK), {"passed": True}
+            )
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["state"], "closed")
+
+    @responses.activate
+    def test_resilience_circuit_trial_interrupted(self):
+        """
+        A trial call interrupted without recording its outcome should not block the
+        LMS: another trial is allowed once the recovery timeout elapsed.
+        """
+        responses.add(responses.GET, GRADES_URL, status=500)
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+        with mock.patch("time.monotonic", return_value=100):
+            for _ in range(2):
+                with self.assertRaises(GradeError):
+                    backend.get_grades("joanie", RESOURCE_LINK)
+
+        with mock.patch("time.monotonic", return_value=130), mock.patch(
+            "requests.Session.send", side_effect=KeyboardInterrupt
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["state"], "open")
+        responses.replace(responses.GET, GRADES_URL, status=200, json={"passed": True})
+        with mock.patch("time.monotonic", return_value=160):
+            self.assertEqual(
+                backend.get_grades("joanie", RESOURCE_LINK), {"passed": True}
+            )
+
+    def test_resilience_circuit_trial_stale(self):
+        """
+        A half-open circuit whose trial call did not report its outcome within the
+        recovery timeout should allow another trial call.
+        """
+        circuit_breaker = get_circuit_breaker("http://openedx.test")
+        with mock.patch("time.monotonic", return_value=100):
+            circuit_breaker.record_failure()
+            circuit_breaker.record_failure()
+
+        with mock.patch("time.monotonic", return_value=130):
+            self.assertTrue(circuit_breaker.allow())
+            self.assertFalse(circuit_breaker.allow())
+
+        self.assertEqual(circuit_breaker.state, "half-open")
+        with mock.patch("time.monotonic", return_value=159):
+            self.assertFalse(circuit_breaker.allow())
+        with mock.patch("time.monotonic", return_value=160):
+            self.assertTrue(circuit_breaker.allow())
+
+    @responses.activate
+    def test_resilience_log_metrics(self):
+        """Metrics of each LMS called should be logged."""
+        responses.add(responses.GET, GRADES_URL, status=200, json={"passed": True})
+        LMSHandler.select_lms(RESOURCE_LINK).get_grades("joanie", RESOURCE_LINK)
+
+        with self.assertLogs("joanie.lms_handler.resilience", "INFO") as logs:
+            log_lms_metrics()
+
+        self.assertEqual(
+            logs.output,
+            [
+                "INFO:joanie.lms_handler.resilience:LMS http://openedx.test: circuit "
+                "closed, 1 successful, 0 failed, 0 rejected and 0 throttled call(s)."
+            ],
+        )
+
+    @responses.activate
+    def test_resilience_network_error(self):
+        """Network errors should be converted to the error of the LMS method."""
+        responses.add(
+            responses.POST, ENROLLMENT_URL, body=requests.ConnectTimeout("timeout")
+        )
+
+        with self.assertRaises(EnrollmentError):
+            LMSHandler.select_lms(RESOURCE_LINK).set_enrollment("joanie", RESOURCE_LINK)
+
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["failures"], 1)
+
+    @override_settings(
+        JOANIE_LMS_MAX_CONCURRENT_REQUESTS=1, JOANIE_LMS_CONNECT_TIMEOUT=0
+    )
+    @responses.activate
+    def test_resilience_concurrency_limit(self):
+        """Calls exceeding the number of concurrent LMS calls should fail fast."""
+        responses.add(responses.GET, GRADES_URL, status=200, json={"passed": True})
+        backend = LMSHandler.select_lms(RESOURCE_LINK)
+
+        with get_semaphore():
+            with self.assertRaises(GradeError):
+                backend.get_grades("joanie", RESOURCE_LINK)
+
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual(get_lms_metrics()["http://openedx.test"]["throttled"], 1)
+        self.assertEqual(backend.get_grades("joanie", RESOURCE_LINK), {"passed": True})
+
+    @responses.activate
+    def test_resilience_enrollment_left_failed(self):
+        """Enrollments failing fast should be left in a failed state to be retried."""
+        responses.add(responses.POST, ENROLLMENT_URL, status=500)
+        course_run = factories.CourseRunFactory(
+            start=timezone.now() - timedelta(hours=1),
+            end=timezone.now() + timedelta(hours=2),
+            enrollment_end=timezone.now() + timedelta(hours=1),
+            resource_link=RESOURCE_LINK,
+            is_listed=True,
+        )
+
+        enrollments = [
+            factories.EnrollmentFactory(course_run=course_run, is_active=True)
+            for _ in range(3)
+        ]
+
+        self.assertEqual(len(responses.calls), 2)
+        for enrollment in enrollments:
+            self.assertEqual(enrollment.state, enums.ENROLLMENT_STATE_FAILED)
+
+    def test_resilience_rate_limiter(self):
+        """Calls should be spaced out according to the rate."""
+        rate_limiter = RateLimiter(rate=4)
+
+        with mock.patch("time.monotonic", return_value=100), mock.patch(
+            "time.sleep"
+        ) as mock_sleep:
+            for _ in range(3):
+                rate_limiter.wait()
+
+        self.assertEqual(mock_sleep.call_args_list, [mock.call(0.25), mock.call(0.5)])
+
+        # - No limit is applied without rate
+        with mock.patch("time.sleep") as mock_sleep:
+            for _ in range(3):
+                RateLimiter().wait()
+        mock_sleep.assert_not_called()
@@ -1,5 +1,7 @@
 """ProformaInvoice admin test suite"""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 import lxml.html
@@ -163,3 +165,74 @@ class ProformaInvoiceAdminTestCase(TestCase):
             links[0].attrib["href"],
             reverse("admin:payment_transaction_change", args=(transaction.pk,)),
         )
+
+    def test_admin_proforma_invoice_export(self):
+        """
+        Staff users should be able to download a streamed export of orders
+        with their pro forma invoices and transactions.
+        """
+        order = factories.OrderFactory()
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+
+        # - Anonymous users are redirected to the login page
+        url = reverse("admin:payment_proformainvoice_export")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+
+        response = self.client.get(url, {"format": "jsonl"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/jsonl")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertIn(invoice.reference, content)
+
+        response = self.client.get(url, {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_proforma_invoice_changelist_balance(self):
+        """
+        The pro forma invoice changelist should display balances computed from
+        annotations, with the same number of queries whatever the number of pro forma
+        invoices displayed.
+        """
+        user = factories.UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=user.username, password="password")
+        changelist_page = reverse("admin:payment_proformainvoice_changelist")
+        order = factories.OrderFactory(product__price=Money("100.00", "EUR"))
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+        TransactionFactory(proforma_invoice=invoice, total=Money("60.00", "EUR"))
+        credit_note = ProformaInvoiceFactory(
+            order=order, parent=invoice, total=Money("-10.00", "EUR")
+        )
+        TransactionFactory(proforma_invoice=credit_note, total=credit_note.total)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(changelist_page)
+
+        self.assertEqual(response.status_code, 200)
+        html_parser = lxml.html.HTMLParser(encoding="utf-8")
+        html = lxml.html.fromstring(response.content, parser=html_parser)
+        balances = {
+            row.cssselect(".field-reference")[0]
+            .text_content(): row.cssselect(".field-balance")[0]
+            .text_content()
+            for row in html.cssselect("#result_list tbody tr")
+        }
+        self.assertEqual(
+            balances,
+            {
+                invoice.reference: str(invoice.balance),
+                credit_note.reference: str(credit_note.balance),
+            },
+        )
+
+        ProformaInvoiceFactory.create_batch(3, total=Money("1.00", "EUR"))
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(changelist_page)
+        self.assertEqual(response.status_code, 200)
@@ -6,6 +6,7 @@ from unittest import mock
 from django.urls import reverse
 
 import payplug
+import responses
 from payplug.exceptions import BadRequest, Forbidden, UnknownAPIResource
 from rest_framework.test import APIRequestFactory
 
@@ -596,3 +597,32 @@ class PayplugBackendTestCase(BasePaymentTestCase):
                 "The server gave the following response: `Abort this payment is forbidden.`."
             ),
         )
+
+    @responses.activate
+    def test_payment_backend_payplug_delete_credit_card_reuses_session(self):
+        """
+        Credit cards are deleted through a HTTP session owned by the backend instance
+        so consecutive calls reuse the same connection pool.
+        """
+        backend = PayplugBackend(self.configuration)
+        credit_cards = CreditCardFactory.build_batch(2)
+        for credit_card in credit_cards:
+            responses.add(
+                responses.DELETE,
+                f"https://api.payplug.com/v1/cards/{credit_card.token}",
+                status=204,
+            )
+
+        session = backend.session
+        with mock.patch.object(
+            session, "delete", wraps=session.delete
+        ) as mock_session_delete:
+            for credit_card in credit_cards:
+                backend.delete_credit_card(credit_card)
+
+        self.assertIs(backend.session, session)
+        self.assertEqual(mock_session_delete.call_count, 2)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            responses.calls[0].request.headers["Authorization"], "Bearer sk_test_0"
+        )
@@ -0,0 +1,82 @@
+"""Test suite for the management command 'export_orders'"""
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from djmoney.money import Money
+
+from joanie.core import factories, models
+from joanie.payment.factories import ProformaInvoiceFactory, TransactionFactory
+
+
+class ExportOrdersCommandTestCase(TestCase):
+    """Test case for the management command 'export_orders'"""
+
+    def test_commands_export_orders_csv(self):
+        """
+        One row should be exported per order, pro forma invoice and transaction,
+        including orders without pro forma invoice.
+        """
+        product = factories.ProductFactory(price=Money("100.00", "EUR"))
+        [order, pending_order] = factories.OrderFactory.create_batch(2, product=product)
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+        [transaction_1, transaction_2] = TransactionFactory.create_batch(
+            2, proforma_invoice=invoice, total=Money("50.00", "EUR")
+        )
+
+        output = StringIO()
+        call_command("export_orders", stdout=output)
+
+        rows = list(csv.DictReader(StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertCountEqual(
+            [row["transaction_reference"] for row in rows],
+            [transaction_1.reference, transaction_2.reference, ""],
+        )
+        pending_row = next(row for row in rows if row["transaction_reference"] == "")
+        self.assertEqual(pending_row["order_id"], str(pending_order.id))
+        self.assertEqual(pending_row["proforma_invoice_reference"], "")
+        paid_row = next(row for row in rows if row["transaction_reference"] != "")
+        self.assertEqual(paid_row["order_id"], str(order.id))
+        self.assertEqual(paid_row["owner"], order.owner.username)
+        self.assertEqual(paid_row["proforma_invoice_reference"], invoice.reference)
+        self.assertEqual(paid_row["proforma_invoice_total"], "100.00")
+        self.assertEqual(paid_row["transaction_total"], "50.00")
+
+    def test_commands_export_orders_jsonl_date_range(self):
+        """
+        Orders can be exported as JSON lines and restricted to a creation date range.
+        """
+        [order, old_order] = factories.OrderFactory.create_batch(2)
+        models.Order.objects.filter(pk=old_order.pk).update(
+            created_on=timezone.now() - timedelta(days=10)
+        )
+
+        output = StringIO()
+        call_command(
+            "export_orders",
+            format="jsonl",
+            since=(timezone.now() - timedelta(days=1)).date(),
+            stdout=output,
+        )
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row["order_id"], str(order.id))
+        self.assertIsNone(row["proforma_invoice_reference"])
+
+    def test_commands_export_orders_is_streamed(self):
+        """Rows should be read from the database by chunks through an iterator."""
+        factories.OrderFactory.create_batch(3)
+
+        output = StringIO()
+        with self.assertNumQueries(1):
+            call_command("export_orders", chunk_size=1, stdout=output)
+
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
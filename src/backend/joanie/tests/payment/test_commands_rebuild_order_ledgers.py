@@ -0,0 +1,37 @@
+"""Test suite for the management command 'rebuild_order_ledgers'"""
+from django.core.management import call_command
+from django.test import TestCase
+
+from djmoney.money import Money
+
+from joanie.core import factories
+from joanie.payment.factories import ProformaInvoiceFactory, TransactionFactory
+from joanie.payment.models import OrderLedger
+
+
+class RebuildOrderLedgersCommandTestCase(TestCase):
+    """Test case for the management command 'rebuild_order_ledgers'"""
+
+    def test_commands_rebuild_order_ledgers(self):
+        """Ledgers of all orders should be rebuilt without option."""
+        product = factories.ProductFactory(price=Money("100.00", "EUR"))
+        orders = factories.OrderFactory.create_batch(2, product=product)
+        invoice = ProformaInvoiceFactory(order=orders[0], total=orders[0].total)
+        TransactionFactory(proforma_invoice=invoice, total=Money("50.00", "EUR"))
+
+        call_command("rebuild_order_ledgers")
+
+        self.assertEqual(OrderLedger.objects.count(), 2)
+        ledger = OrderLedger.objects.get(order=orders[0])
+        self.assertEqual(ledger.paid, Money("50.00", "EUR"))
+        self.assertEqual(ledger.balance, Money("-50.00", "EUR"))
+
+    def test_commands_rebuild_order_ledgers_restrict_to_orders(self):
+        """Ledgers should only be rebuilt for the orders provided."""
+        orders = factories.OrderFactory.create_batch(2)
+
+        call_command("rebuild_order_ledgers", "-o", str(orders[0].id))
+
+        self.assertEqual(
+            list(OrderLedger.objects.values_list("order", flat=True)), [orders[0].id]
+        )
@@ -1,4 +1,5 @@
 """get_payment_backend() test suite"""
+from unittest import mock
 
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -77,3 +78,45 @@ class GetPaymentBackendTestSuite(TestCase):
                 "JOANIE_PAYMENT_BACKEND configuration seems not valid. Check your settings.py."
             ),
         )
+
+    @override_settings(
+        JOANIE_PAYMENT_BACKEND={
+            "backend": "joanie.payment.backends.dummy.DummyPaymentBackend",
+        }
+    )
+    def test_get_payment_backend_is_reused(self):
+        """
+        The payment backend should be instantiated once then reused
+        as long as its configuration does not change.
+        """
+        with mock.patch.object(
+            DummyPaymentBackend, "__init__", return_value=None
+        ) as mock_init:
+            backend = get_payment_backend()
+            self.assertIs(get_payment_backend(), backend)
+
+        mock_init.assert_called_once_with(None)
+
+    def test_get_payment_backend_is_invalidated_on_settings_change(self):
+        """
+        When JOANIE_PAYMENT_BACKEND setting changes, a new payment backend instance
+        should be returned.
+        """
+        with override_settings(
+            JOANIE_PAYMENT_BACKEND={
+                "backend": "joanie.payment.backends.dummy.DummyPaymentBackend",
+                "configuration": {"key": "value"},
+            }
+        ):
+            backend = get_payment_backend()
+            self.assertEqual(backend.configuration, {"key": "value"})
+
+        with override_settings(
+            JOANIE_PAYMENT_BACKEND={
+                "backend": "joanie.payment.backends.dummy.DummyPaymentBackend",
+                "configuration": {"key": "other value"},
+            }
+        ):
+            other_backend = get_payment_backend()
+            self.assertIsNot(other_backend, backend)
+            self.assertEqual(other_backend.configuration, {"key": "other value"})
@@ -0,0 +1,140 @@
+"""Test suite for order ledgers"""
+from unittest import mock
+
+from djmoney.money import Money
+
+from joanie.core import factories
+from joanie.core.models import Order
+from joanie.payment import enums, ledgers
+from joanie.payment.factories import (
+    BillingAddressDictFactory,
+    ProformaInvoiceFactory,
+    TransactionFactory,
+)
+from joanie.payment.models import OrderLedger
+
+from .base_payment import BasePaymentTestCase
+from .test_backend_base import TestBasePaymentBackend
+
+
+class OrderLedgerTestCase(BasePaymentTestCase):
+    """Test suite for order ledgers"""
+
+    def assertLedgerEqual(self, ledger, totals):
+        """Check invoiced, paid, refunded and balance totals of a ledger in EUR."""
+        # pylint: disable=invalid-name
+        self.assertEqual(
+            (ledger.invoiced, ledger.paid, ledger.refunded, ledger.balance),
+            tuple(Money(total, "EUR") for total in totals),
+        )
+
+    def test_ledgers_recorded_by_payment_backend(self):
+        """
+        The ledger of an order should be updated each time the payment backend
+        creates a pro forma invoice or a transaction.
+        """
+        backend = TestBasePaymentBackend()
+        order = factories.OrderFactory(product__price=Money("100.00", "EUR"))
+        payment = {
+            "id": "pay_0",
+            "amount": order.total.amount,
+            "billing_address": BillingAddressDictFactory(),
+        }
+
+        backend.call_do_on_payment_success(order, payment)
+
+        ledger = OrderLedger.objects.get(order=order)
+        self.assertLedgerEqual(ledger, ("100.00", "100.00", "0.00", "0.00"))
+        self.assertEqual(ledger.last_event_type, enums.TRANSACTION_TYPE_DEBIT)
+
+        backend.call_do_on_refund(
+            amount=Money("40.00", "EUR"),
+            proforma_invoice=order.main_proforma_invoice,
+            refund_reference="ref_0",
+        )
+
+        ledger.refresh_from_db()
+        self.assertLedgerEqual(ledger, ("60.00", "100.00", "40.00", "0.00"))
+        self.assertEqual(ledger.last_event_type, enums.TRANSACTION_TYPE_CREDIT)
+        self.assertEqual(
+            ledger.last_event_on,
+            order.proforma_invoices.get(parent__isnull=False)
+            .transactions.get()
+            .created_on,
+        )
+
+    def test_ledgers_record_event_without_ledger(self):
+        """
+        Recording an event for an order without ledger should build its ledger from
+        all its pro forma invoices and transactions.
+        """
+        order = factories.OrderFactory(product__price=Money("100.00", "EUR"))
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+        payment = TransactionFactory(
+            proforma_invoice=invoice, total=Money("30.00", "EUR")
+        )
+
+        ledgers.record_transaction(payment)
+
+        ledger = OrderLedger.objects.get(order=order)
+        self.assertLedgerEqual(ledger, ("100.00", "30.00", "0.00", "-70.00"))
+        self.assertEqual(ledger.last_event_on, payment.created_on)
+
+    def test_ledgers_record_event_concurrent_ledger_creation(self):
+        """
+        When a concurrent first event of the same order creates its ledger
+        meanwhile, the existing ledger should be rebuilt from all events instead of
+        failing on the unique order constraint.
+        """
+        order = factories.OrderFactory(product__price=Money("100.00", "EUR"))
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+        payment = TransactionFactory(
+            proforma_invoice=invoice, total=Money("30.00", "EUR")
+        )
+        build_ledgers = ledgers.build_ledgers
+
+        def build_ledgers_concurrently(order_currencies):
+            if not OrderLedger.objects.filter(order=order).exists():
+                # - A concurrent event built the ledger without the last payment
+                concurrent_ledger = ledgers.get_empty_ledger(order.pk, "EUR")
+                concurrent_ledger.record(
+                    invoice.type, invoice.created_on, invoice.total
+                )
+                concurrent_ledger.save(validate=False)
+            return build_ledgers(order_currencies)
+
+        with mock.patch.object(
+            ledgers, "build_ledgers", side_effect=build_ledgers_concurrently
+        ):
+            ledgers.record_transaction(payment)
+
+        ledger = OrderLedger.objects.get(order=order)
+        self.assertLedgerEqual(ledger, ("100.00", "30.00", "0.00", "-70.00"))
+        self.assertEqual(ledger.last_event_on, payment.created_on)
+
+    def test_ledgers_rebuild(self):
+        """
+        Rebuilding ledgers should replace them with totals computed from pro forma
+        invoices and transactions, with a constant number of queries.
+        """
+        product = factories.ProductFactory(price=Money("100.00", "EUR"))
+        [order, pending_order] = factories.OrderFactory.create_batch(2, product=product)
+        invoice = ProformaInvoiceFactory(order=order, total=order.total)
+        TransactionFactory(proforma_invoice=invoice, total=order.total)
+        credit_note = ProformaInvoiceFactory(
+            order=order, parent=invoice, total=Money("-40.00", "EUR")
+        )
+        TransactionFactory(proforma_invoice=credit_note, total=credit_note.total)
+        OrderLedger.objects.create(order=order)
+
+        with self.assertNumQueries(7):
+            count = ledgers.rebuild_ledgers(Order.objects.all())
+
+        self.assertEqual(count, 2)
+        ledger = OrderLedger.objects.get(order=order)
+        self.assertLedgerEqual(ledger, ("60.00", "100.00", "40.00", "0.00"))
+        self.assertEqual(ledger.last_event_type, enums.TRANSACTION_TYPE_CREDIT)
+        pending_ledger = OrderLedger.objects.get(order=pending_order)
+        self.assertLedgerEqual(pending_ledger, ("0.00", "0.00", "0.00", "0.00"))
+        self.assertEqual(pending_ledger.last_event_type, "")
+        self.assertIsNone(pending_ledger.last_event_on)